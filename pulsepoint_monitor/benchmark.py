@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+PulsePoint Pipeline Benchmarks
+
+Times the decrypt -> parse -> persist pipeline on synthetic, encrypted
+fixtures (see pulsepoint_fixtures.py):
+
+- decrypt_response and parse_incidents for 1, 100 and 10,000 incidents per agency
+- parse_unit_status, JSONFileOutput.update_incidents and flush for 125 and 5,000 agencies
+- memory retained by the parsed incidents for 125 and 5,000 agencies
+
+Results are written as JSON; pass a previous results file as --baseline to flag
+regressions (exit status 1).
+
+Usage:
+    python benchmark.py --output bench.json
+    python benchmark.py --baseline bench.json --threshold 0.25
+"""
+
+import argparse
+import functools
+import json
+import logging
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+from pulsepoint_fixtures import encrypt_payload, make_agencies, make_incidents_payload
+from pulsepoint_scraper import JSONFileOutput, decrypt_response, parse_incidents, parse_unit_status
+
+INCIDENTS_PER_AGENCY = [1, 100, 10_000]
+AGENCY_COUNTS = [125, 5_000]
+# Per-agency load for the fleet-wide benchmarks: a busy-but-normal cycle
+FLEET_ACTIVE = 5
+FLEET_RECENT = 40
+
+
+def bench(name: str, func, repeat: int, setup=None, **params) -> dict:
+    """
+    Time func() repeat times after one warm-up run.
+
+    Args:
+        name: Benchmark name
+        func: Callable timed on each run; receives setup()'s result if setup is given
+        repeat: Number of timed runs
+        setup: Untimed callable run before each call
+        **params: Parameters recorded with the result
+
+    Returns:
+        Result dictionary with min/median/mean seconds
+    """
+    times = []
+    for run in range(repeat + 1):
+        arg = setup() if setup else None
+        started = time.perf_counter()
+        func(arg) if setup else func()
+        elapsed = time.perf_counter() - started
+        if run:
+            times.append(elapsed)
+
+    result = {
+        "name": name,
+        "params": params,
+        "repeat": repeat,
+        "min": min(times),
+        "median": statistics.median(times),
+        "mean": statistics.fmean(times),
+    }
+    print(f"{result_key(result):<48} median {result['median'] * 1000:10.2f}ms  min {result['min'] * 1000:10.2f}ms")
+    return result
+
+
+def measure_retained(name: str, build, **params) -> dict:
+    """Bytes still allocated by build()'s result, as a benchmark result."""
+    tracemalloc.start()
+    try:
+        result = build()
+        retained, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+
+    print(f"{name}[{','.join(f'{k}={v}' for k, v in sorted(params.items()))}]".ljust(48)
+          + f" retained {retained / 1024 / 1024:9.2f}MB")
+    return {"name": name, "params": params, "repeat": 1, "unit": "bytes",
+            "min": retained, "median": retained, "mean": retained}
+
+
+def result_key(result: dict) -> str:
+    params = ",".join(f"{k}={v}" for k, v in sorted(result["params"].items()))
+    return f"{result['name']}[{params}]"
+
+
+def bench_payloads(sizes: list[int], repeat: int) -> list[dict]:
+    """decrypt_response and parse_incidents at increasing payload sizes."""
+    results = []
+    for size in sizes:
+        data = make_incidents_payload("T00000", active=size, recent=0)
+        # A fresh salt per run, as each real response has, so key derivation is included
+        envelopes = iter([encrypt_payload(data) for _ in range(repeat + 1)])
+        results.append(bench("decrypt_response", lambda: decrypt_response(next(envelopes)), repeat, incidents=size))
+
+        incidents_data = data["incidents"]
+        results.append(bench(
+            "parse_incidents",
+            lambda: parse_incidents(incidents_data, "T00000", "Test Agency", "active"),
+            repeat, incidents=size,
+        ))
+    return results
+
+
+def parse_fleet(payloads: list[tuple[dict, dict]]) -> tuple[list, list]:
+    """Parse every agency's active and recent incidents."""
+    active, recent = [], []
+    for agency, incidents_data in payloads:
+        active.extend(parse_incidents(incidents_data, agency["id"], agency["name"], "active"))
+        recent.extend(parse_incidents(incidents_data, agency["id"], agency["name"], "recent"))
+    return active, recent
+
+
+def bench_fleet(agency_counts: list[int], repeat: int) -> list[dict]:
+    """parse_unit_status and JSON output for many agencies at once."""
+    logger = logging.getLogger("pulsepoint.benchmark")
+    results = []
+    for count in agency_counts:
+        payloads = [
+            (agency, make_incidents_payload(agency["id"], FLEET_ACTIVE, FLEET_RECENT)["incidents"])
+            for agency in make_agencies(count)
+        ]
+        # Bound to this list, so dropping it below frees the payloads
+        build = functools.partial(parse_fleet, payloads)
+        results.append(measure_retained("parsed_incidents", build, agencies=count))
+        active, recent = build()
+        del build, payloads
+
+        results.append(bench("parse_unit_status", lambda: parse_unit_status(active), repeat, agencies=count))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            output = JSONFileOutput(str(Path(tmp) / "pulsepoint_data.json"), logger)
+            # Existing recent history, as on every cycle after the first
+            output.update_incidents(active, recent)
+            results.append(bench(
+                "update_incidents", lambda: output.update_incidents(active, recent), repeat, agencies=count,
+            ))
+
+            def dirty():
+                output.dirty = True
+
+            results.append(bench("flush", lambda _: output.flush(), repeat, setup=dirty, agencies=count))
+    return results
+
+
+def compare(results: list[dict], baseline_file: str, threshold: float) -> list[str]:
+    """Names of benchmarks whose median is more than threshold slower than the baseline."""
+    with open(baseline_file, "r", encoding="utf-8") as f:
+        baseline = {result_key(r): r for r in json.load(f).get("results", [])}
+
+    regressions = []
+    print(f"\nCompared with {baseline_file}:")
+    for result in results:
+        key = result_key(result)
+        before = baseline.get(key)
+        if before is None:
+            print(f"  {key:<48} (new)")
+            continue
+        change = result["median"] / before["median"] - 1 if before["median"] else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(key)
+        print(f"  {key:<48} {change:+8.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the PulsePoint decrypt/parse/persist pipeline")
+    parser.add_argument("-o", "--output", default="benchmark_results.json", help="Results file")
+    parser.add_argument("--baseline", metavar="FILE", help="Previous results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Slowdown that counts as a regression (default 0.2 = 20%%)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per benchmark")
+    parser.add_argument("--quick", action="store_true", help="Skip the 10k-incident and 5,000-agency sizes")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    sizes = INCIDENTS_PER_AGENCY[:-1] if args.quick else INCIDENTS_PER_AGENCY
+    agency_counts = AGENCY_COUNTS[:-1] if args.quick else AGENCY_COUNTS
+
+    results = bench_payloads(sizes, args.repeat) + bench_fleet(agency_counts, args.repeat)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "results": results,
+        }, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) over {args.threshold:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,13 +9,41 @@ Flask server providing a CAD-style incident display with:
 - Agency filtering
 """
 
+import gzip
+import hashlib
+import heapq
+import itertools
 import json
+import math
+import os
+import threading
+import time
+from bisect import bisect_right
+from datetime import datetime, timezone
 from pathlib import Path
-from flask import Flask, jsonify, render_template_string
+from flask import Flask, Response, g, render_template_string, request
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+from incident_store import load_changes, load_snapshot, parse_epoch
+from metrics import MetricsRegistry
 
 app = Flask(__name__)
 
 DATA_FILE = Path(__file__).parent.parent / "pulsepoint_data.json"
+# Read from the scraper's SQLite store instead when output_mode is "sqlite"
+DATA_DB = os.environ.get("PULSEPOINT_DB")
+CHANGES_FILE = DATA_FILE.with_name(f"{DATA_FILE.stem}_changes.json")
+# Published by the scraper after every cycle (its metrics_file setting)
+METRICS_FILE = Path(os.environ.get("PULSEPOINT_METRICS", Path(__file__).parent / "scraper_metrics.json"))
+
+# How often each stream checks for new change sets, and sends a keepalive comment
+STREAM_POLL_SECONDS = 1.0
+STREAM_KEEPALIVE_SECONDS = 15.0
 
 DASHBOARD_HTML = """
 <!DOCTYPE html>
@@ -441,7 +469,7 @@ DASHBOARD_HTML = """
             document.getElementById('btn-24h').classList.remove('active');
             document.getElementById('btn-alltime').classList.remove('active');
             document.getElementById('btn-' + filter).classList.add('active');
-            renderIncidents();
+            fetchData();
         }
 
         function isWithinTimeRange(isoString) {
@@ -504,6 +532,7 @@ DASHBOARD_HTML = """
             localStorage.setItem('selectedAgencies', JSON.stringify([...selectedAgencies]));
             updateAgencyFilters();
             renderIncidents();
+            fetchData();
         }
 
         function selectAll() {
@@ -511,6 +540,7 @@ DASHBOARD_HTML = """
             localStorage.setItem('selectedAgencies', JSON.stringify([...selectedAgencies]));
             updateAgencyFilters();
             renderIncidents();
+            fetchData();
         }
 
         function selectNone() {
@@ -518,6 +548,7 @@ DASHBOARD_HTML = """
             localStorage.setItem('selectedAgencies', JSON.stringify([]));
             updateAgencyFilters();
             renderIncidents();
+            fetchData();
         }
 
         function renderIncidents() {
@@ -599,76 +630,187 @@ DASHBOARD_HTML = """
             document.getElementById('agency-count').textContent = agencyCount;
         }
 
-        async function fetchData() {
-            try {
-                const response = await fetch('/api/incidents');
-                allData = await response.json();
+        function ingest() {
+            // Build agency list from data.agencies (includes all polled agencies)
+            const agencies = allData.agencies || {};
+            const activeByAgency = {};
+            const recentByAgency = {};
+
+            (allData.active_incidents || []).forEach(i => {
+                activeByAgency[i.agency_id] = (activeByAgency[i.agency_id] || 0) + 1;
+            });
+            (allData.recent_incidents || []).forEach(i => {
+                recentByAgency[i.agency_id] = (recentByAgency[i.agency_id] || 0) + 1;
+            });
 
-                // Build agency list from data.agencies (includes all polled agencies)
-                const agencies = allData.agencies || {};
-                const activeByAgency = {};
-                const recentByAgency = {};
-
-                (allData.active_incidents || []).forEach(i => {
-                    activeByAgency[i.agency_id] = (activeByAgency[i.agency_id] || 0) + 1;
-                });
-                (allData.recent_incidents || []).forEach(i => {
-                    recentByAgency[i.agency_id] = (recentByAgency[i.agency_id] || 0) + 1;
-                });
-
-                // Add all agencies from the data
-                Object.entries(agencies).forEach(([id, info]) => {
-                    if (!knownAgencies[id]) {
-                        knownAgencies[id] = {
-                            name: info.name || `Agency ${id}`,
-                            activeCount: 0,
-                            recentCount: 0
-                        };
-                    }
-                    knownAgencies[id].name = info.name || knownAgencies[id].name;
-                    knownAgencies[id].activeCount = activeByAgency[id] || 0;
-                    knownAgencies[id].recentCount = recentByAgency[id] || 0;
-                });
-
-                // Also add any agencies from incidents not in agencies list
-                [...(allData.active_incidents || []), ...(allData.recent_incidents || [])].forEach(i => {
-                    if (!knownAgencies[i.agency_id]) {
-                        knownAgencies[i.agency_id] = {
-                            name: i.agency_name || `Agency ${i.agency_id}`,
-                            activeCount: activeByAgency[i.agency_id] || 0,
-                            recentCount: recentByAgency[i.agency_id] || 0
-                        };
-                    }
-                });
-
-                // Initialize selection on first load
-                if (selectedAgencies.size === 0 && Object.keys(knownAgencies).length > 0) {
-                    const saved = localStorage.getItem('selectedAgencies');
-                    if (saved) {
-                        const parsed = JSON.parse(saved);
-                        selectedAgencies = new Set(parsed.filter(id => knownAgencies[id]));
-                    }
-                    if (selectedAgencies.size === 0) {
-                        selectedAgencies = new Set(Object.keys(knownAgencies));
-                    }
+            // Add all agencies from the data
+            Object.entries(agencies).forEach(([id, info]) => {
+                if (!knownAgencies[id]) {
+                    knownAgencies[id] = {
+                        name: info.name || `Agency ${id}`,
+                        activeCount: 0,
+                        recentCount: 0
+                    };
                 }
+                knownAgencies[id].name = info.name || knownAgencies[id].name;
+            });
 
-                updateAgencyFilters();
-                renderIncidents();
+            // Also add any agencies from incidents not in agencies list
+            [...(allData.active_incidents || []), ...(allData.recent_incidents || [])].forEach(i => {
+                if (!knownAgencies[i.agency_id]) {
+                    knownAgencies[i.agency_id] = {
+                        name: i.agency_name || `Agency ${i.agency_id}`,
+                        activeCount: 0,
+                        recentCount: 0
+                    };
+                }
+            });
 
-                const lastUpdate = allData.last_updated ?
-                    `Last updated: ${new Date(allData.last_updated).toLocaleString()}` : 'Loading...';
-                document.getElementById('last-update').textContent = lastUpdate;
-                document.getElementById('refresh-status').textContent = 'LIVE';
+            // Server-side counts cover agencies whose incidents were not downloaded
+            const serverCounts = allData.agency_counts || {};
+            Object.entries(serverCounts).forEach(([id, counts]) => {
+                if (!knownAgencies[id]) {
+                    knownAgencies[id] = { name: `Agency ${id}`, activeCount: 0, recentCount: 0 };
+                }
+            });
+            Object.entries(knownAgencies).forEach(([id, info]) => {
+                const counts = serverCounts[id];
+                info.activeCount = counts ? counts.active : (activeByAgency[id] || 0);
+                info.recentCount = counts ? counts.recent : (recentByAgency[id] || 0);
+            });
+
+            // Initialize selection on first load
+            if (selectedAgencies.size === 0 && Object.keys(knownAgencies).length > 0) {
+                const saved = localStorage.getItem('selectedAgencies');
+                if (saved) {
+                    const parsed = JSON.parse(saved);
+                    selectedAgencies = new Set(parsed.filter(id => knownAgencies[id]));
+                }
+                if (selectedAgencies.size === 0) {
+                    selectedAgencies = new Set(Object.keys(knownAgencies));
+                }
+            }
+
+            updateAgencyFilters();
+            renderIncidents();
+
+            const lastUpdate = allData.last_updated ?
+                `Last updated: ${new Date(allData.last_updated).toLocaleString()}` : 'Loading...';
+            document.getElementById('last-update').textContent = lastUpdate;
+            document.getElementById('refresh-status').textContent = 'LIVE';
+        }
+
+        // Hours of history requested from the server for the time filter
+        function sinceHours() {
+            return { '12h': 12, '24h': 24 }[timeFilter];
+        }
+
+        // Ask the server for only the agencies and time window on display
+        function buildQuery() {
+            const params = new URLSearchParams();
+            const total = Object.keys(knownAgencies).length;
+            if (selectedAgencies.size > 0 && (total === 0 || selectedAgencies.size < total)) {
+                params.set('agencies', [...selectedAgencies].join(','));
+            }
+            const hours = sinceHours();
+            if (hours) {
+                params.set('since', Math.floor(Date.now() / 1000 - hours * 3600));
+            }
+            return params.toString();
+        }
+
+        // The same agencies/since filter as buildQuery, for incidents arriving on the stream
+        function matchesQuery(i) {
+            if (selectedAgencies.size > 0 && !selectedAgencies.has(i.agency_id)) return false;
+            const hours = sinceHours();
+            if (!hours || !i.received_time) return true;
+            return new Date(i.received_time).getTime() >= Date.now() - hours * 3600 * 1000;
+        }
 
+        async function fetchData() {
+            try {
+                const query = buildQuery();
+                const response = await fetch('/api/incidents' + (query ? '?' + query : ''));
+                allData = await response.json();
+                ingest();
             } catch (error) {
                 console.error('Fetch error:', error);
                 document.getElementById('refresh-status').textContent = 'ERROR';
             }
         }
 
-        fetchData();
-        setInterval(fetchData, REFRESH_INTERVAL);
+        // Change sets are applied idempotently, so a replayed set is harmless.
+        // The stream carries every agency: counts cover all of them, while only
+        // incidents matching the current filters are kept.
+        function applyChanges(change) {
+            const active = new Map((allData.active_incidents || []).map(i => [i.incident_id, i]));
+            const recent = new Map((allData.recent_incidents || []).map(i => [i.incident_id, i]));
+
+            // A full change set is the whole state, not a delta on what we hold
+            if (change.full) {
+                active.clear();
+                recent.clear();
+                if (allData.agency_counts) allData.agency_counts = {};
+            }
+
+            const counts = allData.agency_counts;
+            const bump = (agencyId, kind, delta) => {
+                if (!counts) return;
+                const c = counts[agencyId] || (counts[agencyId] = { active: 0, recent: 0 });
+                c[kind] = Math.max(0, c[kind] + delta);
+            };
+
+            change.added.forEach(i => {
+                if (!active.has(i.incident_id)) bump(i.agency_id, 'active', 1);
+                if (matchesQuery(i)) active.set(i.incident_id, i);
+            });
+            change.updated.forEach(u => {
+                if (matchesQuery(u.incident)) active.set(u.incident_id, u.incident);
+            });
+            // Incidents of agencies we did not download are only known to the server counts
+            const downloaded = id => selectedAgencies.size === 0 || selectedAgencies.has(id);
+            [...change.closed, ...change.removed].forEach(c => {
+                if (active.has(c.incident_id) || !downloaded(c.agency_id)) bump(c.agency_id, 'active', -1);
+                active.delete(c.incident_id);
+            });
+            change.recent_added.forEach(i => {
+                if (!recent.has(i.incident_id)) bump(i.agency_id, 'recent', 1);
+                if (matchesQuery(i)) recent.set(i.incident_id, i);
+            });
+
+            // Keep the recent window to 24 hours like the scraper does
+            const cutoff = Date.now() - 24 * 3600 * 1000;
+            for (const [id, i] of recent) {
+                if (i.received_time && new Date(i.received_time).getTime() < cutoff) recent.delete(id);
+            }
+
+            allData.active_incidents = [...active.values()];
+            allData.recent_incidents = [...recent.values()];
+            allData.sequence = change.seq;
+            allData.last_updated = change.generated_at;
+            ingest();
+        }
+
+        function connectStream() {
+            const source = new EventSource('/api/stream?after=' + (allData.sequence || 0));
+            source.addEventListener('changes', e => applyChanges(JSON.parse(e.data)));
+            source.addEventListener('resync', () => fetchData());
+            source.onopen = () => {
+                document.getElementById('refresh-status').textContent = 'LIVE';
+            };
+            source.onerror = () => {
+                // The browser reconnects on its own and resumes via Last-Event-ID
+                document.getElementById('refresh-status').textContent = 'RECONNECTING';
+            };
+        }
+
+        const savedSelection = localStorage.getItem('selectedAgencies');
+        if (savedSelection) selectedAgencies = new Set(JSON.parse(savedSelection));
+
+        fetchData().then(() => {
+            if (window.EventSource) connectStream();
+            else setInterval(fetchData, REFRESH_INTERVAL);
+        });
     </script>
 </body>
 </html>
@@ -677,7 +819,11 @@ DASHBOARD_HTML = """
 
 def load_data():
     """Load incident data from JSON file."""
-    if DATA_FILE.exists():
+    if DATA_DB:
+        data = load_snapshot(DATA_DB)
+        if data is not None:
+            return data
+    elif DATA_FILE.exists():
         try:
             with open(DATA_FILE, "r", encoding="utf-8") as f:
                 return json.load(f)
@@ -686,6 +832,221 @@ def load_data():
     return {"active_incidents": [], "recent_incidents": [], "agencies": {}, "unit_status": [], "last_updated": None}
 
 
+def _file_stamp(paths: list[Path]) -> tuple:
+    """Cheap token from mtime/size that changes whenever the files are rewritten."""
+    stamp = []
+    for path in paths:
+        try:
+            stat = path.stat()
+            stamp.append((stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            stamp.append(None)
+    return tuple(stamp)
+
+
+def _data_stamp() -> tuple:
+    return _file_stamp([Path(DATA_DB), Path(f"{DATA_DB}-wal")] if DATA_DB else [DATA_FILE])
+
+
+def _changes_stamp() -> tuple:
+    return _file_stamp([Path(DATA_DB), Path(f"{DATA_DB}-wal")] if DATA_DB else [CHANGES_FILE])
+
+
+class DataCache:
+    """
+    Parsed data plus pre-serialized, pre-compressed response bodies.
+
+    Everything is rebuilt only when the data file's mtime/size changes, so
+    serving a request costs the same regardless of how big the file is.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stamp = None
+        self._entry = None
+        self.hits = 0
+        self.misses = 0
+
+    def get(self) -> dict:
+        stamp = _data_stamp()
+        with self._lock:
+            if self._entry is not None and stamp == self._stamp:
+                self.hits += 1
+                return self._entry
+            self.misses += 1
+            self._entry = self._build(load_data(), stamp)
+            self._stamp = stamp
+            return self._entry
+
+    @staticmethod
+    def _build(data: dict, stamp: tuple) -> dict:
+        body = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        stats = {
+            "active_count": len(data.get("active_incidents", [])),
+            "recent_count": len(data.get("recent_incidents", [])),
+            "unit_count": len(data.get("unit_status", [])),
+            "agency_count": len(data.get("agencies", {})),
+            "last_updated": data.get("last_updated"),
+        }
+        bodies = {"identity": body, "gzip": gzip.compress(body, compresslevel=6)}
+        if BROTLI_AVAILABLE:
+            bodies["br"] = brotli.compress(body, quality=5)
+        etag = "-".join(f"{s[0]:x}.{s[1]:x}" if s else "0" for s in stamp)
+        return {
+            "data": data,
+            "index": build_index(data),
+            "bodies": bodies,
+            "stats_bodies": {"identity": json.dumps(stats).encode("utf-8")},
+            "etag": etag,
+        }
+
+
+def build_index(data: dict) -> dict:
+    """
+    Index incidents by agency and kind, newest first.
+
+    Returns:
+        {agency_id: {"active"|"recent": (sort_keys, incidents)}} where sort_keys
+        are negated received epochs (incidents without a time sort first)
+    """
+    index = {}
+    for kind in ("active", "recent"):
+        groups = {}
+        for inc in data.get(f"{kind}_incidents", []):
+            key = -parse_epoch(inc.get("received_time", ""), math.inf)
+            groups.setdefault(inc.get("agency_id"), []).append((key, inc))
+        for agency_id, rows in groups.items():
+            rows.sort(key=lambda row: row[0])
+            index.setdefault(agency_id, {})[kind] = ([row[0] for row in rows], [row[1] for row in rows])
+    return index
+
+
+def parse_since(value: str) -> float:
+    """Parse a since parameter given as epoch seconds or an ISO timestamp (UTC unless it has an offset)."""
+    try:
+        return float(value)
+    except ValueError:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        # Stored times are all UTC; a bare timestamp must not be read as server-local
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return parsed.timestamp()
+
+
+def query_incidents(entry: dict, agencies: list[str] = None, view: str = "all", since: float = None,
+                    call_types: set[str] = None, limit: int = None, offset: int = 0) -> dict:
+    """
+    Answer a filtered, paginated incident query from the cached indexes.
+
+    Active incidents come before recent ones, each newest first; limit and
+    offset page through that combined order.
+    """
+    data = entry["data"]
+    index = entry["index"]
+    agency_ids = agencies if agencies is not None else list(index)
+    kinds = ("active", "recent") if view == "all" else (view,)
+
+    matches = {"active": [], "recent": []}
+    for kind in kinds:
+        streams = []
+        for agency_id in agency_ids:
+            keys, incidents = index.get(agency_id, {}).get(kind, ([], []))
+            end = bisect_right(keys, -since) if since is not None else len(keys)
+            streams.append(itertools.islice(zip(keys, incidents), end))
+        merged = (inc for _, inc in heapq.merge(*streams, key=lambda row: row[0]))
+        if call_types:
+            merged = (inc for inc in merged if inc.get("call_type") in call_types)
+        matches[kind] = list(merged)
+
+    total_active = len(matches["active"])
+    total_recent = len(matches["recent"])
+    end = total_active + total_recent if limit is None else min(offset + limit, total_active + total_recent)
+
+    selected = set(agency_ids)
+    return {
+        "last_updated": data.get("last_updated"),
+        "sequence": data.get("sequence", 0),
+        "agencies": data.get("agencies", {}),
+        "agency_counts": {
+            agency_id: {kind: len(kinds_index.get(kind, ((), ()))[1]) for kind in ("active", "recent")}
+            for agency_id, kinds_index in index.items()
+        },
+        "active_incidents": matches["active"][offset:end],
+        "recent_incidents": matches["recent"][max(0, offset - total_active):max(0, end - total_active)],
+        "unit_status": [u for u in data.get("unit_status", []) if agencies is None or u.get("agency_id") in selected],
+        "total_active": total_active,
+        "total_recent": total_recent,
+        "offset": offset,
+        "next_offset": end if end < total_active + total_recent else None,
+    }
+
+
+data_cache = DataCache()
+
+
+def cached_response(bodies, etag: str) -> Response:
+    """
+    Serve a cached body, answering If-None-Match and negotiating compression.
+
+    bodies maps content-encoding to bytes, or is a callable producing that map
+    so the body is only built when the client's copy is stale.
+    """
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        if callable(bodies):
+            bodies = bodies()
+        encoding = "identity"
+        for candidate in ("br", "gzip"):
+            if candidate in bodies and candidate in request.accept_encodings:
+                encoding = candidate
+                break
+        response = Response(bodies[encoding], mimetype="application/json")
+        if encoding != "identity":
+            response.headers["Content-Encoding"] = encoding
+    response.set_etag(etag)
+    response.headers["Vary"] = "Accept-Encoding"
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+def load_change_sets(after: int) -> dict:
+    """Load change sets newer than a sequence number."""
+    if DATA_DB:
+        return load_changes(DATA_DB, after) or {"sequence": after, "changes": []}
+    try:
+        with open(CHANGES_FILE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {"sequence": after, "changes": []}
+    return {
+        "sequence": data.get("sequence", 0),
+        "changes": [c for c in data.get("changes", []) if c["seq"] > after],
+    }
+
+
+request_metrics = MetricsRegistry()
+request_metrics.define("pulsepoint_dashboard_request_seconds", "histogram", "Dashboard request latency")
+request_metrics.define("pulsepoint_dashboard_requests_total", "counter", "Dashboard requests by status")
+
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+def record_request_metrics(response: Response) -> Response:
+    # Streams stay open for as long as the client is connected
+    if request.url_rule is not None and request.url_rule.rule != "/api/stream":
+        labels = {"endpoint": request.url_rule.rule}
+        request_metrics.observe(
+            "pulsepoint_dashboard_request_seconds", time.perf_counter() - g.request_started, labels
+        )
+        request_metrics.inc("pulsepoint_dashboard_requests_total", labels={**labels, "status": response.status_code})
+    return response
+
+
 @app.route("/")
 def dashboard():
     """Serve the dashboard HTML."""
@@ -694,27 +1055,128 @@ def dashboard():
 
 @app.route("/api/incidents")
 def api_incidents():
-    """API endpoint for incident data."""
-    data = load_data()
-    return jsonify(data)
+    """
+    API endpoint for incident data.
+
+    Without parameters the whole data file is returned. Optional filters:
+    agencies (comma-separated IDs), view (all/active/recent), since (epoch
+    seconds or ISO time), call_type (comma-separated codes), limit and offset.
+    """
+    entry = data_cache.get()
+    if not request.args:
+        return cached_response(entry["bodies"], entry["etag"])
+
+    args = request.args
+    try:
+        agencies = [a for a in args["agencies"].split(",") if a] if "agencies" in args else None
+        view = args.get("view", "all")
+        if view not in ("all", "active", "recent"):
+            raise ValueError(f"unknown view {view!r}")
+        since = parse_since(args["since"]) if args.get("since") else None
+        call_types = {c for c in args.get("call_type", "").split(",") if c}
+        limit = int(args["limit"]) if args.get("limit") else None
+        offset = int(args.get("offset", 0))
+        if (limit is not None and limit < 0) or offset < 0:
+            raise ValueError("limit and offset must not be negative")
+    except ValueError as e:
+        return Response(json.dumps({"error": str(e)}), status=400, mimetype="application/json")
+
+    def build():
+        result = query_incidents(entry, agencies, view, since, call_types, limit, offset)
+        body = json.dumps(result, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        return {"identity": body, "gzip": gzip.compress(body, compresslevel=6)}
+
+    query = hashlib.sha1(request.query_string).hexdigest()[:12]
+    return cached_response(build, f"{entry['etag']}-{query}")
+
+
+@app.route("/api/stream")
+def api_stream():
+    """
+    Server-Sent Events stream of incident change sets.
+
+    Clients start from the "sequence" of the data they loaded (?after=N) and
+    the browser resumes with Last-Event-ID after a reconnect. If the requested
+    sequence is no longer available a "resync" event asks for a full reload.
+    """
+    last_event_id = request.headers.get("Last-Event-ID") or request.args.get("after")
+    try:
+        after = int(last_event_id)
+    except (TypeError, ValueError):
+        after = None
+
+    def generate():
+        last_seq = after
+        last_stamp = object()
+        last_sent = time.monotonic()
+        yield "retry: 5000\n\n"
+
+        while True:
+            stamp = _changes_stamp()
+            if stamp != last_stamp:
+                last_stamp = stamp
+                if last_seq is None:
+                    last_seq = load_change_sets(0)["sequence"]
+                result = load_change_sets(last_seq)
+                changes = result["changes"]
+
+                if result["sequence"] < last_seq or (changes and changes[0]["seq"] != last_seq + 1):
+                    # Sequence restarted or history no longer reaches back far enough
+                    last_seq = result["sequence"]
+                    yield f"id: {last_seq}\nevent: resync\ndata: {{}}\n\n"
+                    last_sent = time.monotonic()
+                    continue
+
+                for change in changes:
+                    last_seq = change["seq"]
+                    yield f"id: {last_seq}\nevent: changes\ndata: {json.dumps(change, ensure_ascii=False)}\n\n"
+                    last_sent = time.monotonic()
+
+            if time.monotonic() - last_sent >= STREAM_KEEPALIVE_SECONDS:
+                yield ": keepalive\n\n"
+                last_sent = time.monotonic()
+
+            time.sleep(STREAM_POLL_SECONDS)
+
+    return Response(generate(), mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+    })
 
 
 @app.route("/api/stats")
 def api_stats():
     """API endpoint for stats only."""
-    data = load_data()
-    active = data.get("active_incidents", [])
-    recent = data.get("recent_incidents", [])
-    units = data.get("unit_status", [])
-    agencies = data.get("agencies", {})
-
-    return jsonify({
-        "active_count": len(active),
-        "recent_count": len(recent),
-        "unit_count": len(units),
-        "agency_count": len(agencies),
-        "last_updated": data.get("last_updated")
-    })
+    entry = data_cache.get()
+    return cached_response(entry["stats_bodies"], f"{entry['etag']}-stats")
+
+
+@app.route("/metrics")
+def metrics():
+    """Prometheus metrics: the scraper's last published cycle plus dashboard health."""
+    health = MetricsRegistry()
+    health.define("pulsepoint_data_file_age_seconds", "gauge", "Seconds since the data file was last written")
+    health.define("pulsepoint_dashboard_cache_hits_total", "counter", "Requests answered from the data cache")
+    health.define("pulsepoint_dashboard_cache_misses_total", "counter", "Requests that rebuilt the data cache")
+    health.define("pulsepoint_dashboard_cache_hit_ratio", "gauge", "Data cache hits / lookups")
+
+    try:
+        mtime = max(
+            path.stat().st_mtime
+            for path in ([Path(DATA_DB), Path(f"{DATA_DB}-wal")] if DATA_DB else [DATA_FILE])
+            if path.exists()
+        )
+        health.set("pulsepoint_data_file_age_seconds", time.time() - mtime)
+    except ValueError:
+        pass  # No data file yet
+
+    hits, misses = data_cache.hits, data_cache.misses
+    health.set("pulsepoint_dashboard_cache_hits_total", hits)
+    health.set("pulsepoint_dashboard_cache_misses_total", misses)
+    health.set("pulsepoint_dashboard_cache_hit_ratio", hits / (hits + misses) if hits + misses else 0)
+
+    body = MetricsRegistry.load(METRICS_FILE).render() + health.render() + request_metrics.render()
+    return Response(body, content_type="text/plain; version=0.0.4; charset=utf-8")
 
 
 if __name__ == "__main__":
@@ -723,5 +1185,7 @@ if __name__ == "__main__":
     print("=" * 50)
     print(f"Dashboard: http://localhost:5000")
     print(f"API:       http://localhost:5000/api/incidents")
+    print(f"Stream:    http://localhost:5000/api/stream")
+    print(f"Metrics:   http://localhost:5000/metrics")
     print("=" * 50)
-    app.run(host="0.0.0.0", port=5000, debug=True)
+    app.run(host="0.0.0.0", port=5000, debug=True, threaded=True)
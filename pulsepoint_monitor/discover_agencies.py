@@ -1,17 +1,26 @@
 #!/usr/bin/env python3
 """
-PulsePoint Oregon Agency Discovery Script
+PulsePoint Agency Discovery Script
 
-Searches the PulsePoint agency API to find all Oregon fire/EMS agencies.
-Outputs discovered agencies to oregon_agencies.json.
+Searches the PulsePoint agency API to find all fire/EMS agencies in one or
+more states (Oregon by default). Outputs discovered agencies, tagged with
+their state, to oregon_agencies.json (or agencies.json for other states).
+
+Usage:
+    python discover_agencies.py
+    python discover_agencies.py --states OR,WA,ID --output northwest_agencies.json
+    python discover_agencies.py --states ALL
 
 NOTE: Uses the v1/search endpoint which returns PHP array format.
 """
 
+import argparse
 import json
 import re
 import time
 from datetime import datetime, timezone
+from typing import Optional
+
 import requests
 
 # PulsePoint agency search endpoint (returns PHP print_r format)
@@ -87,12 +96,13 @@ def parse_php_array(text: str) -> list[dict]:
     return agencies
 
 
-def extract_region_from_name(name: str) -> str:
+def extract_region_from_name(name: str, state: str = "OR") -> str:
     """
     Extract region information from agency name.
 
     Args:
         name: Agency name
+        state: The agency's state, used when no county or city is found
 
     Returns:
         Region string
@@ -113,15 +123,18 @@ def extract_region_from_name(name: str) -> str:
         if match:
             return match.group(1)
 
-    return "Oregon"
+    return state
 
 
-def discover_oregon_agencies() -> dict:
+def discover_agencies(states: Optional[set[str]] = None) -> dict:
     """
-    Discover all Oregon agencies from PulsePoint API.
+    Discover agencies from PulsePoint API.
+
+    Args:
+        states: Two-letter state codes to keep; None keeps every state
 
     Returns:
-        Dictionary with discovery timestamp and list of agencies
+        Dictionary with discovery timestamp, per-state counts and list of agencies
     """
     print("Fetching agency data from PulsePoint API...")
     raw_data = fetch_all_agencies()
@@ -131,23 +144,25 @@ def discover_oregon_agencies() -> dict:
     all_agencies = parse_php_array(raw_data)
     print(f"Found {len(all_agencies):,} total agencies")
 
-    # Filter for Oregon agencies
-    oregon_agencies = [a for a in all_agencies if a["state"] == "OR"]
-    print(f"Found {len(oregon_agencies)} Oregon agencies")
+    # Filter by state
+    matching = [a for a in all_agencies if states is None or a["state"] in states]
+    print(f"Found {len(matching):,} agencies in {', '.join(sorted(states)) if states else 'all states'}")
 
     # Enhance with known agency data and extract regions
     discovered = {}
 
-    # Add known agencies first
-    for agency_id, info in KNOWN_AGENCIES.items():
-        discovered[agency_id] = {
-            "id": agency_id,
-            "name": info["name"],
-            "region": info["region"],
-        }
+    # Add known (Oregon) agencies first
+    if states is None or "OR" in states:
+        for agency_id, info in KNOWN_AGENCIES.items():
+            discovered[agency_id] = {
+                "id": agency_id,
+                "name": info["name"],
+                "region": info["region"],
+                "state": "OR",
+            }
 
     # Add discovered agencies
-    for agency in oregon_agencies:
+    for agency in matching:
         agency_id = agency["id"]
 
         # Skip if we have better known data
@@ -157,40 +172,67 @@ def discover_oregon_agencies() -> dict:
         discovered[agency_id] = {
             "id": agency_id,
             "name": agency["name"],
-            "region": extract_region_from_name(agency["name"]),
+            "region": extract_region_from_name(agency["name"], agency["state"]),
+            "state": agency["state"],
         }
 
-    # Sort by ID
-    agencies_list = sorted(discovered.values(), key=lambda x: x["id"])
+    # Sort by state, then ID
+    agencies_list = sorted(discovered.values(), key=lambda x: (x["state"], x["id"]))
+
+    by_state = {}
+    for agency in agencies_list:
+        by_state[agency["state"]] = by_state.get(agency["state"], 0) + 1
 
     return {
         "discovered_at": datetime.now(timezone.utc).isoformat(),
         "total_agencies": len(agencies_list),
+        "states": by_state,
         "note": "Discovered via PulsePoint v1/search API",
         "agencies": agencies_list
     }
 
 
+def discover_oregon_agencies() -> dict:
+    """
+    Discover all Oregon agencies from PulsePoint API.
+
+    Returns:
+        Dictionary with discovery timestamp and list of agencies
+    """
+    return discover_agencies({"OR"})
+
+
 def main():
     """Main entry point."""
+    parser = argparse.ArgumentParser(description="Discover PulsePoint agencies by state")
+    parser.add_argument("--states", default="OR",
+                        help="Comma-separated state codes, or ALL (default OR)")
+    parser.add_argument("-o", "--output", help="Output file (default oregon_agencies.json for OR, else agencies.json)")
+    args = parser.parse_args()
+
+    states = None if args.states.strip().upper() == "ALL" else {
+        s.strip().upper() for s in args.states.split(",") if s.strip()
+    }
+    output_file = args.output or ("oregon_agencies.json" if states == {"OR"} else "agencies.json")
+
     print("=" * 60)
-    print("PulsePoint Oregon Agency Discovery")
+    print("PulsePoint Agency Discovery")
     print("=" * 60)
 
     try:
-        result = discover_oregon_agencies()
+        result = discover_agencies(states)
     except requests.RequestException as e:
         print(f"Error fetching data: {e}")
         return
 
     # Write to file
-    output_file = "oregon_agencies.json"
     with open(output_file, "w", encoding="utf-8") as f:
         json.dump(result, f, indent=2, ensure_ascii=False)
 
     print("\n" + "=" * 60)
     print(f"Discovery complete!")
-    print(f"Found {result['total_agencies']} Oregon agencies")
+    print(f"Found {result['total_agencies']} agencies: "
+          + ", ".join(f"{state} {count}" for state, count in result["states"].items()))
     print(f"Output saved to: {output_file}")
     print("=" * 60)
 
@@ -198,7 +240,7 @@ def main():
     print("\nDiscovered Agencies:")
     print("-" * 60)
     for agency in result["agencies"]:
-        print(f"  {agency['id']}: {agency['name']:<45} ({agency['region']})")
+        print(f"  {agency['id']}: [{agency['state']}] {agency['name']:<45} ({agency['region']})")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+PulsePoint SQLite Incident Store
+
+Indexed SQLite alternative to the JSON data file. Incidents and unit rows are
+upserted each cycle and history is pruned with a single indexed DELETE, so the
+store can hold weeks of incidents without each cycle getting slower.
+
+The database runs in WAL mode so the dashboard can read while the scraper writes.
+"""
+
+import json
+import logging
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS incidents (
+    incident_id TEXT PRIMARY KEY,
+    agency_id TEXT NOT NULL,
+    received_time TEXT,
+    received_epoch REAL NOT NULL,
+    is_active INTEGER NOT NULL DEFAULT 0,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_incidents_agency ON incidents(agency_id, received_epoch);
+CREATE INDEX IF NOT EXISTS idx_incidents_received ON incidents(received_epoch);
+CREATE INDEX IF NOT EXISTS idx_incidents_active ON incidents(is_active) WHERE is_active = 1;
+
+CREATE TABLE IF NOT EXISTS units (
+    agency_id TEXT NOT NULL,
+    unit_id TEXT NOT NULL,
+    incident_id TEXT NOT NULL,
+    status_code TEXT,
+    status TEXT,
+    status_color TEXT,
+    last_update TEXT,
+    seen_epoch REAL NOT NULL,
+    PRIMARY KEY (agency_id, unit_id, incident_id)
+);
+CREATE INDEX IF NOT EXISTS idx_units_incident ON units(incident_id);
+CREATE INDEX IF NOT EXISTS idx_units_seen ON units(seen_epoch);
+
+CREATE TABLE IF NOT EXISTS agencies (
+    agency_id TEXT PRIMARY KEY,
+    name TEXT,
+    last_poll TEXT
+);
+
+CREATE TABLE IF NOT EXISTS changes (
+    seq INTEGER PRIMARY KEY,
+    generated_at TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def parse_epoch(received: str, default: float) -> float:
+    """Parse an ISO received_time to epoch seconds, or return default."""
+    if not received:
+        return default
+    try:
+        return datetime.fromisoformat(received.replace("Z", "+00:00")).timestamp()
+    except (ValueError, AttributeError):
+        return default
+
+
+def json_default(obj):
+    """json.dumps default for objects that serialize themselves, such as incident records."""
+    to_dict = getattr(obj, "to_dict", None)
+    if to_dict is None:
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+    return to_dict()
+
+
+def connect(db_file: str, read_only: bool = False) -> sqlite3.Connection:
+    """Open the store, creating the schema unless read-only."""
+    if read_only:
+        conn = sqlite3.connect(f"file:{Path(db_file).as_posix()}?mode=ro", uri=True)
+    else:
+        conn = sqlite3.connect(db_file, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+    return conn
+
+
+class SQLiteOutput:
+    """Handler for indexed SQLite output."""
+
+    def __init__(self, db_file: str, logger: logging.Logger, retention_hours: float = 24 * 14,
+                 change_history: int = 50, recent_window_hours: float = 24,
+                 recent_max_incidents: Optional[int] = None):
+        self.db_file = db_file
+        self.logger = logger
+        self.retention_hours = retention_hours
+        self.change_history = change_history
+        # Bounds for the recent incidents loaded at startup; the table keeps retention_hours
+        self.recent_window_hours = recent_window_hours
+        self.recent_max_incidents = recent_max_incidents
+        self.conn = connect(db_file)
+        self.dirty = False
+
+    @property
+    def last_sequence(self) -> int:
+        row = self.conn.execute("SELECT MAX(seq) FROM changes").fetchone()
+        return row[0] or 0
+
+    def load_state(self) -> Optional[tuple[list[dict], list[dict]]]:
+        """
+        Previously written (active, recent) incidents, if any change set was stored.
+
+        Only recent incidents inside the recent window (newest first, at most
+        recent_max_incidents) are loaded, not the whole retained history.
+        """
+        if not self.last_sequence:
+            return None
+        active = [json.loads(row[0]) for row in self.conn.execute(
+            "SELECT data FROM incidents WHERE is_active = 1"
+        )]
+        cutoff = datetime.now(timezone.utc).timestamp() - self.recent_window_hours * 3600
+        limit = -1 if self.recent_max_incidents is None else self.recent_max_incidents
+        recent = [json.loads(row[0]) for row in self.conn.execute(
+            "SELECT data FROM incidents WHERE is_active = 0 AND received_epoch >= ? "
+            "ORDER BY received_epoch DESC LIMIT ?",
+            (cutoff, limit),
+        )]
+        return active, recent
+
+    def update_incidents(self, active_incidents: list[dict], recent_incidents: list[dict] = None):
+        now = datetime.now(timezone.utc).timestamp()
+        upsert = """
+            INSERT INTO incidents (incident_id, agency_id, received_time, received_epoch, is_active, data)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(incident_id) DO UPDATE SET
+                agency_id = excluded.agency_id,
+                received_time = excluded.received_time,
+                received_epoch = excluded.received_epoch,
+                is_active = excluded.is_active,
+                data = excluded.data
+        """
+
+        def rows(incidents: list[dict], is_active: int):
+            for inc in incidents:
+                received = inc.get("received_time", "")
+                # Incidents without a usable time age out from when they were last seen
+                epoch = getattr(inc, "received_epoch", None) or parse_epoch(received, now)
+                yield (
+                    inc["incident_id"], inc["agency_id"], received,
+                    epoch, is_active,
+                    json.dumps(inc, ensure_ascii=False, default=json_default),
+                )
+
+        # Incidents that dropped off the active list stay on as history
+        self.conn.execute("UPDATE incidents SET is_active = 0 WHERE is_active = 1")
+        if recent_incidents is not None:
+            self.conn.executemany(upsert, rows(recent_incidents, 0))
+        self.conn.executemany(upsert, rows(active_incidents, 1))
+
+        cutoff = now - self.retention_hours * 3600
+        self.conn.execute("DELETE FROM incidents WHERE is_active = 0 AND received_epoch < ?", (cutoff,))
+        self.dirty = True
+
+    def update_units(self, units: list[dict]):
+        now = datetime.now(timezone.utc).timestamp()
+        self.conn.executemany(
+            """
+            INSERT INTO units (agency_id, unit_id, incident_id, status_code, status,
+                               status_color, last_update, seen_epoch)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(agency_id, unit_id, incident_id) DO UPDATE SET
+                status_code = excluded.status_code,
+                status = excluded.status,
+                status_color = excluded.status_color,
+                last_update = excluded.last_update,
+                seen_epoch = excluded.seen_epoch
+            """,
+            [(
+                u["agency_id"], u["unit_id"], u["incident_id"], u["status_code"],
+                u["status"], u["status_color"], u["last_update"], now,
+            ) for u in units],
+        )
+        # Units not reported this cycle are no longer assigned
+        self.conn.execute("DELETE FROM units WHERE seen_epoch < ?", (now,))
+        self.dirty = True
+
+    def update_changes(self, changes: dict):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO changes (seq, generated_at, data) VALUES (?, ?, ?)",
+            (changes["seq"], changes["generated_at"], json.dumps(changes, ensure_ascii=False, default=json_default)),
+        )
+        self.conn.execute("DELETE FROM changes WHERE seq <= ?", (changes["seq"] - self.change_history,))
+        self.dirty = True
+
+    def update_agency_poll_time(self, agency_id: str, agency_name: str = None):
+        self.conn.execute(
+            """
+            INSERT INTO agencies (agency_id, name, last_poll) VALUES (?, ?, ?)
+            ON CONFLICT(agency_id) DO UPDATE SET
+                name = COALESCE(excluded.name, agencies.name),
+                last_poll = excluded.last_poll
+            """,
+            (agency_id, agency_name, datetime.now(timezone.utc).isoformat()),
+        )
+        self.dirty = True
+
+    def flush(self):
+        """Commit the cycle's changes in one transaction."""
+        if not self.dirty:
+            return
+        self.conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('last_updated', ?)",
+            (datetime.now(timezone.utc).isoformat(),),
+        )
+        self.conn.commit()
+        self.dirty = False
+        self.logger.info(f"Committed cycle to {self.db_file}")
+
+
+def load_snapshot(db_file: str, window_hours: float = 24) -> Optional[dict]:
+    """
+    Load the store in the same shape as pulsepoint_data.json.
+
+    Args:
+        db_file: SQLite database path
+        window_hours: How far back recent incidents are included
+
+    Returns:
+        Data dictionary, or None if the database is not readable
+    """
+    try:
+        conn = connect(db_file, read_only=True)
+    except sqlite3.Error:
+        return None
+
+    try:
+        cutoff = datetime.now(timezone.utc).timestamp() - window_hours * 3600
+        active = [json.loads(row[0]) for row in conn.execute(
+            "SELECT data FROM incidents WHERE is_active = 1 ORDER BY received_epoch DESC"
+        )]
+        recent = [json.loads(row[0]) for row in conn.execute(
+            "SELECT data FROM incidents WHERE is_active = 0 AND received_epoch >= ? ORDER BY received_epoch DESC",
+            (cutoff,),
+        )]
+        units = [
+            {
+                "unit_id": row[0], "agency_id": row[1], "incident_id": row[2],
+                "status_code": row[3], "status": row[4], "status_color": row[5],
+                "last_update": row[6],
+            }
+            for row in conn.execute(
+                "SELECT unit_id, agency_id, incident_id, status_code, status, status_color, last_update FROM units"
+            )
+        ]
+        agencies = {}
+        for agency_id, name, last_poll in conn.execute("SELECT agency_id, name, last_poll FROM agencies"):
+            agencies[agency_id] = {"last_poll": last_poll}
+            if name:
+                agencies[agency_id]["name"] = name
+        row = conn.execute("SELECT value FROM meta WHERE key = 'last_updated'").fetchone()
+        sequence = conn.execute("SELECT MAX(seq) FROM changes").fetchone()[0] or 0
+    except sqlite3.Error:
+        return None
+    finally:
+        conn.close()
+
+    return {
+        "last_updated": row[0] if row else None,
+        "sequence": sequence,
+        "agencies": agencies,
+        "active_incidents": active,
+        "recent_incidents": recent,
+        "unit_status": units,
+    }
+
+
+def load_changes(db_file: str, after: int = 0) -> Optional[dict]:
+    """
+    Load stored change sets newer than a sequence number.
+
+    Args:
+        db_file: SQLite database path
+        after: Only return change sets with a higher seq
+
+    Returns:
+        {"sequence": latest seq, "changes": [...]} or None if not readable
+    """
+    try:
+        conn = connect(db_file, read_only=True)
+    except sqlite3.Error:
+        return None
+
+    try:
+        changes = [json.loads(row[0]) for row in conn.execute(
+            "SELECT data FROM changes WHERE seq > ? ORDER BY seq", (after,)
+        )]
+        sequence = conn.execute("SELECT MAX(seq) FROM changes").fetchone()[0] or 0
+    except sqlite3.Error:
+        return None
+    finally:
+        conn.close()
+
+    return {"sequence": sequence, "changes": changes}
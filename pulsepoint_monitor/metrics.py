@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+PulsePoint Metrics
+
+Minimal Prometheus-style counters, gauges and histograms. The scraper keeps
+its metrics in a registry that is written to a JSON file after every cycle;
+the dashboard loads that file and serves it, together with its own request
+metrics, in the Prometheus text format at /metrics.
+"""
+
+import json
+import math
+import threading
+from pathlib import Path
+from typing import Optional
+
+# Seconds; suits both sub-millisecond decrypts and multi-minute cycles
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+def format_labels(labels: Optional[dict]) -> str:
+    """Render labels as the text between braces, e.g. agency="00291"."""
+    if not labels:
+        return ""
+    parts = []
+    for key in sorted(labels):
+        value = str(labels[key]).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{key}="{value}"')
+    return ",".join(parts)
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class MetricsRegistry:
+    """
+    Thread-safe set of named metrics.
+
+    Metrics are stored as plain dicts keyed by their rendered labels, so the
+    whole registry round-trips through JSON.
+    """
+
+    def __init__(self, metrics: Optional[dict] = None):
+        self._lock = threading.Lock()
+        self.metrics: dict[str, dict] = metrics or {}
+
+    def define(self, name: str, metric_type: str, help_text: str, buckets: tuple = DEFAULT_BUCKETS):
+        """
+        Register a metric if it is not already known.
+
+        Args:
+            name: Metric name, e.g. "pulsepoint_cycles_total"
+            metric_type: "counter", "gauge" or "histogram"
+            help_text: HELP line
+            buckets: Upper bounds for histograms
+        """
+        with self._lock:
+            metric = self.metrics.setdefault(name, {"type": metric_type, "help": help_text, "samples": {}})
+            if metric_type == "histogram":
+                metric.setdefault("buckets", list(buckets))
+
+    def inc(self, name: str, amount: float = 1, labels: Optional[dict] = None):
+        key = format_labels(labels)
+        with self._lock:
+            samples = self.metrics[name]["samples"]
+            samples[key] = samples.get(key, 0) + amount
+
+    def set(self, name: str, value: float, labels: Optional[dict] = None):
+        with self._lock:
+            self.metrics[name]["samples"][format_labels(labels)] = value
+
+    def observe(self, name: str, value: float, labels: Optional[dict] = None):
+        key = format_labels(labels)
+        with self._lock:
+            metric = self.metrics[name]
+            sample = metric["samples"].get(key)
+            if sample is None:
+                sample = metric["samples"][key] = {
+                    "counts": [0] * len(metric["buckets"]), "sum": 0.0, "count": 0,
+                }
+            for i, bound in enumerate(metric["buckets"]):
+                if value <= bound:
+                    sample["counts"][i] += 1
+                    break
+            sample["sum"] += value
+            sample["count"] += 1
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for name, metric in self.metrics.items():
+                lines.append(f"# HELP {name} {metric['help']}")
+                lines.append(f"# TYPE {name} {metric['type']}")
+                for key, sample in metric["samples"].items():
+                    if metric["type"] != "histogram":
+                        lines.append(f"{name}{{{key}}} {_format_value(sample)}" if key
+                                     else f"{name} {_format_value(sample)}")
+                        continue
+                    prefix = f"{key}," if key else ""
+                    cumulative = 0
+                    for bound, count in zip(metric["buckets"], sample["counts"]):
+                        cumulative += count
+                        lines.append(f'{name}_bucket{{{prefix}le="{_format_value(bound)}"}} {cumulative}')
+                    lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {sample["count"]}')
+                    suffix = f"{{{key}}}" if key else ""
+                    lines.append(f"{name}_sum{suffix} {_format_value(sample['sum'])}")
+                    lines.append(f"{name}_count{suffix} {sample['count']}")
+        return "\n".join(lines) + "\n"
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return json.loads(json.dumps(self.metrics))
+
+    @classmethod
+    def load(cls, path: Path) -> "MetricsRegistry":
+        """Load a registry written by to_dict(), or an empty one if unreadable."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return cls(json.load(f).get("metrics", {}))
+        except (OSError, json.JSONDecodeError, AttributeError):
+            return cls()
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+PulsePoint Output Writers
+
+Runs outputs (JSON file, SQLite, Sheets, ...) off the polling path. Each
+cycle's update_* calls are recorded once as a CycleSnapshot, which can then be
+applied to any output:
+
+- BackgroundOutput writes on its own thread so a slow disk or Sheets API call
+  never delays the next agency fetch. Snapshots reach the writer through a
+  small bounded queue. When the writer falls behind, waiting snapshots are
+  coalesced: the newest incidents win, while poll times, recent incidents and
+  change sets from every cycle are kept.
+- MultiOutput fans a cycle out to several outputs in parallel, isolating
+  their errors from each other.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Optional
+
+
+@dataclass
+class CycleSnapshot:
+    """One cycle's output updates, recorded so they can be applied to any output later."""
+
+    polls: dict[str, Optional[str]] = field(default_factory=dict)
+    active: Optional[list] = None
+    recent: Optional[list] = None
+    units: Optional[list] = None
+    changes: list[dict] = field(default_factory=list)
+    created: float = field(default_factory=time.monotonic)
+    cycles: int = 1
+
+    def merge(self, newer: "CycleSnapshot"):
+        """
+        Fold a newer snapshot into this one, as if both had been applied in order.
+
+        Active incidents and units are replaced by the newer ones. Recent
+        incidents are combined, since outputs accumulate them, and change sets
+        are kept in sequence order.
+        """
+        self.polls.update(newer.polls)
+        if newer.active is not None:
+            self.active = newer.active
+        if newer.recent is not None:
+            if self.recent is None:
+                self.recent = newer.recent
+            else:
+                combined = {inc["incident_id"]: inc for inc in self.recent}
+                combined.update((inc["incident_id"], inc) for inc in newer.recent)
+                self.recent = list(combined.values())
+        if newer.units is not None:
+            self.units = newer.units
+        self.changes.extend(newer.changes)
+        self.cycles += newer.cycles
+
+    def apply(self, output):
+        """Replay the updates on an output and flush it."""
+        for agency_id, agency_name in self.polls.items():
+            output.update_agency_poll_time(agency_id, agency_name)
+        if self.active is not None:
+            output.update_incidents(self.active, self.recent)
+        if self.units is not None:
+            output.update_units(self.units)
+        for changes in self.changes:
+            output.update_changes(changes)
+        output.flush()
+
+
+class SnapshotRecorder:
+    """Output interface that records a cycle's updates into a CycleSnapshot."""
+
+    def __init__(self):
+        self.pending = CycleSnapshot()
+
+    def update_agency_poll_time(self, agency_id: str, agency_name: str = None):
+        self.pending.polls[agency_id] = agency_name
+
+    def update_incidents(self, active_incidents: list, recent_incidents: list = None):
+        self.pending.active = active_incidents
+        if recent_incidents is not None:
+            self.pending.recent = recent_incidents
+
+    def update_units(self, units: list[dict]):
+        self.pending.units = units
+
+    def update_changes(self, changes: dict):
+        self.pending.changes.append(changes)
+
+    def take(self) -> CycleSnapshot:
+        """The recorded snapshot; recording starts again from empty."""
+        snapshot, self.pending = self.pending, CycleSnapshot()
+        return snapshot
+
+
+class MultiOutput(SnapshotRecorder):
+    """
+    Fans each cycle out to several outputs.
+
+    The cycle is recorded once and applied to every output in parallel. A
+    failing output is logged and counted without affecting the others.
+    """
+
+    def __init__(self, outputs: dict, logger: logging.Logger, metrics=None):
+        """
+        Args:
+            outputs: Output name -> output, e.g. {"json": ..., "sheets": ...}
+            logger: Logger for per-output timing and errors
+            metrics: Optional MetricsRegistry for per-output write metrics
+        """
+        super().__init__()
+        self.outputs = outputs
+        self.logger = logger
+        self.metrics = metrics
+        self._pool = ThreadPoolExecutor(max_workers=max(1, len(outputs)), thread_name_prefix="sink")
+
+    @property
+    def last_sequence(self) -> int:
+        return max((output.last_sequence for output in self.outputs.values()), default=0)
+
+    def load_state(self):
+        """State from the output that has seen the most recent change set."""
+        sequence = self.last_sequence
+        for output in self.outputs.values():
+            if output.last_sequence == sequence:
+                state = output.load_state()
+                if state is not None:
+                    return state
+        return None
+
+    def _write(self, name: str, snapshot: CycleSnapshot) -> tuple[float, Optional[Exception]]:
+        started = time.monotonic()
+        try:
+            snapshot.apply(self.outputs[name])
+            error = None
+        except Exception as e:
+            self.logger.exception(f"Output {name} failed: {e}")
+            error = e
+        return time.monotonic() - started, error
+
+    def flush(self):
+        """Apply the cycle to every output and wait for all of them."""
+        snapshot = self.take()
+        futures = {name: self._pool.submit(self._write, name, snapshot) for name in self.outputs}
+        for name, future in futures.items():
+            seconds, error = future.result()
+            if self.metrics:
+                self.metrics.observe("pulsepoint_output_sink_write_seconds", seconds, labels={"sink": name})
+                if error is not None:
+                    self.metrics.inc("pulsepoint_output_sink_errors_total", labels={"sink": name})
+            self.logger.info(f"Output {name}: {'failed' if error else 'written'} in {seconds:.2f}s")
+
+
+class BackgroundOutput(SnapshotRecorder):
+    """
+    Wraps an output so its writes happen on a background thread.
+
+    flush() queues the cycle's snapshot and returns immediately. At most
+    queue_size snapshots wait for the writer; a snapshot arriving at a full
+    queue is merged into the newest waiting one (latest wins).
+    """
+
+    def __init__(self, output, logger: logging.Logger, queue_size: int = 1, metrics=None):
+        """
+        Args:
+            output: The output to write to
+            logger: Logger for write errors
+            queue_size: Snapshots that may wait for the writer before coalescing
+            metrics: Optional MetricsRegistry for queue and write metrics
+        """
+        super().__init__()
+        self.output = output
+        self.logger = logger
+        self.queue_size = max(1, queue_size)
+        self.metrics = metrics
+        self._queue: deque[CycleSnapshot] = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._writing = False
+        self._stats = {
+            "submitted": 0, "written": 0, "coalesced": 0, "errors": 0,
+            "max_depth": 0, "last_write_seconds": 0.0, "last_lag_seconds": 0.0,
+        }
+        self._thread = threading.Thread(target=self._run, name="output-writer", daemon=True)
+        self._thread.start()
+
+    @property
+    def last_sequence(self) -> int:
+        return self.output.last_sequence
+
+    def load_state(self):
+        return self.output.load_state()
+
+    def flush(self):
+        """Hand the cycle's updates to the writer thread."""
+        snapshot = self.take()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Output writer is closed")
+            self._stats["submitted"] += 1
+            if len(self._queue) >= self.queue_size:
+                self._queue[-1].merge(snapshot)
+                self._stats["coalesced"] += 1
+                if self.metrics:
+                    self.metrics.inc("pulsepoint_output_coalesced_total")
+            else:
+                self._queue.append(snapshot)
+            self._stats["max_depth"] = max(self._stats["max_depth"], len(self._queue))
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if not self._queue:
+                    return
+                snapshot = self._queue.popleft()
+                self._writing = True
+
+            started = time.monotonic()
+            try:
+                snapshot.apply(self.output)
+                failed = False
+            except Exception as e:
+                self.logger.exception(f"Output write failed: {e}")
+                failed = True
+            finished = time.monotonic()
+
+            with self._cond:
+                self._writing = False
+                self._stats["errors" if failed else "written"] += 1
+                self._stats["last_write_seconds"] = finished - started
+                self._stats["last_lag_seconds"] = finished - snapshot.created
+                self._cond.notify_all()
+            if self.metrics:
+                self.metrics.observe("pulsepoint_output_write_seconds", finished - started)
+                self.metrics.set("pulsepoint_output_lag_seconds", finished - snapshot.created)
+
+    def stats(self) -> dict:
+        """Queue depth and write counters, for logs and metrics."""
+        with self._cond:
+            return {**self._stats, "depth": len(self._queue), "writing": self._writing}
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until every queued snapshot is written. Returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._queue or self._writing:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self, timeout: Optional[float] = None):
+        """Write whatever is queued, then stop the writer thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+PulsePoint Synthetic Fixtures
+
+Generates agencies and incident payloads shaped like the PulsePoint webapp
+API, encrypted into the same {"ct", "iv", "s"} envelope that
+decrypt_response() expects. Incidents are deterministic for a given seed
+(apart from times, which are relative to now).
+"""
+
+import base64
+import json
+import os
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+from pulsepoint_scraper import INCIDENT_TYPES, PULSEPOINT_PASSWORD, UNIT_STATUS, evp_bytes_to_key
+
+STREETS = ["MAIN ST", "OAK AVE", "SE DIVISION ST", "NE BROADWAY", "COMMERCIAL ST SE", "HWY 99E", "PINE LN"]
+CITIES = ["PORTLAND", "SALEM", "EUGENE", "BEND", "MEDFORD", "GRESHAM", "HILLSBORO"]
+
+
+def encrypt_payload(obj, password: bytes = PULSEPOINT_PASSWORD, salt: Optional[bytes] = None,
+                    iv: Optional[bytes] = None) -> dict:
+    """
+    Encrypt data the way the PulsePoint API does.
+
+    Args:
+        obj: JSON-serializable data (double-encoded, as the API does)
+        password: Key derivation password
+        salt: 8-byte salt (random if omitted)
+        iv: 16-byte IV (random if omitted)
+
+    Returns:
+        {"ct": base64 ciphertext, "iv": hex IV, "s": hex salt}
+    """
+    salt = salt or os.urandom(8)
+    iv = iv or os.urandom(16)
+    key, _ = evp_bytes_to_key(password, salt)
+
+    plaintext = json.dumps(json.dumps(obj)).encode("utf-8")
+    pad = 16 - len(plaintext) % 16
+    plaintext += bytes([pad]) * pad
+
+    encryptor = Cipher(algorithms.AES(key), modes.CBC(iv)).encryptor()
+    ciphertext = encryptor.update(plaintext) + encryptor.finalize()
+    return {"ct": base64.b64encode(ciphertext).decode("ascii"), "iv": iv.hex(), "s": salt.hex()}
+
+
+def make_agencies(count: int, seed: int = 0, states: tuple[str, ...] = ("OR",)) -> list[dict]:
+    """
+    Synthetic agencies in the agencies file shape, with IDs T00000, T00001, ...
+
+    Agencies are spread round-robin over states.
+    """
+    rng = random.Random(seed)
+    return [
+        {
+            "id": f"T{i:05d}",
+            "name": f"{rng.choice(CITIES).title()} Fire District {i}",
+            "region": f"{rng.choice(CITIES).title()} County",
+            "state": states[i % len(states)],
+        }
+        for i in range(count)
+    ]
+
+
+def make_incident(agency_id: str, index: int, rng: random.Random, now: datetime,
+                  active: bool = True) -> dict:
+    """One raw incident as returned by resource=incidents."""
+    received = now - timedelta(minutes=rng.randint(1, 90 if active else 1400))
+    units = []
+    for _ in range(rng.randint(1, 4) if active else rng.randint(0, 2)):
+        status = rng.choice(list(UNIT_STATUS)) if active else "AR"
+        units.append({
+            "UnitID": f"{rng.choice('EMTBR')}{rng.randint(1, 999)}",
+            "PulsePointDispatchStatus": status,
+        })
+    incident = {
+        "ID": f"{agency_id}{index:07d}",
+        "AgencyID": agency_id,
+        "PulsePointIncidentCallType": rng.choice(list(INCIDENT_TYPES)),
+        "FullDisplayAddress": f"{rng.randint(100, 29999)} {rng.choice(STREETS)}, {rng.choice(CITIES)}, OR",
+        "Latitude": f"{rng.uniform(42.0, 46.2):.10f}",
+        "Longitude": f"{rng.uniform(-124.5, -116.5):.10f}",
+        "CallReceivedDateTime": received.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "AlarmLevel": str(rng.choice([0, 1, 1, 1, 2])),
+        "Unit": units,
+    }
+    if not active:
+        incident["ClosedDateTime"] = (received + timedelta(minutes=rng.randint(5, 120))).strftime("%Y-%m-%dT%H:%M:%SZ")
+    return incident
+
+
+def make_incidents_payload(agency_id: str, active: int, recent: int, seed: int = 0,
+                           now: Optional[datetime] = None) -> dict:
+    """
+    Decrypted resource=incidents data for one agency.
+
+    Args:
+        agency_id: Agency ID the incidents belong to
+        active: Number of active incidents
+        recent: Number of recent (closed) incidents
+        seed: Random seed; the same seed gives the same incidents
+        now: Reference time for received times (defaults to now)
+
+    Returns:
+        {"incidents": {"active": [...], "recent": [...]}}
+    """
+    rng = random.Random(f"{agency_id}:{seed}")
+    now = now or datetime.now(timezone.utc)
+    return {
+        "incidents": {
+            "active": [make_incident(agency_id, i, rng, now, active=True) for i in range(active)],
+            "recent": [make_incident(agency_id, active + i, rng, now, active=False) for i in range(recent)],
+        }
+    }
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+PulsePoint Load Test
+
+Runs full poll cycles for thousands of agencies spread over several states
+against the stand-in API (pulsepoint_standin.py) and checks them against a
+cycle-time target. Reports per-cycle wall time, output write time, resident
+memory and output size, so growth across cycles is visible.
+
+By default the stand-in runs in this process; point --api-base at a separate
+stand-in for numbers that do not share a CPU with the server.
+
+Usage:
+    python pulsepoint_loadtest.py                          # 5,000 agencies, 2-minute target
+    python pulsepoint_loadtest.py --agencies 1000 --cycles 5 --states OR,WA
+"""
+
+import argparse
+import json
+import resource
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from pulsepoint_scraper import PulsePointScraper
+from pulsepoint_standin import StandInAPI, make_server, write_scraper_config
+
+
+def rss_mb() -> float:
+    """Current resident set size in MB (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            pages = int(f.read().split()[1])
+        return pages * resource.getpagesize() / 1024 / 1024
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def output_bytes(workdir: Path) -> int:
+    """Total size of everything the scraper wrote (outputs, change sets, state)."""
+    inputs = {"loadtest_config.json", "standin_agencies.json"}
+    return sum(p.stat().st_size for p in workdir.rglob("*") if p.is_file() and p.name not in inputs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the poll loop against the stand-in API")
+    parser.add_argument("--agencies", type=int, default=5000, help="Number of agencies")
+    parser.add_argument("--states", default="OR,WA,ID,CA,NV", help="States to spread the agencies over")
+    parser.add_argument("--cycles", type=int, default=3, help="Poll cycles to run")
+    parser.add_argument("--target", type=float, default=120, help="Cycle time target in seconds")
+    parser.add_argument("--concurrency", type=int, default=64, help="max_concurrent_requests")
+    parser.add_argument("--rate", type=float, default=100, help="requests_per_second")
+    parser.add_argument("--latency", type=float, default=80, help="Stand-in mean latency in ms")
+    parser.add_argument("--jitter", type=float, default=20, help="Stand-in latency deviation in ms")
+    parser.add_argument("--error-rate", type=float, default=0.01, help="Stand-in error rate")
+    parser.add_argument("--output-mode", default="sharded", help="Scraper output_mode (default sharded)")
+    parser.add_argument("--api-base", help="Use an already running stand-in instead of starting one")
+    parser.add_argument("--workdir", help="Directory for config and output (default: a temporary one)")
+    parser.add_argument("--results", metavar="FILE", help="Write the per-cycle results as JSON")
+    args = parser.parse_args()
+
+    workdir = Path(args.workdir or tempfile.mkdtemp(prefix="pulsepoint_load_"))
+    workdir.mkdir(parents=True, exist_ok=True)
+    states = tuple(s.strip().upper() for s in args.states.split(",") if s.strip())
+
+    # Incidents change once per target cycle, as a busy real feed would
+    api = StandInAPI(agency_count=args.agencies, change_interval=args.target, latency_ms=args.latency,
+                     jitter_ms=args.jitter, error_rate=args.error_rate, states=states)
+    api_base = args.api_base
+    if api_base is None:
+        server = make_server(api, port=0)
+        threading.Thread(target=server.serve_forever, name="standin", daemon=True).start()
+        api_base = f"http://127.0.0.1:{server.server_port}/v1/webapp"
+
+    config_file = workdir / "loadtest_config.json"
+    config = write_scraper_config(str(config_file), api, api_base, str(workdir))
+    config.update({
+        "output_mode": args.output_mode,
+        "shard_dir": str(workdir / "agencies"),
+        "max_concurrent_requests": args.concurrency,
+        "requests_per_second": args.rate,
+        "log_level": "WARNING",
+    })
+    with open(config_file, "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=2)
+
+    print(f"{args.agencies} agencies in {len(states)} states against {api_base}, "
+          f"{args.concurrency} workers at {args.rate:g} req/s, target {args.target:g}s per cycle")
+    scraper = PulsePointScraper(str(config_file))
+    results = []
+    try:
+        for cycle in range(1, args.cycles + 1):
+            started = time.monotonic()
+            scraper.run_once()
+            polled = time.monotonic() - started
+            if hasattr(scraper.output, "wait"):
+                scraper.output.wait()
+            written = time.monotonic() - started
+            result = {
+                "cycle": cycle,
+                "poll_seconds": polled,
+                "total_seconds": written,
+                "rss_mb": rss_mb(),
+                "output_bytes": output_bytes(workdir),
+                "active_incidents": sum(len(active) for active, _ in scraper.latest.values()),
+            }
+            results.append(result)
+            print(f"cycle {cycle}: polled in {polled:6.1f}s, written by {written:6.1f}s, "
+                  f"RSS {result['rss_mb']:7.1f}MB, output {result['output_bytes'] / 1024 / 1024:7.1f}MB, "
+                  f"{result['active_incidents']} active incidents")
+    finally:
+        scraper.close()
+
+    print(f"Stand-in served {api.requests} requests ({api.errors} errors)" if args.api_base is None else "")
+    if args.results:
+        with open(args.results, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "results": results}, f, indent=2)
+
+    worst = max(r["total_seconds"] for r in results)
+    verdict = "PASS" if worst <= args.target else "FAIL"
+    print(f"{verdict}: slowest cycle {worst:.1f}s against a {args.target:g}s target")
+    sys.exit(0 if verdict == "PASS" else 1)
+
+
+if __name__ == "__main__":
+    main()
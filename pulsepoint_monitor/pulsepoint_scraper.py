@@ -8,19 +8,30 @@ Outputs to Google Sheets or local JSON.
 NO AUTHENTICATION REQUIRED - Uses the public webapp API endpoint.
 """
 
-import base64
+import binascii
 import hashlib
+import heapq
+import importlib.util
 import json
 import logging
+import math
 import os
+import random
 import sys
+import tempfile
+import threading
 import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Optional
 
 import requests
-import schedule
+from requests.adapters import HTTPAdapter
 
 try:
     import gspread
@@ -29,13 +40,37 @@ try:
 except ImportError:
     GSPREAD_AVAILABLE = False
 
+try:
+    import httpx
+    # httpx only negotiates HTTP/2 when h2 is installed
+    HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 from cryptography.hazmat.backends import default_backend
 
+from incident_store import SQLiteOutput, json_default, parse_epoch
+from metrics import MetricsRegistry
+from output_writer import BackgroundOutput, MultiOutput
+from workers import WorkerGroup, load_partials
+
 # PulsePoint API configuration
-PULSEPOINT_API_BASE = "https://api.pulsepoint.org/v1/webapp"
+# Override to run against a local stand-in (see pulsepoint_standin.py)
+PULSEPOINT_API_BASE = os.environ.get("PULSEPOINT_API_BASE", "https://api.pulsepoint.org/v1/webapp")
 PULSEPOINT_PASSWORD = b"tombrady5rings"  # Decoded from web app JS
 
+REQUEST_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+    'Accept': 'application/json',
+}
+
 # Incident type descriptions
 INCIDENT_TYPES = {
     "ME": "Medical Emergency",
@@ -107,6 +142,130 @@ def evp_bytes_to_key(password: bytes, salt: bytes, key_len: int = 32, iv_len: in
     return d[:key_len], d[key_len:key_len + iv_len]
 
 
+class DecryptionEngine:
+    """
+    Reusable AES-256-CBC decryptor for PulsePoint responses.
+
+    Derived keys are kept in a bounded LRU cache keyed by salt, so repeated
+    salts skip the iterated-MD5 key derivation. Ciphertext is decrypted into
+    a per-thread buffer that is reused across calls.
+    """
+
+    def __init__(self, password: bytes = PULSEPOINT_PASSWORD, key_cache_size: int = 1024):
+        self.password = password
+        self.key_cache_size = max(1, key_cache_size)
+        self._keys: OrderedDict[bytes, algorithms.AES] = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.key_hits = 0
+        self.key_misses = 0
+
+    def _algorithm(self, salt: bytes) -> algorithms.AES:
+        with self._lock:
+            algorithm = self._keys.get(salt)
+            if algorithm is not None:
+                self._keys.move_to_end(salt)
+                self.key_hits += 1
+                return algorithm
+
+        key, _ = evp_bytes_to_key(self.password, salt)
+        algorithm = algorithms.AES(key)
+
+        with self._lock:
+            self.key_misses += 1
+            self._keys[salt] = algorithm
+            if len(self._keys) > self.key_cache_size:
+                self._keys.popitem(last=False)
+        return algorithm
+
+    def _buffer(self, size: int) -> bytearray:
+        buf = getattr(self._local, "buffer", None)
+        if buf is None or len(buf) < size:
+            buf = bytearray(max(size, 2 * len(buf) if buf else 4096))
+            self._local.buffer = buf
+        return buf
+
+    def decrypt_payload(self, data: dict) -> bytes:
+        """
+        Decrypt a PulsePoint API response to its plaintext bytes.
+
+        Args:
+            data: Dictionary with ct (ciphertext), iv, and s (salt)
+
+        Returns:
+            Unpadded plaintext
+        """
+        ct = binascii.a2b_base64(data["ct"])
+        iv = bytes.fromhex(data["iv"])
+        algorithm = self._algorithm(bytes.fromhex(data["s"]))
+
+        decryptor = Cipher(algorithm, modes.CBC(iv), backend=default_backend()).decryptor()
+        buf = self._buffer(len(ct) + 15)
+        length = decryptor.update_into(ct, buf)
+        decryptor.finalize()
+
+        pad_len = buf[length - 1]
+        with memoryview(buf) as view:
+            return bytes(view[:length - pad_len])
+
+    def decrypt(self, data: dict) -> dict:
+        """Decrypt a PulsePoint API response to JSON data."""
+        return decode_plaintext(self.decrypt_payload(data))
+
+    def decrypt_many(self, payloads: list[dict]) -> list[Optional[dict]]:
+        """
+        Decrypt a batch of responses, deriving each distinct salt's key once.
+
+        Args:
+            payloads: Dictionaries with ct, iv and s
+
+        Returns:
+            Decrypted JSON data in input order, None where a payload failed
+        """
+        for salt in {p.get("s") for p in payloads if isinstance(p, dict)}:
+            try:
+                self._algorithm(bytes.fromhex(salt))
+            except (TypeError, ValueError):
+                pass
+
+        results = []
+        for payload in payloads:
+            try:
+                results.append(self.decrypt(payload))
+            except Exception:
+                results.append(None)
+        return results
+
+    def stats(self) -> dict:
+        return {"key_hits": self.key_hits, "key_misses": self.key_misses, "cached_keys": len(self._keys)}
+
+
+_default_engine = DecryptionEngine()
+
+
+def decrypt_payload(data: dict) -> bytes:
+    """
+    Decrypt a PulsePoint API response to its plaintext bytes.
+
+    Args:
+        data: Dictionary with ct (ciphertext), iv, and s (salt)
+
+    Returns:
+        Unpadded plaintext
+    """
+    return _default_engine.decrypt_payload(data)
+
+
+def decode_plaintext(plaintext: bytes) -> dict:
+    """Decode decrypted plaintext to JSON data."""
+    result = json.loads(plaintext.decode('utf-8'))
+    # Handle double-encoded JSON
+    if isinstance(result, str):
+        result = json.loads(result)
+
+    return result
+
+
 def decrypt_response(data: dict) -> dict:
     """
     Decrypt PulsePoint API response.
@@ -117,86 +276,192 @@ def decrypt_response(data: dict) -> dict:
     Returns:
         Decrypted JSON data
     """
-    ct = base64.b64decode(data["ct"])
-    iv = bytes.fromhex(data["iv"])
-    salt = bytes.fromhex(data["s"])
+    return decode_plaintext(decrypt_payload(data))
 
-    key, _ = evp_bytes_to_key(PULSEPOINT_PASSWORD, salt)
 
-    cipher = Cipher(algorithms.AES(key), modes.CBC(iv), backend=default_backend())
-    decryptor = cipher.decryptor()
-    padded = decryptor.update(ct) + decryptor.finalize()
+def extract_encrypted(body: bytes) -> Optional[dict]:
+    """Decode a raw response body, returning None if encryption fields are missing."""
+    encrypted = json.loads(body)
+    if not isinstance(encrypted, dict) or not all(k in encrypted for k in ("ct", "iv", "s")):
+        return None
+    return encrypted
 
-    pad_len = padded[-1]
-    plaintext = padded[:-pad_len].decode('utf-8')
 
-    result = json.loads(plaintext)
-    # Handle double-encoded JSON
-    if isinstance(result, str):
-        result = json.loads(result)
+class PulsePointTransport:
+    """
+    Pooled keep-alive HTTP transport shared by all PulsePoint API calls.
+
+    Uses a requests Session with a sized connection pool, or an HTTP/2
+    httpx client (one multiplexed connection) when enabled and available.
+    """
+
+    def __init__(self, pool_size: int = 10, timeout: float = 30, http2: bool = False,
+                 logger: Optional[logging.Logger] = None, api_base: Optional[str] = None):
+        self.api_base = api_base or PULSEPOINT_API_BASE
+        self.pool_size = max(1, pool_size)
+        self.timeout = timeout
+        self.logger = logger or logging.getLogger("pulsepoint")
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self.warmed = False
+
+        if http2 and not HTTP2_AVAILABLE:
+            self.logger.warning("HTTP/2 requested but httpx[http2] is not installed, using HTTP/1.1")
+
+        if self.http2:
+            self.client = httpx.Client(
+                http2=True,
+                headers=REQUEST_HEADERS,
+                timeout=timeout,
+                limits=httpx.Limits(max_connections=self.pool_size,
+                                    max_keepalive_connections=self.pool_size),
+            )
+            self.errors = (requests.RequestException, httpx.HTTPError)
+        else:
+            self.client = requests.Session()
+            self.client.headers.update(REQUEST_HEADERS)
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+            self.client.mount("https://", adapter)
+            self.client.mount("http://", adapter)
+            self.errors = (requests.RequestException,)
+
+    def get(self, url: str):
+        """GET a URL over a pooled connection."""
+        return self.client.get(url, timeout=self.timeout)
+
+    def warm_up(self, connections: int = 1, limiter: Optional["RateLimiter"] = None):
+        """
+        Open keep-alive connections before the first agency request.
+
+        Only the first call probes; later cycles reuse the pooled connections,
+        which reconnect on demand if the server has closed them.
+
+        Args:
+            connections: Number of parallel connections to establish
+                (HTTP/2 multiplexes over a single one)
+            limiter: Rate limiter each probe takes a slot from, like any other request
+        """
+        if self.warmed:
+            return
+        self.warmed = True
+        count = 1 if self.http2 else min(max(1, connections), self.pool_size)
+
+        def probe():
+            try:
+                if limiter is not None:
+                    limiter.acquire()
+                self.client.head(self.api_base, timeout=self.timeout)
+            except Exception as e:
+                self.logger.debug(f"Connection warm-up failed - {e}")
+
+        threads = [threading.Thread(target=probe, daemon=True) for _ in range(count)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    def close(self):
+        self.client.close()
 
-    return result
 
+_default_transport: Optional[PulsePointTransport] = None
+_default_transport_lock = threading.Lock()
 
-def fetch_incidents(agency_id: str, logger: logging.Logger) -> Optional[dict]:
+
+def get_default_transport() -> PulsePointTransport:
+    """Return the shared module-level transport, creating it on first use."""
+    global _default_transport
+    with _default_transport_lock:
+        if _default_transport is None:
+            _default_transport = PulsePointTransport()
+        return _default_transport
+
+
+def fetch_incidents_payload(agency_id: str, logger: logging.Logger,
+                            transport: Optional[PulsePointTransport] = None,
+                            timings: Optional["CycleTimings"] = None) -> Optional[bytes]:
     """
-    Fetch incidents for an agency.
+    Fetch the raw (still encrypted) incidents response body for an agency.
 
     Args:
         agency_id: PulsePoint agency ID (e.g., "00291")
         logger: Logger instance
+        transport: Shared HTTP transport (defaults to the module transport)
+        timings: Records "fetch" (whole request) and "fetch_first_byte" stages
+            and counts "fetched_bytes"
 
     Returns:
-        Incidents data or None on error
+        Response body bytes or None on error
     """
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-        'Accept': 'application/json',
-    }
-
-    url = f"{PULSEPOINT_API_BASE}?resource=incidents&agencyid={agency_id}"
+    transport = transport or get_default_transport()
+    url = f"{transport.api_base}?resource=incidents&agencyid={agency_id}"
 
     try:
-        response = requests.get(url, headers=headers, timeout=30)
+        started = time.perf_counter()
+        response = transport.get(url)
+        if timings is not None:
+            timings.record("fetch", time.perf_counter() - started, agency_id)
+            # Both requests and httpx measure elapsed up to the response headers
+            timings.record("fetch_first_byte", response.elapsed.total_seconds(), agency_id)
         response.raise_for_status()
+        if timings is not None:
+            timings.count("fetched_bytes", len(response.content))
+        return response.content
+
+    except transport.errors as e:
+        logger.error(f"Agency {agency_id}: Request failed - {e}")
+        return None
 
-        encrypted = response.json()
 
-        if not all(k in encrypted for k in ("ct", "iv", "s")):
+def fetch_incidents(agency_id: str, logger: logging.Logger,
+                    transport: Optional[PulsePointTransport] = None) -> Optional[dict]:
+    """
+    Fetch incidents for an agency.
+
+    Args:
+        agency_id: PulsePoint agency ID (e.g., "00291")
+        logger: Logger instance
+        transport: Shared HTTP transport (defaults to the module transport)
+
+    Returns:
+        Incidents data or None on error
+    """
+    body = fetch_incidents_payload(agency_id, logger, transport)
+    if body is None:
+        return None
+
+    try:
+        encrypted = extract_encrypted(body)
+
+        if encrypted is None:
             logger.warning(f"Agency {agency_id}: Response missing encryption fields")
             return None
 
         decrypted = decrypt_response(encrypted)
         return decrypted.get("incidents", {})
 
-    except requests.RequestException as e:
-        logger.error(f"Agency {agency_id}: Request failed - {e}")
-        return None
     except Exception as e:
         logger.error(f"Agency {agency_id}: Error - {e}")
         return None
 
 
-def fetch_agency_info(agency_id: str, logger: logging.Logger) -> Optional[dict]:
+def fetch_agency_info(agency_id: str, logger: logging.Logger,
+                      transport: Optional[PulsePointTransport] = None) -> Optional[dict]:
     """
     Fetch agency metadata.
 
     Args:
         agency_id: PulsePoint agency ID
         logger: Logger instance
+        transport: Shared HTTP transport (defaults to the module transport)
 
     Returns:
         Agency info or None on error
     """
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-        'Accept': 'application/json',
-    }
-
-    url = f"{PULSEPOINT_API_BASE}?resource=agencies&agencyid={agency_id}"
+    transport = transport or get_default_transport()
+    url = f"{transport.api_base}?resource=agencies&agencyid={agency_id}"
 
     try:
-        response = requests.get(url, headers=headers, timeout=30)
+        response = transport.get(url)
         response.raise_for_status()
 
         decrypted = decrypt_response(response.json())
@@ -211,25 +476,22 @@ def fetch_agency_info(agency_id: str, logger: logging.Logger) -> Optional[dict]:
         return None
 
 
-def search_agencies(search_term: str) -> list[dict]:
+def search_agencies(search_term: str, transport: Optional[PulsePointTransport] = None) -> list[dict]:
     """
     Search for agencies by name/location.
 
     Args:
         search_term: Search query
+        transport: Shared HTTP transport (defaults to the module transport)
 
     Returns:
         List of matching agencies
     """
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-        'Accept': 'application/json',
-    }
-
-    url = f"{PULSEPOINT_API_BASE}?resource=searchagencies&token={search_term}"
+    transport = transport or get_default_transport()
+    url = f"{transport.api_base}?resource=searchagencies&token={search_term}"
 
     try:
-        response = requests.get(url, headers=headers, timeout=30)
+        response = transport.get(url)
         response.raise_for_status()
 
         decrypted = decrypt_response(response.json())
@@ -239,77 +501,1027 @@ def search_agencies(search_term: str) -> list[dict]:
         return []
 
 
-def parse_incidents(incidents_data: dict, agency_id: str, agency_name: str, incident_type: str = "active") -> list[dict]:
-    """Parse incidents from API response."""
-    incidents = []
+def _intern_text(value, default: str = "") -> str:
+    # The API occasionally sends null (or a number) where a string is expected
+    return sys.intern(default if value is None else str(value))
 
-    for incident in incidents_data.get(incident_type, []):
-        units = []
-        for unit in incident.get("Unit", []):
-            unit_id = unit.get("UnitID", "Unknown")
-            status_code = unit.get("PulsePointDispatchStatus", "")
-            status_info = UNIT_STATUS.get(status_code, {"color": "unknown", "description": status_code})
 
-            units.append({
-                "unit_id": unit_id,
-                "status_code": status_code,
-                "status": status_info["description"],
-                "status_color": status_info["color"],
-            })
+def _to_float(value) -> Optional[float]:
+    try:
+        return float(value) if value not in (None, "") else None
+    except (TypeError, ValueError):
+        return None
 
-        call_type = incident.get("PulsePointIncidentCallType", "UNK")
-        call_type_desc = INCIDENT_TYPES.get(call_type, call_type)
-
-        parsed = {
-            "incident_id": incident.get("ID", ""),
-            "agency_id": agency_id,
-            "agency_name": agency_name,
-            "call_type": call_type,
-            "call_type_description": call_type_desc,
-            "address": incident.get("FullDisplayAddress", ""),
-            "latitude": incident.get("Latitude", ""),
-            "longitude": incident.get("Longitude", ""),
-            "received_time": incident.get("CallReceivedDateTime", ""),
-            "alarm_level": incident.get("AlarmLevel", ""),
-            "units": units,
+
+def _format_coordinate(value: Optional[float]) -> str:
+    # PulsePoint sends coordinates with 10 decimal places
+    return "" if value is None else f"{value:.10f}"
+
+
+def _format_received(epoch: float) -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(epoch))
+
+
+def _unit_status_text(status_code: str) -> tuple[str, str]:
+    """(description, color) for a unit status code."""
+    info = UNIT_STATUS.get(status_code)
+    if info is None:
+        return status_code, "unknown"
+    return info["description"], info["color"]
+
+
+@lru_cache(maxsize=256)
+def _format_fetched(epoch: float) -> str:
+    # Every incident parsed in the same call shares one fetch time
+    return datetime.fromtimestamp(epoch, timezone.utc).isoformat()
+
+
+@dataclass(slots=True)
+class UnitRecord:
+    """A unit assigned to an incident. Status text and color come from UNIT_STATUS."""
+
+    unit_id: str
+    status_code: str
+
+    @property
+    def status(self) -> str:
+        return _unit_status_text(self.status_code)[0]
+
+    @property
+    def status_color(self) -> str:
+        return _unit_status_text(self.status_code)[1]
+
+    def __getitem__(self, key: str):
+        if key not in ("unit_id", "status_code", "status", "status_color"):
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def to_dict(self) -> dict:
+        description, color = _unit_status_text(self.status_code)
+        return {
+            "unit_id": self.unit_id,
+            "status_code": self.status_code,
+            "status": description,
+            "status_color": color,
+        }
+
+    @classmethod
+    def from_dict(cls, unit) -> "UnitRecord":
+        if isinstance(unit, cls):
+            return unit
+        return cls(_intern_text(unit.get("unit_id"), "Unknown"), _intern_text(unit.get("status_code")))
+
+
+@dataclass(slots=True)
+class IncidentRecord:
+    """
+    Compact in-memory incident.
+
+    Repeated strings are interned, coordinates are floats and times are epoch
+    seconds; derived fields (call type description, unit count and display)
+    are computed on access. Reads like the incident dict it replaces, and
+    to_dict() produces the published JSON shape.
+    """
+
+    incident_id: str
+    agency_id: str
+    agency_name: str
+    call_type: str
+    address: str
+    latitude: Optional[float]
+    longitude: Optional[float]
+    received_epoch: Optional[float]
+    alarm_level: str
+    units: tuple[UnitRecord, ...]
+    is_active: bool
+    # Not part of equality: a re-fetched, unchanged incident compares equal
+    fetched_epoch: float = field(compare=False)
+    # Only kept when received_time does not round-trip through received_epoch
+    received_raw: Optional[str] = None
+
+    FIELDS = (
+        "incident_id", "agency_id", "agency_name", "call_type", "call_type_description",
+        "address", "latitude", "longitude", "received_time", "alarm_level", "units",
+        "unit_count", "units_display", "is_active", "fetched_at",
+    )
+
+    @property
+    def call_type_description(self) -> str:
+        return INCIDENT_TYPES.get(self.call_type, self.call_type)
+
+    @property
+    def received_time(self) -> str:
+        if self.received_raw is not None or self.received_epoch is None:
+            return self.received_raw or ""
+        return _format_received(self.received_epoch)
+
+    @property
+    def unit_count(self) -> int:
+        return len(self.units)
+
+    @property
+    def units_display(self) -> str:
+        return ", ".join(u.unit_id for u in self.units)
+
+    @property
+    def fetched_at(self) -> str:
+        return _format_fetched(self.fetched_epoch)
+
+    def __getitem__(self, key: str):
+        if key == "latitude":
+            return _format_coordinate(self.latitude)
+        if key == "longitude":
+            return _format_coordinate(self.longitude)
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.FIELDS
+
+    def keys(self):
+        return iter(self.FIELDS)
+
+    def items(self):
+        return self.to_dict().items()
+
+    def to_dict(self) -> dict:
+        units = self.units
+        return {
+            "incident_id": self.incident_id,
+            "agency_id": self.agency_id,
+            "agency_name": self.agency_name,
+            "call_type": self.call_type,
+            "call_type_description": INCIDENT_TYPES.get(self.call_type, self.call_type),
+            "address": self.address,
+            "latitude": _format_coordinate(self.latitude),
+            "longitude": _format_coordinate(self.longitude),
+            "received_time": self.received_time,
+            "alarm_level": self.alarm_level,
+            "units": [u.to_dict() for u in units],
             "unit_count": len(units),
-            "units_display": ", ".join(u["unit_id"] for u in units),
-            "is_active": incident_type == "active",
-            "fetched_at": datetime.now(timezone.utc).isoformat(),
+            "units_display": ", ".join(u.unit_id for u in units),
+            "is_active": self.is_active,
+            "fetched_at": _format_fetched(self.fetched_epoch),
         }
-        incidents.append(parsed)
+
+    def refetched(self, fetched_epoch: float) -> "IncidentRecord":
+        """A copy with a new fetch time (positional, several times faster than dataclasses.replace)."""
+        return IncidentRecord(
+            self.incident_id, self.agency_id, self.agency_name, self.call_type, self.address,
+            self.latitude, self.longitude, self.received_epoch, self.alarm_level, self.units,
+            self.is_active, fetched_epoch, self.received_raw,
+        )
+
+    @classmethod
+    def from_dict(cls, inc) -> "IncidentRecord":
+        """Rebuild a record from its JSON shape (e.g. previously written data)."""
+        if isinstance(inc, cls):
+            return inc
+        received = inc.get("received_time", "")
+        epoch = parse_epoch(received, None)
+        fetched = parse_epoch(inc.get("fetched_at", ""), None)
+        return cls(
+            incident_id=inc.get("incident_id", ""),
+            agency_id=sys.intern(inc.get("agency_id", "")),
+            agency_name=sys.intern(inc.get("agency_name") or ""),
+            call_type=_intern_text(inc.get("call_type"), "UNK"),
+            address=inc.get("address", ""),
+            latitude=_to_float(inc.get("latitude")),
+            longitude=_to_float(inc.get("longitude")),
+            received_epoch=epoch,
+            alarm_level=_intern_text(inc.get("alarm_level")),
+            units=tuple(UnitRecord.from_dict(u) for u in inc.get("units", [])),
+            is_active=bool(inc.get("is_active", False)),
+            fetched_epoch=fetched if fetched is not None else time.time(),
+            received_raw=None if epoch is not None and _format_received(epoch) == received else received,
+        )
+
+
+def parse_incidents(incidents_data: dict, agency_id: str, agency_name: str,
+                    incident_type: str = "active") -> list[IncidentRecord]:
+    """Parse incidents from API response."""
+    incidents = []
+    agency_id = sys.intern(agency_id)
+    agency_name = sys.intern(agency_name)
+    is_active = incident_type == "active"
+    fetched = time.time()
+
+    for incident in incidents_data.get(incident_type, []):
+        units = tuple(
+            UnitRecord(
+                _intern_text(unit.get("UnitID"), "Unknown"),
+                _intern_text(unit.get("PulsePointDispatchStatus")),
+            )
+            for unit in incident.get("Unit", [])
+        )
+
+        received = incident.get("CallReceivedDateTime", "")
+        epoch = parse_epoch(received, None)
+
+        incidents.append(IncidentRecord(
+            incident_id=incident.get("ID", ""),
+            agency_id=agency_id,
+            agency_name=agency_name,
+            call_type=_intern_text(incident.get("PulsePointIncidentCallType"), "UNK"),
+            address=incident.get("FullDisplayAddress", ""),
+            latitude=_to_float(incident.get("Latitude")),
+            longitude=_to_float(incident.get("Longitude")),
+            received_epoch=epoch,
+            alarm_level=_intern_text(incident.get("AlarmLevel")),
+            units=units,
+            is_active=is_active,
+            fetched_epoch=fetched,
+            received_raw=None if epoch is not None and _format_received(epoch) == received else received,
+        ))
 
     return incidents
 
 
-def parse_unit_status(incidents: list[dict]) -> list[dict]:
+def mark_fetched(parsed: tuple[list[IncidentRecord], list[IncidentRecord]]) -> tuple:
+    """
+    Copies of reused (active, recent) incidents stamped with the current fetch time.
+
+    The cached records are shared with outputs writing on another thread and
+    with the delta tracker, so they are never modified in place.
+    """
+    fetched = time.time()
+    return tuple([inc.refetched(fetched) for inc in incidents] for incidents in parsed)
+
+
+def parse_unit_status(incidents: list[IncidentRecord]) -> list[dict]:
     """Extract unit status records from incidents."""
     unit_records = []
     timestamp = datetime.now(timezone.utc).isoformat()
 
     for incident in incidents:
-        for unit in incident.get("units", []):
+        for unit in incident.units:
+            description, color = _unit_status_text(unit.status_code)
             unit_records.append({
-                "unit_id": unit["unit_id"],
-                "agency_id": incident["agency_id"],
-                "incident_id": incident["incident_id"],
-                "status_code": unit["status_code"],
-                "status": unit["status"],
-                "status_color": unit["status_color"],
+                "unit_id": unit.unit_id,
+                "agency_id": incident.agency_id,
+                "incident_id": incident.incident_id,
+                "status_code": unit.status_code,
+                "status": description,
+                "status_color": color,
                 "last_update": timestamp,
             })
 
     return unit_records
 
 
+COMPACT_INCIDENT_FIELDS = [
+    "incident_id", "agency", "call_type", "address", "latitude", "longitude",
+    "received_time", "alarm_level", "units", "fetched_at",
+]
+
+
+def encode_compact(data: dict) -> dict:
+    """
+    Dictionary-encode output data for the compact feed.
+
+    Agency names, call types and unit statuses are stored once in header
+    tables and referenced by index; fields derivable from others
+    (unit_count, units_display, is_active, unit_status) are dropped.
+    """
+    tables = {"agency_names": {}, "call_types": {}, "unit_statuses": {}}
+
+    def ref(table: str, key: tuple) -> int:
+        return tables[table].setdefault(key, len(tables[table]))
+
+    def row(inc: dict) -> list:
+        return [
+            inc["incident_id"],
+            ref("agency_names", (inc["agency_id"], inc.get("agency_name", ""))),
+            ref("call_types", (inc.get("call_type", ""), inc.get("call_type_description", ""))),
+            inc.get("address", ""),
+            inc.get("latitude", ""),
+            inc.get("longitude", ""),
+            inc.get("received_time", ""),
+            inc.get("alarm_level", ""),
+            [[u["unit_id"], ref("unit_statuses", (u["status_code"], u["status"], u["status_color"]))]
+             for u in inc.get("units", [])],
+            inc.get("fetched_at", ""),
+        ]
+
+    active = [row(inc) for inc in data.get("active_incidents", [])]
+    recent = [row(inc) for inc in data.get("recent_incidents", [])]
+    units = data.get("unit_status", [])
+
+    return {
+        "format": "pulsepoint-compact",
+        "version": 1,
+        "last_updated": data.get("last_updated"),
+        "sequence": data.get("sequence", 0),
+        "units_updated": units[0]["last_update"] if units else None,
+        "agencies": data.get("agencies", {}),
+        "agency_names": [list(k) for k in tables["agency_names"]],
+        "call_types": [list(k) for k in tables["call_types"]],
+        "unit_statuses": [list(k) for k in tables["unit_statuses"]],
+        "incident_fields": COMPACT_INCIDENT_FIELDS,
+        "active": active,
+        "recent": recent,
+    }
+
+
+def decode_compact(compact: dict) -> dict:
+    """Expand a compact feed back into the pulsepoint_data.json shape."""
+    agency_names = compact["agency_names"]
+    call_types = compact["call_types"]
+    statuses = compact["unit_statuses"]
+
+    def expand(row: list, is_active: bool) -> dict:
+        (incident_id, agency, call_type, address, latitude, longitude,
+         received_time, alarm_level, unit_rows, fetched_at) = row
+        units = [
+            {
+                "unit_id": unit_id,
+                "status_code": statuses[status][0],
+                "status": statuses[status][1],
+                "status_color": statuses[status][2],
+            }
+            for unit_id, status in unit_rows
+        ]
+        return {
+            "incident_id": incident_id,
+            "agency_id": agency_names[agency][0],
+            "agency_name": agency_names[agency][1],
+            "call_type": call_types[call_type][0],
+            "call_type_description": call_types[call_type][1],
+            "address": address,
+            "latitude": latitude,
+            "longitude": longitude,
+            "received_time": received_time,
+            "alarm_level": alarm_level,
+            "units": units,
+            "unit_count": len(units),
+            "units_display": ", ".join(u["unit_id"] for u in units),
+            "is_active": is_active,
+            "fetched_at": fetched_at,
+        }
+
+    active = [expand(row, True) for row in compact.get("active", [])]
+    unit_status = [
+        {
+            "unit_id": unit["unit_id"],
+            "agency_id": inc["agency_id"],
+            "incident_id": inc["incident_id"],
+            "status_code": unit["status_code"],
+            "status": unit["status"],
+            "status_color": unit["status_color"],
+            "last_update": compact.get("units_updated"),
+        }
+        for inc in active
+        for unit in inc["units"]
+    ]
+
+    return {
+        "last_updated": compact.get("last_updated"),
+        "sequence": compact.get("sequence", 0),
+        "agencies": compact.get("agencies", {}),
+        "active_incidents": active,
+        "recent_incidents": [expand(row, False) for row in compact.get("recent", [])],
+        "unit_status": unit_status,
+    }
+
+
+# Keys of a change set that list changed items
+CHANGE_KINDS = ("added", "updated", "closed", "removed", "unit_transitions")
+
+
+class IncidentDeltaTracker:
+    """
+    Computes the per-cycle change set between successive poll results.
+
+    Change sets list added, updated, closed and removed active incidents,
+    newly seen recent incidents, and unit status transitions, each stamped
+    with a monotonically increasing sequence number. Agencies that were not
+    polled successfully keep their previous state rather than appearing closed.
+    """
+
+    TRACKED_FIELDS = (
+        "call_type", "call_type_description", "address", "latitude",
+        "longitude", "alarm_level", "units_display", "units",
+    )
+
+    def __init__(self, sequence: int = 0):
+        self.sequence = sequence
+        self._active: Optional[dict[str, dict]] = None
+        self._recent_ids: dict[str, set[str]] = {}
+        self._units: dict[tuple[str, str, str], str] = {}
+
+    def seed(self, active: list[dict], recent: list[dict]):
+        """Start from previously published state so the next change set is incremental."""
+        self._active = {inc["incident_id"]: inc for inc in active}
+        self._recent_ids = {}
+        for inc in recent:
+            self._recent_ids.setdefault(inc["agency_id"], set()).add(inc["incident_id"])
+        self._units = {
+            (u["agency_id"], u["incident_id"], u["unit_id"]): u["status_code"]
+            for u in parse_unit_status(active)
+        }
+
+    def compute(self, active: list[dict], recent: list[dict], polled: set[str]) -> Optional[dict]:
+        """
+        Diff one cycle's results against the previous cycle.
+
+        Args:
+            active: Active incidents from successfully polled agencies
+            recent: Recent incidents from successfully polled agencies
+            polled: IDs of agencies polled successfully this cycle
+
+        Returns:
+            Change set dictionary, or None if nothing changed
+        """
+        full = self._active is None
+        previous = self._active or {}
+
+        current = {inc["incident_id"]: inc for inc in active}
+        for incident_id, inc in previous.items():
+            if inc["agency_id"] not in polled and incident_id not in current:
+                current[incident_id] = inc
+
+        recent_ids: dict[str, set[str]] = {}
+        for inc in recent:
+            recent_ids.setdefault(inc["agency_id"], set()).add(inc["incident_id"])
+
+        added, updated, closed, removed, recent_added = [], [], [], [], []
+
+        for incident_id, inc in current.items():
+            old = previous.get(incident_id)
+            if old is None:
+                added.append(inc)
+            elif old is not inc and old != inc:
+                fields = {
+                    f: {"old": old.get(f), "new": inc.get(f)}
+                    for f in self.TRACKED_FIELDS if old.get(f) != inc.get(f)
+                }
+                if fields:
+                    updated.append({
+                        "incident_id": incident_id,
+                        "agency_id": inc["agency_id"],
+                        "fields": fields,
+                        "incident": inc,
+                    })
+
+        for incident_id, old in previous.items():
+            if incident_id not in current:
+                ref = {"incident_id": incident_id, "agency_id": old["agency_id"]}
+                if incident_id in recent_ids.get(old["agency_id"], ()):
+                    closed.append(ref)
+                else:
+                    removed.append(ref)
+
+        for inc in recent:
+            if inc["incident_id"] not in self._recent_ids.get(inc["agency_id"], ()):
+                recent_added.append(inc)
+        for agency_id, ids in self._recent_ids.items():
+            if agency_id not in polled:
+                recent_ids[agency_id] = ids
+
+        units = {
+            (u["agency_id"], u["incident_id"], u["unit_id"]): u["status_code"]
+            for u in parse_unit_status(list(current.values()))
+        }
+        transitions = [
+            {"agency_id": key[0], "incident_id": key[1], "unit_id": key[2],
+             "from": self._units.get(key), "to": status}
+            for key, status in units.items() if self._units.get(key) != status
+        ]
+        transitions.extend(
+            {"agency_id": key[0], "incident_id": key[1], "unit_id": key[2],
+             "from": status, "to": None}
+            for key, status in self._units.items() if key not in units
+        )
+
+        self._active = current
+        self._recent_ids = recent_ids
+        self._units = units
+
+        if not (full or added or updated or closed or removed or recent_added or transitions):
+            return None
+
+        self.sequence += 1
+        return {
+            "seq": self.sequence,
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "full": full,
+            "added": added,
+            "updated": updated,
+            "closed": closed,
+            "removed": removed,
+            "recent_added": recent_added,
+            "unit_transitions": transitions,
+        }
+
+
+class RateLimiter:
+    """Thread-safe limiter that spaces calls evenly at a global rate."""
+
+    def __init__(self, requests_per_second: float):
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+        self.set_rate(requests_per_second)
+
+    def set_rate(self, requests_per_second: float):
+        """Change the rate; takes effect from the next slot handed out."""
+        with self._lock:
+            self.interval = 1.0 / requests_per_second if requests_per_second > 0 else 0.0
+
+    def acquire(self):
+        """Block until the caller's request slot comes up."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        wait = slot - now
+        if wait > 0:
+            time.sleep(wait)
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile (q in 0-100) of an already sorted list."""
+    if not values:
+        return 0.0
+    rank = max(0, min(len(values) - 1, math.ceil(q / 100 * len(values)) - 1))
+    return values[rank]
+
+
+class CycleTimings:
+    """
+    Thread-safe per-stage timings and counters for one poll cycle.
+
+    Stages recorded with an agency ID also add to that agency's total, except
+    SUBSTAGES, which overlap other stages or measure waiting rather than work.
+    """
+
+    SUBSTAGES = {"fetch_first_byte", "rate_limit"}
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stages: dict[str, list[float]] = {}
+        self.agency_totals: dict[str, float] = {}
+        self.counters: dict[str, int] = {}
+
+    def count(self, counter: str, amount: int = 1):
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def record(self, stage: str, seconds: float, agency_id: Optional[str] = None):
+        with self._lock:
+            self.stages.setdefault(stage, []).append(seconds)
+            if agency_id is not None and stage not in self.SUBSTAGES:
+                self.agency_totals[agency_id] = self.agency_totals.get(agency_id, 0.0) + seconds
+
+    @contextmanager
+    def stage(self, stage: str, agency_id: Optional[str] = None):
+        """Time the enclosed block as one sample of a stage."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - started, agency_id)
+
+    def summary(self) -> dict[str, dict]:
+        """Per stage: count, total, p50, p95 and max seconds."""
+        with self._lock:
+            stages = {stage: sorted(values) for stage, values in self.stages.items()}
+        return {
+            stage: {
+                "count": len(values),
+                "total": sum(values),
+                "p50": percentile(values, 50),
+                "p95": percentile(values, 95),
+                "max": values[-1],
+            }
+            for stage, values in stages.items()
+        }
+
+    def outliers(self, factor: float = 3.0, limit: int = 5) -> list[tuple[str, float]]:
+        """Slowest agencies whose total time exceeds factor x the median agency."""
+        with self._lock:
+            totals = dict(self.agency_totals)
+        if len(totals) < 2:
+            return []
+        threshold = factor * percentile(sorted(totals.values()), 50)
+        slow = sorted(
+            ((agency_id, total) for agency_id, total in totals.items() if total > threshold),
+            key=lambda item: item[1], reverse=True,
+        )
+        return slow[:limit]
+
+
+class AdaptivePollScheduler:
+    """
+    Priority queue of per-agency poll times that adapt to incident churn.
+
+    Every agency starts at base_interval. After each batch, the total request
+    budget of polling all agencies every base_interval is redistributed in
+    proportion to each agency's recent churn (changes per base interval,
+    smoothed), so busy agencies are polled more often and quiet ones less,
+    within [min_interval, max_interval].
+    """
+
+    def __init__(self, agency_ids: list[str], base_interval: float,
+                 min_interval: float, max_interval: float, smoothing: float = 0.3):
+        self.base_interval = base_interval
+        self.min_interval = min(min_interval, base_interval)
+        self.max_interval = max(max_interval, base_interval)
+        self.smoothing = smoothing
+        self.intervals = {agency_id: base_interval for agency_id in agency_ids}
+        self.activity = {agency_id: 0.0 for agency_id in agency_ids}
+        self.last_polled: dict[str, float] = {}
+        # Never-polled agencies are due immediately
+        self._heap = [(0.0, agency_id) for agency_id in agency_ids]
+        heapq.heapify(self._heap)
+
+    def due(self, now: float, window: float = 0.0) -> list[str]:
+        """Pop every agency due by now + window."""
+        batch = []
+        while self._heap and self._heap[0][0] <= now + window:
+            batch.append(heapq.heappop(self._heap)[1])
+        return batch
+
+    def seconds_until_next(self, now: float) -> float:
+        if not self._heap:
+            return self.base_interval
+        return max(0.0, self._heap[0][0] - now)
+
+    def record(self, agency_id: str, changes: Optional[int], now: float):
+        """
+        Record a poll and queue the agency's next one.
+
+        Args:
+            agency_id: Agency that was polled
+            changes: Incident changes seen since its previous poll, None if the poll failed
+            now: Monotonic time of the poll
+        """
+        previous = self.last_polled.get(agency_id)
+        if changes is not None and previous is not None:
+            per_interval = changes * self.base_interval / max(now - previous, 1e-3)
+            self.activity[agency_id] += self.smoothing * (per_interval - self.activity[agency_id])
+        self.last_polled[agency_id] = now
+        heapq.heappush(self._heap, (now + self.intervals[agency_id], agency_id))
+
+    def rebalance(self):
+        """Recompute all intervals from current activity and rebuild the queue."""
+        budget = len(self.intervals) / self.base_interval  # requests per second
+        free = set(self.intervals)
+        fixed_rate = 0.0
+
+        # Water-filling: agencies pinned at a bound give up (or take) their share
+        # of the budget, which is spread over the rest in proportion to activity.
+        while free:
+            remaining = budget - fixed_rate
+            total = sum(self.activity[a] + 1.0 for a in free)
+            clamped = {}
+            for agency_id in free:
+                rate = remaining * (self.activity[agency_id] + 1.0) / total
+                interval = 1.0 / rate if rate > 0 else self.max_interval
+                self.intervals[agency_id] = interval
+                if interval < self.min_interval:
+                    clamped[agency_id] = self.min_interval
+                elif interval > self.max_interval:
+                    clamped[agency_id] = self.max_interval
+            if not clamped:
+                break
+            for agency_id, interval in clamped.items():
+                self.intervals[agency_id] = interval
+                fixed_rate += 1.0 / interval
+                free.discard(agency_id)
+
+        self._heap = [
+            (self.last_polled.get(agency_id, 0.0) + interval, agency_id)
+            for agency_id, interval in self.intervals.items()
+        ]
+        heapq.heapify(self._heap)
+
+    def set_agencies(self, agency_ids: list[str]):
+        """Schedule exactly these agencies from now on; added ones are due immediately."""
+        wanted = set(agency_ids)
+        for agency_id in list(self.intervals):
+            if agency_id not in wanted:
+                del self.intervals[agency_id]
+                del self.activity[agency_id]
+                self.last_polled.pop(agency_id, None)
+        added = set()
+        for agency_id in agency_ids:
+            if agency_id not in self.intervals:
+                self.intervals[agency_id] = self.base_interval
+                self.activity[agency_id] = 0.0
+                added.add(agency_id)
+        self.rebalance()
+        if added:
+            self._heap = [(0.0 if agency_id in added else due, agency_id) for due, agency_id in self._heap]
+            heapq.heapify(self._heap)
+
+    def stats(self) -> dict:
+        intervals = sorted(self.intervals.values())
+        if not intervals:
+            return {"min": 0.0, "median": 0.0, "max": 0.0, "requests_per_minute": 0.0}
+        return {
+            "min": intervals[0],
+            "median": intervals[len(intervals) // 2],
+            "max": intervals[-1],
+            "requests_per_minute": sum(60.0 / i for i in intervals),
+        }
+
+
+class AgencyCircuitBreaker:
+    """
+    Per-agency circuit breaker with exponential backoff.
+
+    After failure_threshold consecutive failures an agency's breaker opens and
+    the agency is skipped until its backoff expires. The next poll is a
+    half-open probe: success closes the breaker, failure reopens it with the
+    backoff doubled (plus jitter, up to max_backoff). State uses wall-clock
+    times so it can be persisted across runs.
+    """
+
+    def __init__(self, state_file: Optional[str] = None, logger: Optional[logging.Logger] = None,
+                 failure_threshold: int = 3, base_backoff: float = 60, max_backoff: float = 3600,
+                 jitter: float = 0.2):
+        self.state_file = Path(state_file) if state_file else None
+        self.logger = logger or logging.getLogger("pulsepoint")
+        self.failure_threshold = max(1, failure_threshold)
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        # agency_id -> {"state", "failures", "trips", "open_until"}; healthy agencies are absent
+        self.agencies: dict[str, dict] = {}
+        self.dirty = False
+
+        if self.state_file and self.state_file.exists():
+            try:
+                with open(self.state_file, "r", encoding="utf-8") as f:
+                    self.agencies = json.load(f).get("agencies", {})
+            except (OSError, json.JSONDecodeError) as e:
+                self.logger.warning(f"Ignoring unreadable breaker state {self.state_file}: {e}")
+
+    def allow(self, agency_id: str, now: Optional[float] = None) -> bool:
+        """Whether the agency should be polled now. Moves expired open breakers to half-open."""
+        health = self.agencies.get(agency_id)
+        if health is None or health["state"] != "open":
+            return True
+        now = time.time() if now is None else now
+        if now < health["open_until"]:
+            return False
+        health["state"] = "half_open"
+        self.dirty = True
+        return True
+
+    def record_success(self, agency_id: str):
+        health = self.agencies.pop(agency_id, None)
+        if health is not None:
+            self.dirty = True
+            if health["state"] != "closed":
+                self.logger.info(f"Agency {agency_id}: recovered, breaker closed")
+
+    def record_failure(self, agency_id: str, now: Optional[float] = None):
+        now = time.time() if now is None else now
+        health = self.agencies.setdefault(
+            agency_id, {"state": "closed", "failures": 0, "trips": 0, "open_until": 0.0}
+        )
+        health["failures"] += 1
+        self.dirty = True
+        if health["state"] != "half_open" and health["failures"] < self.failure_threshold:
+            return
+
+        health["trips"] += 1
+        backoff = min(self.max_backoff, self.base_backoff * 2 ** (health["trips"] - 1))
+        # Jitter first, then clamp, so max_backoff is a hard limit
+        backoff = min(self.max_backoff, backoff * random.uniform(1 - self.jitter, 1 + self.jitter))
+        health["state"] = "open"
+        health["open_until"] = now + backoff
+        self.logger.warning(
+            f"Agency {agency_id}: breaker open after {health['failures']} failures, "
+            f"retrying in {backoff:.0f}s"
+        )
+
+    def is_open(self, agency_id: str) -> bool:
+        health = self.agencies.get(agency_id)
+        return health is not None and health["state"] == "open"
+
+    def open_agencies(self) -> list[str]:
+        return [agency_id for agency_id, health in self.agencies.items() if health["state"] == "open"]
+
+    def save(self):
+        """Persist breaker state if it changed."""
+        if not self.dirty or self.state_file is None:
+            return
+        JSONFileOutput._write_atomic(self.state_file, {
+            "updated": datetime.now(timezone.utc).isoformat(),
+            "agencies": self.agencies,
+        })
+        self.dirty = False
+
+
+class IncidentPayloadCache:
+    """
+    Per-agency fingerprints of the last incidents payload and its parsed result.
+
+    PulsePoint may re-encrypt identical data with a fresh salt/IV, so payloads
+    are fingerprinted twice: the raw body (a hit skips AES, JSON and parsing)
+    and the decrypted plaintext (a hit skips JSON decoding and parsing).
+    """
+
+    def __init__(self):
+        self._entries: dict[str, tuple[bytes, bytes, tuple[list[dict], list[dict]]]] = {}
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    @staticmethod
+    def fingerprint(data: bytes) -> bytes:
+        return hashlib.blake2b(data, digest_size=16).digest()
+
+    def lookup(self, agency_id: str, body_fp: bytes = None,
+               plaintext_fp: bytes = None) -> Optional[tuple[list[dict], list[dict]]]:
+        """
+        Return the cached (active, recent) incidents if a fingerprint matches.
+
+        Args:
+            agency_id: PulsePoint agency ID
+            body_fp: Fingerprint of the raw response body
+            plaintext_fp: Fingerprint of the decrypted plaintext
+
+        Returns:
+            Cached parsed incidents, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(agency_id)
+            if entry and body_fp is not None and entry[0] == body_fp:
+                self.body_hits += 1
+                return entry[2]
+            if entry and plaintext_fp is not None and entry[1] == plaintext_fp:
+                self.plaintext_hits += 1
+                return entry[2]
+            if plaintext_fp is not None:
+                self.misses += 1
+        return None
+
+    def store(self, agency_id: str, body_fp: bytes, plaintext_fp: bytes,
+              parsed: tuple[list[dict], list[dict]]):
+        with self._lock:
+            self._entries[agency_id] = (body_fp, plaintext_fp, parsed)
+
+    def stats(self) -> dict:
+        return {
+            "body_hits": self.body_hits,
+            "plaintext_hits": self.plaintext_hits,
+            "misses": self.misses,
+        }
+
+    def reset_stats(self):
+        self.body_hits = 0
+        self.plaintext_hits = 0
+        self.misses = 0
+
+
+def _cell_text(value) -> str:
+    """A cell value as the Sheets API reads it back, for comparing rows."""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    return str(value)
+
+
+def _column_letter(index: int) -> str:
+    """Spreadsheet column letter for a 1-based column index (1 -> A, 27 -> AA)."""
+    letters = ""
+    while index:
+        index, rem = divmod(index - 1, 26)
+        letters = chr(ord("A") + rem) + letters
+    return letters
+
+
+class SheetRows:
+    """
+    The data rows last written to one worksheet, keyed by a row key.
+
+    A row keeps its position while it exists. A removed row is replaced by the
+    sheet's last row, so each update touches only rows that changed and the
+    data stays contiguous below the header.
+    """
+
+    def __init__(self, width: int, key_columns: tuple[int, ...], volatile_columns: tuple[int, ...] = ()):
+        """
+        Args:
+            width: Number of columns
+            key_columns: Columns that identify a row
+            volatile_columns: Columns that change every cycle (e.g. fetch times);
+                a row whose only change is in these columns is not rewritten
+        """
+        self.width = width
+        self.key_columns = key_columns
+        self.compare_columns = [i for i in range(width) if i not in volatile_columns]
+        self.rows: list[list] = []
+        self.positions: dict[tuple, int] = {}
+
+    def _key(self, row: list) -> tuple:
+        return tuple(_cell_text(row[i]) for i in self.key_columns)
+
+    def _same(self, a: list, b: list) -> bool:
+        return all(_cell_text(a[i]) == _cell_text(b[i]) for i in self.compare_columns)
+
+    def load(self, values: list[list]):
+        """Start from the rows currently in the sheet (as read from the API)."""
+        self.rows = []
+        self.positions = {}
+        for row in values:
+            row = (list(row) + [""] * self.width)[:self.width]
+            if not any(row):
+                break
+            self.positions[self._key(row)] = len(self.rows)
+            self.rows.append(row)
+
+    def apply(self, new_rows: list[list]) -> tuple[list[tuple[int, list[list]]], int]:
+        """
+        Replace the table's contents.
+
+        Args:
+            new_rows: The rows the sheet should now hold
+
+        Returns:
+            (runs, previous_length): runs of changed rows as (first index, rows),
+            and the number of rows before the update (rows past the new length
+            must be cleared)
+        """
+        previous_length = len(self.rows)
+        wanted = {self._key(row): row for row in new_rows}
+        changed = set()
+
+        # Fill each removed row's position with the current last row
+        removed = sorted((pos for key, pos in self.positions.items() if key not in wanted), reverse=True)
+        for pos in removed:
+            last = self.rows.pop()
+            if pos == len(self.rows):
+                del self.positions[self._key(last)]
+            else:
+                del self.positions[self._key(self.rows[pos])]
+                self.rows[pos] = last
+                self.positions[self._key(last)] = pos
+                changed.add(pos)
+
+        for key, row in wanted.items():
+            pos = self.positions.get(key)
+            if pos is None:
+                self.positions[key] = len(self.rows)
+                changed.add(len(self.rows))
+                self.rows.append(row)
+            elif not self._same(self.rows[pos], row):
+                self.rows[pos] = row
+                changed.add(pos)
+
+        runs = []
+        for pos in sorted(p for p in changed if p < len(self.rows)):
+            if runs and runs[-1][0] + len(runs[-1][1]) == pos:
+                runs[-1][1].append(self.rows[pos])
+            else:
+                runs.append((pos, [self.rows[pos]]))
+        return runs, previous_length
+
+
 class GoogleSheetsOutput:
-    """Handler for Google Sheets output."""
+    """
+    Handler for Google Sheets output.
+
+    Updates are collected during a cycle and written by flush() in a single
+    values batch update: the poll time of each polled agency, and only the
+    incident and unit rows that changed since the last write.
+    """
 
     SCOPES = [
         "https://www.googleapis.com/auth/spreadsheets",
         "https://www.googleapis.com/auth/drive",
     ]
 
+    INCIDENT_COLUMNS = [
+        "incident_id", "agency_id", "agency_name", "call_type",
+        "call_type_description", "address", "latitude", "longitude",
+        "units", "unit_count", "alarm_level", "received_time", "fetched_at"
+    ]
+    UNIT_COLUMNS = [
+        "unit_id", "agency_id", "incident_id", "status_code",
+        "status", "status_color", "last_update"
+    ]
+    # Rows added beyond the current size when a worksheet needs to grow
+    GROW_ROWS = 500
+    # Change sets are not written to Sheets, so there is no sequence to resume
+    last_sequence = 0
+
     def __init__(self, sheet_id: str, service_account_file: str, logger: logging.Logger):
         self.sheet_id = sheet_id
         self.logger = logger
@@ -320,74 +1532,233 @@ class GoogleSheetsOutput:
         creds = Credentials.from_service_account_file(service_account_file, scopes=self.SCOPES)
         self.client = gspread.authorize(creds)
         self.spreadsheet = self.client.open_by_key(sheet_id)
+
+        self.tables = {
+            "Active_Incidents": SheetRows(len(self.INCIDENT_COLUMNS), key_columns=(1, 0), volatile_columns=(12,)),
+            "Unit_Status": SheetRows(len(self.UNIT_COLUMNS), key_columns=(1, 2, 0), volatile_columns=(6,)),
+        }
+        self.pending_rows: dict[str, list[list]] = {}
+        self.agency_rows: dict[str, int] = {}
+        self.pending_polls: dict[str, tuple[Optional[str], str]] = {}
         self._ensure_worksheets()
+        self._load_sheets()
 
     def _ensure_worksheets(self):
-        existing = [ws.title for ws in self.spreadsheet.worksheets()]
+        self.worksheets = {ws.title: ws for ws in self.spreadsheet.worksheets()}
 
-        if "Agencies" not in existing:
+        if "Agencies" not in self.worksheets:
             ws = self.spreadsheet.add_worksheet("Agencies", rows=200, cols=5)
             ws.update('A1:E1', [["agency_id", "name", "region", "enabled", "last_poll"]])
+            self.worksheets["Agencies"] = ws
 
-        if "Active_Incidents" not in existing:
+        if "Active_Incidents" not in self.worksheets:
             ws = self.spreadsheet.add_worksheet("Active_Incidents", rows=500, cols=13)
-            ws.update('A1:M1', [[
-                "incident_id", "agency_id", "agency_name", "call_type",
-                "call_type_description", "address", "latitude", "longitude",
-                "units", "unit_count", "alarm_level", "received_time", "fetched_at"
-            ]])
+            ws.update('A1:M1', [self.INCIDENT_COLUMNS])
+            self.worksheets["Active_Incidents"] = ws
 
-        if "Unit_Status" not in existing:
+        if "Unit_Status" not in self.worksheets:
             ws = self.spreadsheet.add_worksheet("Unit_Status", rows=500, cols=7)
-            ws.update('A1:G1', [[
-                "unit_id", "agency_id", "incident_id", "status_code",
-                "status", "status_color", "last_update"
-            ]])
+            ws.update('A1:G1', [self.UNIT_COLUMNS])
+            self.worksheets["Unit_Status"] = ws
+
+    def _load_sheets(self):
+        """Read the agency rows and current data rows once, in a single request."""
+        titles = ["Agencies"] + list(self.tables)
+        ranges = ["'Agencies'!A2:A"] + [
+            f"'{title}'!A2:{_column_letter(table.width)}" for title, table in self.tables.items()
+        ]
+        response = self.spreadsheet.values_batch_get(ranges)
+        values = {title: vr.get("values", []) for title, vr in zip(titles, response.get("valueRanges", []))}
+
+        for i, row in enumerate(values.get("Agencies", []), 2):
+            if row and row[0]:
+                self.agency_rows[row[0]] = i
+        for title, table in self.tables.items():
+            table.load(values.get(title, []))
+
+    def update_incidents(self, active_incidents: list[IncidentRecord], recent_incidents: list[IncidentRecord] = None):
+        # Only active incidents are kept in the sheet
+        self.pending_rows["Active_Incidents"] = [[
+            inc["incident_id"], inc["agency_id"], inc["agency_name"],
+            inc["call_type"], inc["call_type_description"], inc["address"],
+            inc["latitude"], inc["longitude"], inc["units_display"],
+            inc["unit_count"], inc["alarm_level"], inc["received_time"],
+            inc["fetched_at"]
+        ] for inc in active_incidents]
 
-    def update_incidents(self, incidents: list[dict]):
-        ws = self.spreadsheet.worksheet("Active_Incidents")
-        ws.batch_clear(["A2:M1000"])
+    def update_units(self, units: list[dict]):
+        self.pending_rows["Unit_Status"] = [[
+            u["unit_id"], u["agency_id"], u["incident_id"],
+            u["status_code"], u["status"], u["status_color"], u["last_update"]
+        ] for u in units]
 
-        if incidents:
-            rows = [[
-                inc["incident_id"], inc["agency_id"], inc["agency_name"],
-                inc["call_type"], inc["call_type_description"], inc["address"],
-                inc["latitude"], inc["longitude"], inc["units_display"],
-                inc["unit_count"], inc["alarm_level"], inc["received_time"],
-                inc["fetched_at"]
-            ] for inc in incidents]
-            ws.update(f"A2:M{len(rows)+1}", rows)
+    def load_state(self) -> Optional[tuple[list[dict], list[dict]]]:
+        return None
 
-        self.logger.info(f"Updated {len(incidents)} incidents in Sheets")
+    def update_changes(self, changes: dict):
+        pass
 
-    def update_units(self, units: list[dict]):
-        ws = self.spreadsheet.worksheet("Unit_Status")
-        ws.batch_clear(["A2:G1000"])
-
-        if units:
-            rows = [[
-                u["unit_id"], u["agency_id"], u["incident_id"],
-                u["status_code"], u["status"], u["status_color"], u["last_update"]
-            ] for u in units]
-            ws.update(f"A2:G{len(rows)+1}", rows)
-
-    def update_agency_poll_time(self, agency_id: str):
-        ws = self.spreadsheet.worksheet("Agencies")
-        timestamp = datetime.now(timezone.utc).isoformat()
-        try:
-            cell = ws.find(agency_id)
-            if cell:
-                ws.update_cell(cell.row, 5, timestamp)
-        except Exception:
-            pass
+    def update_agency_poll_time(self, agency_id: str, agency_name: str = None):
+        self.pending_polls[agency_id] = (agency_name, datetime.now(timezone.utc).isoformat())
+
+    def _ensure_rows(self, title: str, rows: int):
+        """Grow a worksheet so it has at least rows rows."""
+        ws = self.worksheets[title]
+        if rows > ws.row_count:
+            ws.add_rows(rows - ws.row_count + self.GROW_ROWS)
+
+    def _poll_time_ranges(self) -> list[dict]:
+        """Value ranges for the Agencies sheet: last_poll cells, plus rows for new agencies."""
+        data = []
+        cells = {}
+        new_rows = []
+        for agency_id, (agency_name, timestamp) in self.pending_polls.items():
+            row = self.agency_rows.get(agency_id)
+            if row is None:
+                new_rows.append([agency_id, agency_name or "", "", "", timestamp])
+            else:
+                cells[row] = timestamp
+
+        # Consecutive agency rows go in one range
+        run_start, run = None, []
+        for row in sorted(cells):
+            if run and row != run_start + len(run):
+                data.append({"range": f"'Agencies'!E{run_start}:E{run_start + len(run) - 1}", "values": run})
+                run = []
+            if not run:
+                run_start = row
+            run.append([cells[row]])
+        if run:
+            data.append({"range": f"'Agencies'!E{run_start}:E{run_start + len(run) - 1}", "values": run})
+
+        if new_rows:
+            first = max(self.agency_rows.values(), default=1) + 1
+            self._ensure_rows("Agencies", first + len(new_rows) - 1)
+            data.append({"range": f"'Agencies'!A{first}:E{first + len(new_rows) - 1}", "values": new_rows})
+            for i, row in enumerate(new_rows):
+                self.agency_rows[row[0]] = first + i
+        return data
+
+    def _table_ranges(self, title: str, rows: list[list]) -> list[dict]:
+        """Value ranges that bring one data worksheet up to date."""
+        table = self.tables[title]
+        runs, previous_length = table.apply(rows)
+        last_column = _column_letter(table.width)
+        self._ensure_rows(title, len(table.rows) + 1)
+
+        data = [
+            {"range": f"'{title}'!A{start + 2}:{last_column}{start + len(values) + 1}", "values": values}
+            for start, values in runs
+        ]
+        # Blank out rows left over from a longer previous write
+        if previous_length > len(table.rows):
+            first, last = len(table.rows) + 2, previous_length + 1
+            data.append({
+                "range": f"'{title}'!A{first}:{last_column}{last}",
+                "values": [[""] * table.width for _ in range(last - first + 1)],
+            })
+        return data
+
+    def flush(self):
+        """Write the cycle's changes in one batch update."""
+        data = self._poll_time_ranges()
+        for title, rows in self.pending_rows.items():
+            data.extend(self._table_ranges(title, rows))
+        self.pending_polls = {}
+        self.pending_rows = {}
+
+        if not data:
+            return
+        self.spreadsheet.values_batch_update({"valueInputOption": "RAW", "data": data})
+        cells = sum(len(d["values"]) for d in data)
+        self.logger.info(
+            f"Updated Sheets: {cells} rows in {len(data)} ranges, "
+            f"{len(self.tables['Active_Incidents'].rows)} active incidents"
+        )
+
+
+class RecentIncidentWindow:
+    """
+    Rolling window of recent (closed) incidents, ordered by received time.
+
+    A min-heap of (epoch, incident_id) sits beside an incident_id index, so
+    pruning pops only expired entries instead of re-checking every incident.
+    Heap entries left behind by a changed time are skipped when they surface.
+    Incidents without a usable time age out from when they were first seen.
+    With max_incidents set, the oldest incidents beyond it are dropped too.
+    """
+
+    def __init__(self, window_hours: float = 24, incidents: list[dict] = None,
+                 max_incidents: Optional[int] = None):
+        self.window_seconds = window_hours * 3600
+        self.max_incidents = max_incidents
+        self._heap: list[tuple[float, str]] = []
+        # incident_id -> (epoch, incident), in first-seen order
+        self._index: dict[str, tuple[float, IncidentRecord]] = {}
+        if incidents:
+            self.update(incidents)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def update(self, incidents: list[IncidentRecord], now: Optional[float] = None):
+        """Add or replace incidents."""
+        now = datetime.now(timezone.utc).timestamp() if now is None else now
+        for inc in incidents:
+            incident_id = inc.incident_id
+            entry = self._index.get(incident_id)
+            epoch = inc.received_epoch
+            if epoch is None:
+                epoch = entry[0] if entry is not None else now
+            if entry is None or epoch != entry[0]:
+                heapq.heappush(self._heap, (epoch, incident_id))
+            self._index[incident_id] = (epoch, inc)
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """Drop incidents received before the window, or over max_incidents. Returns the number removed."""
+        now = datetime.now(timezone.utc).timestamp() if now is None else now
+        cutoff = now - self.window_seconds
+        removed = 0
+        while self._heap and (self._heap[0][0] < cutoff or
+                              (self.max_incidents is not None and len(self._index) > self.max_incidents)):
+            epoch, incident_id = heapq.heappop(self._heap)
+            entry = self._index.get(incident_id)
+            if entry is not None and entry[0] == epoch:
+                del self._index[incident_id]
+                removed += 1
+        return removed
+
+    def incidents(self) -> list[IncidentRecord]:
+        return [entry[1] for entry in self._index.values()]
 
 
 class JSONFileOutput:
     """Handler for local JSON file output."""
 
-    def __init__(self, output_file: str, logger: logging.Logger):
+    def __init__(self, output_file: str, logger: logging.Logger,
+                 changes_file: str = None, change_history: int = 50,
+                 output_format: str = "pretty", compact_file: str = None, compact_msgpack: bool = False,
+                 compact_feed: bool = False, recent_window_hours: float = 24, recent_max_incidents: Optional[int] = None,
+                 change_history_items: Optional[int] = None):
         self.output_file = Path(output_file)
         self.logger = logger
+        self.dirty = False
+        # "compact" drops indentation and also writes a dictionary-encoded feed
+        self.output_format = output_format
+        # compact_feed writes the dictionary-encoded feed beside a pretty data file
+        self.compact_feed = compact_feed or output_format == "compact"
+        self.compact_file = Path(compact_file) if compact_file else \
+            self.output_file.with_name(f"{self.output_file.stem}.compact.json")
+        self.compact_msgpack = compact_msgpack and MSGPACK_AVAILABLE
+        if compact_msgpack and not MSGPACK_AVAILABLE:
+            self.logger.warning("compact_msgpack requested but msgpack is not installed")
+        # Change sets go to a sibling file so the published feed does not grow
+        self.changes_file = Path(changes_file) if changes_file else \
+            self.output_file.with_name(f"{self.output_file.stem}_changes.json")
+        self.change_history = change_history
+        self.change_history_items = change_history_items
+        self.changes = {"sequence": 0, "changes": []}
+        self.changes_dirty = False
         self.data = {
             "last_updated": None,
             "agencies": {},
@@ -396,17 +1767,107 @@ class JSONFileOutput:
             "unit_status": [],
         }
 
-        if self.output_file.exists():
+        loaded = self._load()
+        if loaded is not None:
+            self.data = loaded
+        self.data["active_incidents"] = [IncidentRecord.from_dict(i) for i in self.data.get("active_incidents", [])]
+        self.recent_window = RecentIncidentWindow(
+            recent_window_hours, [IncidentRecord.from_dict(i) for i in self.data.get("recent_incidents", [])],
+            max_incidents=recent_max_incidents,
+        )
+        self.data["recent_incidents"] = self.recent_window.incidents()
+
+        if self.changes_file.exists():
             try:
-                with open(self.output_file, "r", encoding="utf-8") as f:
-                    self.data = json.load(f)
+                with open(self.changes_file, "r", encoding="utf-8") as f:
+                    self.changes = json.load(f)
             except json.JSONDecodeError:
                 pass
 
+    def _load(self) -> Optional[dict]:
+        """Read previously written data, if any."""
+        if not self.output_file.exists():
+            return None
+        try:
+            with open(self.output_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except json.JSONDecodeError:
+            return None
+
+    @property
+    def last_sequence(self) -> int:
+        # The changes file may not survive between runs (CI does not commit it),
+        # so the sequence published in the data file keeps the feed monotonic
+        return max(self.changes.get("sequence", 0), self.data.get("sequence", 0))
+
+    def load_state(self) -> Optional[tuple[list[dict], list[dict]]]:
+        """Previously written (active, recent) incidents, if they match a change set."""
+        if not self.last_sequence or self.data.get("sequence") != self.last_sequence:
+            return None
+        return self.data.get("active_incidents", []), self.data.get("recent_incidents", [])
+
+    @staticmethod
+    def _write_atomic(path: Path, data, indent: Optional[int] = 2, binary: bool = False):
+        """
+        Write a file atomically so readers never see a partial file.
+
+        Args:
+            path: Destination file
+            data: Pre-encoded bytes, or data to encode as JSON (or MessagePack)
+            indent: JSON indentation, None for the most compact encoding
+            binary: Encode data as MessagePack instead of JSON
+        """
+        if isinstance(data, bytes):
+            payload = data
+        elif binary:
+            payload = msgpack.packb(data, use_bin_type=True, default=json_default)
+        else:
+            separators = (",", ":") if indent is None else None
+            payload = json.dumps(
+                data, indent=indent, separators=separators, ensure_ascii=False, default=json_default,
+            ).encode("utf-8")
+
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.chmod(tmp_path, 0o644)  # mkstemp creates files as 0600
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
     def _save(self):
         self.data["last_updated"] = datetime.now(timezone.utc).isoformat()
-        with open(self.output_file, "w", encoding="utf-8") as f:
-            json.dump(self.data, f, indent=2, ensure_ascii=False)
+        # Convert records up front; json's default= hook is much slower per object
+        data = {
+            key: [i.to_dict() for i in value] if key in ("active_incidents", "recent_incidents") else value
+            for key, value in self.data.items()
+        }
+        self._write_atomic(self.output_file, data, indent=None if self.output_format == "compact" else 2)
+        if not self.compact_feed:
+            return
+
+        compact = encode_compact(data)
+        self._write_atomic(self.compact_file, compact, indent=None)
+        if self.compact_msgpack:
+            self._write_atomic(self.compact_file.with_suffix(".msgpack"), compact, binary=True)
+
+    def flush(self):
+        """Write pending changes, once per poll cycle."""
+        if self.changes_dirty:
+            self._write_atomic(self.changes_file, self.changes, indent=None)
+            self.changes_dirty = False
+        if not self.dirty:
+            return
+        self._save()
+        self.dirty = False
+        self.logger.info(
+            f"Saved {len(self.data.get('active_incidents', []))} active, "
+            f"{len(self.data.get('recent_incidents', []))} recent incidents to {self.output_file}"
+        )
 
     def update_incidents(self, active_incidents: list[dict], recent_incidents: list[dict] = None):
         self.data["active_incidents"] = active_incidents
@@ -415,34 +1876,37 @@ class JSONFileOutput:
             # per poll, so a busy agency's history is truncated in any single snapshot.
             # Merge each poll into an accumulated rolling window so the board shows the
             # full history of calls seen across polls, not just the latest snapshot.
-            existing = {i["incident_id"]: i for i in self.data.get("recent_incidents", [])}
-            for inc in recent_incidents:
-                existing[inc["incident_id"]] = inc
-
-            # Prune incidents older than 24 hours to bound the file size.
-            cutoff = datetime.now(timezone.utc).timestamp() - (24 * 3600)
-            merged = []
-            for inc in existing.values():
-                received = inc.get("received_time", "")
-                if not received:
-                    merged.append(inc)
-                    continue
-                try:
-                    inc_time = datetime.fromisoformat(received.replace("Z", "+00:00")).timestamp()
-                    if inc_time >= cutoff:
-                        merged.append(inc)
-                except (ValueError, AttributeError):
-                    merged.append(inc)
+            self.recent_window.update(recent_incidents)
+            self.recent_window.prune()
+            self.data["recent_incidents"] = self.recent_window.incidents()
 
-            self.data["recent_incidents"] = merged
-
-        self._save()
-        recent_count = len(self.data.get("recent_incidents", [])) if recent_incidents is not None else 0
-        self.logger.info(f"Saved {len(active_incidents)} active, {recent_count} recent incidents to {self.output_file}")
+        self.dirty = True
 
     def update_units(self, units: list[dict]):
         self.data["unit_status"] = units
-        self._save()
+        self.dirty = True
+
+    def update_changes(self, changes: dict):
+        history = self.changes.get("changes", [])
+        history.append(changes)
+        history = history[-self.change_history:]
+        # With thousands of agencies one change set can hold thousands of
+        # incidents, so the history is also capped by its total size
+        if self.change_history_items is not None:
+            total = 0
+            for i in range(len(history) - 1, -1, -1):
+                total += sum(len(history[i].get(key, ())) for key in CHANGE_KINDS)
+                if total > self.change_history_items and i < len(history) - 1:
+                    history = history[i + 1:]
+                    break
+        self.changes = {
+            "sequence": changes["seq"],
+            "changes": history,
+        }
+        self.changes_dirty = True
+        # Lets readers of the data file resume the change stream from its state
+        self.data["sequence"] = changes["seq"]
+        self.dirty = True
 
     def update_agency_poll_time(self, agency_id: str, agency_name: str = None):
         if "agencies" not in self.data:
@@ -452,13 +1916,131 @@ class JSONFileOutput:
         self.data["agencies"][agency_id]["last_poll"] = datetime.now(timezone.utc).isoformat()
         if agency_name:
             self.data["agencies"][agency_id]["name"] = agency_name
-        self._save()
+        self.dirty = True
+
+
+class ShardedJSONOutput(JSONFileOutput):
+    """
+    Handler for per-agency JSON shard output.
+
+    Writes <shard_dir>/<agency_id>.json per agency plus a manifest.json listing
+    each shard's content version, and only rewrites shards whose content
+    changed. Shards leave out fetched_at (the manifest's last_poll records
+    when each agency was fetched) so re-polling unchanged data is a no-op.
+    """
+
+    def __init__(self, shard_dir: str, logger: logging.Logger,
+                 changes_file: str = None, change_history: int = 50, recent_window_hours: float = 24,
+                 recent_max_incidents: Optional[int] = None, change_history_items: Optional[int] = None):
+        self.shard_dir = Path(shard_dir)
+        self.shard_dir.mkdir(parents=True, exist_ok=True)
+        self.shards: dict[str, dict] = {}
+        # Incident objects last written per agency; identical objects need no re-serializing
+        self._written: dict[str, tuple[list[dict], list[dict]]] = {}
+        super().__init__(
+            str(self.shard_dir / "manifest.json"), logger,
+            # Beside shard_dir rather than in it, since shard_dir is published as-is
+            changes_file=changes_file or str(self.shard_dir.with_name(f"{self.shard_dir.name}_changes.json")),
+            change_history=change_history,
+            recent_window_hours=recent_window_hours,
+            recent_max_incidents=recent_max_incidents,
+            change_history_items=change_history_items,
+        )
+
+    def _load(self) -> Optional[dict]:
+        manifest = super()._load()
+        if manifest is None:
+            return None
+
+        data = {
+            "last_updated": manifest.get("last_updated"),
+            "sequence": manifest.get("sequence", 0),
+            "agencies": {},
+            "active_incidents": [],
+            "recent_incidents": [],
+            "unit_status": [],
+        }
+        self.shards = manifest.get("shards", {})
+        for agency_id, entry in self.shards.items():
+            data["agencies"][agency_id] = {"name": entry.get("name"), "last_poll": entry.get("last_poll")}
+            try:
+                with open(self.shard_dir / entry["file"], "r", encoding="utf-8") as f:
+                    shard = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                entry["version"] = None  # Force a rewrite
+                continue
+            data["active_incidents"].extend(shard.get("active_incidents", []))
+            data["recent_incidents"].extend(shard.get("recent_incidents", []))
+        return data
+
+    @staticmethod
+    def _same_objects(previous: list[dict], current: list[dict]) -> bool:
+        # Re-fetched copies of unchanged incidents compare equal (fetched time is ignored)
+        return len(previous) == len(current) and all(a is b or a == b for a, b in zip(previous, current))
+
+    def _save(self):
+        self.data["last_updated"] = datetime.now(timezone.utc).isoformat()
+
+        groups: dict[str, tuple[list[dict], list[dict]]] = {}
+        for inc in self.data.get("active_incidents", []):
+            groups.setdefault(inc["agency_id"], ([], []))[0].append(inc)
+        for inc in self.data.get("recent_incidents", []):
+            groups.setdefault(inc["agency_id"], ([], []))[1].append(inc)
+
+        agencies = self.data.get("agencies", {})
+        written = 0
+        for agency_id in sorted(set(agencies) | set(groups)):
+            active, recent = groups.get(agency_id, ([], []))
+            info = agencies.get(agency_id, {})
+            entry = self.shards.setdefault(agency_id, {"file": f"{agency_id}.json", "version": None})
+            previous = self._written.get(agency_id)
+
+            unchanged = (
+                entry["version"] is not None and previous is not None
+                and self._same_objects(previous[0], active) and self._same_objects(previous[1], recent)
+            )
+            if not unchanged:
+                shard = {
+                    "agency_id": agency_id,
+                    "agency_name": info.get("name"),
+                    "active_incidents": [{k: v for k, v in inc.items() if k != "fetched_at"} for inc in active],
+                    "recent_incidents": [{k: v for k, v in inc.items() if k != "fetched_at"} for inc in recent],
+                }
+                body = json.dumps(shard, separators=(",", ":"), ensure_ascii=False, default=json_default).encode("utf-8")
+                version = hashlib.sha1(body).hexdigest()[:16]
+                if version != entry["version"]:
+                    self._write_atomic(self.shard_dir / entry["file"], body)
+                    entry["version"] = version
+                    written += 1
+
+            self._written[agency_id] = (active, recent)
+            entry.update({
+                "name": info.get("name"),
+                "last_poll": info.get("last_poll"),
+                "active": len(active),
+                "recent": len(recent),
+            })
+
+        manifest = {
+            "last_updated": self.data["last_updated"],
+            "sequence": self.data.get("sequence", 0),
+            "shards": self.shards,
+        }
+        self._write_atomic(self.output_file, manifest)
+        self.logger.info(f"Rewrote {written} of {len(self.shards)} agency shards in {self.shard_dir}")
 
 
 class PulsePointScraper:
     """Main scraper service."""
 
-    def __init__(self, config_file: str = "config.json"):
+    def __init__(self, config_file: str = "config.json", shard: Optional[tuple[int, int]] = None):
+        """
+        Args:
+            config_file: Config file path
+            shard: (index, count) to run as one worker of a shard group; the
+                worker polls only its share of the enabled agencies and writes
+                partial data for the merge step instead of the configured outputs
+        """
         with open(config_file, "r", encoding="utf-8") as f:
             self.config = json.load(f)
 
@@ -467,96 +2049,605 @@ class PulsePointScraper:
 
         # Load agencies
         self.agencies = self._load_agencies()
-        self.enabled = set(self.config.get("enabled_agencies", []))
+        self.regions = self._load_regions()
+        self.configured = {agency_id for region in self.regions.values() for agency_id in region["agencies"]}
+        self.enabled = set(self.configured)
+
+        self.workers = None
+        if shard is not None:
+            self.workers = WorkerGroup(
+                self.config.get("worker_dir", "workers"),
+                shard[0],
+                shard[1],
+                self.logger,
+                timeout=self.config.get("worker_timeout_seconds", 180),
+            )
+            worker_id = self.workers.worker_id
+            self.config["output_mode"] = {"mode": "json", "name": worker_id, "output_file": str(self.workers.data_file)}
+            self.config["changes_file"] = str(self.workers.path(worker_id, "_changes.json"))
+            self.config["breaker_state_file"] = str(self.workers.path(worker_id, "_health.json"))
+            if self.config.get("metrics_file", "scraper_metrics.json"):
+                self.config["metrics_file"] = str(self.workers.path(worker_id, "_metrics.json"))
+            self.enabled = self.workers.assign(self.configured)
+            self.workers.start()
+            self.logger.info(f"Running as {worker_id} of {shard[1]}: {len(self.enabled)} of {len(self.configured)} agencies")
+
+        # Setup outputs: output_mode is one mode or a list of them
+        output_modes = self.config.get("output_mode", "json")
+        if not isinstance(output_modes, list):
+            output_modes = [output_modes]
+        self.outputs = {}
+        for entry in output_modes:
+            # Entries are a mode name, or a dict with "mode" (and optionally
+            # "name") plus settings that override the top-level config
+            settings = {**self.config, **entry} if isinstance(entry, dict) else {**self.config, "mode": entry}
+            settings.setdefault("mode", "json")
+            name = settings.get("name", settings["mode"])
+            if name in self.outputs:
+                raise ValueError(f"Duplicate output {name!r}; give each output a distinct \"name\"")
+            self.outputs[name] = self._make_output(settings)
+        self.output = next(iter(self.outputs.values()))
+
+        # Requests are spread over a bounded worker pool and a global rate limit.
+        # The legacy per-agency delay still sets the rate when none is configured.
+        self.delay = self.config.get("request_delay_seconds", 1.5)
+        self.concurrency = max(1, int(self.config.get("max_concurrent_requests", 1)))
+        rate = self.config.get("requests_per_second")
+        if rate is None:
+            rate = 1.0 / self.delay if self.delay > 0 else 0
+        # The configured rate is for the whole shard group, split over the live workers
+        self.group_rate = rate
+        if self.workers is not None:
+            rate /= len(self.workers.alive)
+        self.limiter = RateLimiter(rate)
+
+        # One keep-alive pool per scraper, sized to the number of workers
+        self.transport = PulsePointTransport(
+            pool_size=self.config.get("http_pool_size", self.concurrency),
+            timeout=self.config.get("request_timeout_seconds", 30),
+            http2=self.config.get("http2", False),
+            logger=self.logger,
+            api_base=self.config.get("api_base"),
+        )
+        self.payload_cache = IncidentPayloadCache()
+        self.timings = CycleTimings()
+        self.decryptor = DecryptionEngine(key_cache_size=self.config.get("key_cache_size", 1024))
+        self.breaker = AgencyCircuitBreaker(
+            self.config.get("breaker_state_file", "agency_health.json"),
+            self.logger,
+            failure_threshold=self.config.get("breaker_failure_threshold", 3),
+            base_backoff=self.config.get("breaker_base_backoff_seconds", 60),
+            max_backoff=self.config.get("breaker_max_backoff_seconds", 3600),
+        )
+
+        metrics_file = self.config.get("metrics_file", "scraper_metrics.json")
+        self.metrics_file = Path(metrics_file) if metrics_file else None
+        self.metrics = MetricsRegistry.load(self.metrics_file) if self.metrics_file else MetricsRegistry()
+        self._define_metrics()
+
+        if len(self.outputs) > 1:
+            self.output = MultiOutput(self.outputs, self.logger, metrics=self.metrics)
+        # Outputs write on their own thread so slow sinks never hold up polling
+        if self.config.get("background_output", True):
+            self.output = BackgroundOutput(
+                self.output,
+                self.logger,
+                queue_size=self.config.get("output_queue_size", 1),
+                metrics=self.metrics,
+            )
 
-        # Setup output
-        output_mode = self.config.get("output_mode", "json")
+        self.delta = IncidentDeltaTracker(sequence=self.output.last_sequence)
+
+        # Last known (active, recent) incidents per agency. Agencies that are not
+        # polled in a cycle, or fail to poll, are written from here until their
+        # circuit breaker opens.
+        self.latest: dict[str, tuple[list[dict], list[dict]]] = {}
+        # Each agency's last_poll in the partial it was last merged from (--merge)
+        self.merged_polls: dict[str, str] = {}
+        state = self.output.load_state()
+        if state is not None:
+            active = [IncidentRecord.from_dict(i) for i in state[0]]
+            recent = [IncidentRecord.from_dict(i) for i in state[1]]
+            self.delta.seed(active, recent)
+            for inc in active:
+                if inc["agency_id"] in self.enabled and not self.breaker.is_open(inc["agency_id"]):
+                    self.latest.setdefault(inc["agency_id"], ([], []))[0].append(inc)
+            for inc in recent:
+                if inc["agency_id"] in self.enabled and not self.breaker.is_open(inc["agency_id"]):
+                    self.latest.setdefault(inc["agency_id"], ([], []))[1].append(inc)
+        self.logger.info(f"Loaded {len(self.agencies)} agencies, {len(self.enabled)} enabled")
+        if len(self.regions) > 1:
+            self.logger.info("Regions: " + ", ".join(
+                f"{name} ({len(region['agencies'])})" for name, region in self.regions.items()
+            ))
+        self.logger.info(f"Polling with {self.concurrency} concurrent requests at {rate:g} req/s")
+
+    def _make_output(self, settings: dict):
+        """Create one output from its settings (the config, plus per-output overrides)."""
+        output_mode = settings["mode"]
         if output_mode == "sheets":
             if not GSPREAD_AVAILABLE:
                 raise ImportError("gspread not available")
-            self.output = GoogleSheetsOutput(
-                self.config["google_sheets_id"],
-                self.config["service_account_file"],
+            return GoogleSheetsOutput(
+                settings["google_sheets_id"],
+                settings["service_account_file"],
                 self.logger
             )
+        elif output_mode == "sqlite":
+            return SQLiteOutput(
+                settings.get("sqlite_file", "pulsepoint_data.db"),
+                self.logger,
+                retention_hours=settings.get("sqlite_retention_hours", 24 * 14),
+                change_history=settings.get("change_history", 50),
+                recent_window_hours=settings.get("recent_window_hours", 24),
+                recent_max_incidents=settings.get("recent_max_incidents", 100_000),
+            )
+        elif output_mode == "sharded":
+            return ShardedJSONOutput(
+                settings.get("shard_dir", "agencies"),
+                self.logger,
+                changes_file=settings.get("changes_file"),
+                change_history=settings.get("change_history", 50),
+                recent_window_hours=settings.get("recent_window_hours", 24),
+                recent_max_incidents=settings.get("recent_max_incidents", 100_000),
+                change_history_items=settings.get("change_history_items", 100_000),
+            )
         else:
-            self.output = JSONFileOutput(
-                self.config.get("output_file", "pulsepoint_data.json"),
-                self.logger
+            return JSONFileOutput(
+                settings.get("output_file", "pulsepoint_data.json"),
+                self.logger,
+                changes_file=settings.get("changes_file"),
+                change_history=settings.get("change_history", 50),
+                output_format=settings.get("output_format", "pretty"),
+                compact_file=settings.get("compact_output_file"),
+                compact_msgpack=settings.get("compact_msgpack", False),
+                compact_feed=settings.get("compact_feed", False),
+                recent_window_hours=settings.get("recent_window_hours", 24),
+                recent_max_incidents=settings.get("recent_max_incidents", 100_000),
+                change_history_items=settings.get("change_history_items", 100_000),
             )
 
-        self.delay = self.config.get("request_delay_seconds", 1.5)
-        self.logger.info(f"Loaded {len(self.agencies)} agencies, {len(self.enabled)} enabled")
-
     def _load_agencies(self) -> dict:
-        agencies_file = self.config.get("agencies_file", "oregon_agencies.json")
+        agencies_files = self.config.get("agencies_file", "oregon_agencies.json")
+        if not isinstance(agencies_files, list):
+            agencies_files = [agencies_files]
+
+        agencies = {}
+        for agencies_file in agencies_files:
+            if not os.path.exists(agencies_file):
+                self.logger.warning(f"Agencies file not found: {agencies_file}")
+                continue
+
+            with open(agencies_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+
+            for agency in data.get("agencies", []):
+                # Files from before multi-state discovery only held Oregon agencies
+                agency.setdefault("state", "OR")
+                agencies[agency["id"]] = agency
+        return agencies
+
+    def _load_regions(self) -> dict[str, dict]:
+        """
+        Region name -> region settings, with the region's agency IDs under "agencies".
+
+        Each entry of the "regions" config selects agencies from the agencies
+        file by "states", lists them under "agencies", or both, and may set its
+        own poll_interval_seconds, min_poll_interval_seconds and
+        max_poll_interval_seconds. Regions replace enabled_agencies; without
+        them, enabled_agencies form a single region.
+        """
+        regions = self.config.get("regions")
+        if not regions:
+            return {"default": {"agencies": list(self.config.get("enabled_agencies", []))}}
+
+        loaded = {}
+        assigned = set()
+        for name, region in regions.items():
+            states = {state.upper() for state in region.get("states", [])}
+            agencies = list(region.get("agencies", [])) + sorted(
+                agency_id for agency_id, agency in self.agencies.items() if agency["state"].upper() in states
+            )
+            unique = []
+            for agency_id in agencies:
+                if agency_id in assigned:
+                    self.logger.warning(f"Agency {agency_id} is in more than one region; keeping the first")
+                    continue
+                assigned.add(agency_id)
+                unique.append(agency_id)
+            loaded[name] = {**region, "agencies": unique}
+        return loaded
+
+    def _poll_agency(self, agency_id: str) -> Optional[tuple[list[dict], list[dict]]]:
+        """Fetch and parse one agency. Runs on a worker thread."""
+        agency_name = self.agencies.get(agency_id, {}).get("name", f"Agency {agency_id}")
 
-        if not os.path.exists(agencies_file):
-            self.logger.warning(f"Agencies file not found: {agencies_file}")
-            return {}
+        with self.timings.stage("rate_limit", agency_id):
+            self.limiter.acquire()
+        body = fetch_incidents_payload(agency_id, self.logger, self.transport, self.timings)
 
-        with open(agencies_file, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        if body is None:
+            return None
 
-        return {a["id"]: a for a in data.get("agencies", [])}
+        # Unchanged payloads reuse the incidents parsed on an earlier cycle
+        body_fp = self.payload_cache.fingerprint(body)
+        cached = self.payload_cache.lookup(agency_id, body_fp=body_fp)
+        if cached is not None:
+            return mark_fetched(cached)
+
+        try:
+            with self.timings.stage("decrypt", agency_id):
+                encrypted = extract_encrypted(body)
+                if encrypted is not None:
+                    plaintext = self.decryptor.decrypt_payload(encrypted)
+
+            if encrypted is None:
+                self.logger.warning(f"Agency {agency_id}: Response missing encryption fields")
+                return None
+
+            plaintext_fp = self.payload_cache.fingerprint(plaintext)
+            cached = self.payload_cache.lookup(agency_id, plaintext_fp=plaintext_fp)
+            if cached is not None:
+                self.payload_cache.store(agency_id, body_fp, plaintext_fp, cached)
+                return mark_fetched(cached)
+
+            with self.timings.stage("decode", agency_id):
+                incidents_data = decode_plaintext(plaintext).get("incidents", {})
+
+            with self.timings.stage("parse", agency_id):
+                active_incidents = parse_incidents(incidents_data, agency_id, agency_name, "active")
+                recent_incidents = parse_incidents(incidents_data, agency_id, agency_name, "recent")
+
+        except Exception as e:
+            self.logger.error(f"Agency {agency_id}: Error - {e}")
+            return None
+
+        parsed = (active_incidents, recent_incidents)
+        self.payload_cache.store(agency_id, body_fp, plaintext_fp, parsed)
+        return parsed
 
     def poll_all_agencies(self):
         """Poll all enabled agencies for active and recent incidents."""
-        self.logger.info("=" * 50)
-        self.logger.info("Starting poll cycle...")
+        self.poll_agencies(list(self.enabled))
+
+    def refresh_shard(self) -> bool:
+        """
+        Pick up shard group changes (sharded workers only).
+
+        Returns:
+            True if this worker's agencies changed
+        """
+        if self.workers is None:
+            return False
+        alive = len(self.workers.alive)
+        owned = self.workers.assign(self.configured)
+        if len(self.workers.alive) != alive:
+            rate = self.group_rate / len(self.workers.alive)
+            self.limiter.set_rate(rate)
+            self.logger.info(f"{self.workers.worker_id} now polls at {rate:g} req/s")
+        if owned == self.enabled:
+            return False
+
+        gained, lost = len(owned - self.enabled), len(self.enabled - owned)
+        self.logger.info(f"{self.workers.worker_id} now owns {len(owned)} agencies (+{gained}, -{lost})")
+        # Agencies handed to another worker keep their last data in self.latest,
+        # so the merge step has it until the new owner's first poll
+        self.enabled = owned
+        return True
+
+    def merge_partials(self):
+        """
+        Combine the shard workers' partial data into the configured outputs.
+
+        Each agency's active incidents come from the partial that polled it most
+        recently, so agencies of a dead worker keep their last data until their
+        new owner has polled them. Recent incidents are combined from all partials.
+        """
+        worker_dir = self.config.get("worker_dir", "workers")
+        partials = load_partials(worker_dir, max_age=self.config.get("merge_max_age_seconds", 24 * 3600))
+
+        # agency_id -> (last_poll, partial, name)
+        sources: dict[str, tuple[str, dict, Optional[str]]] = {}
+        for partial in partials:
+            for agency_id, info in partial.get("agencies", {}).items():
+                last_poll = info.get("last_poll") or ""
+                if agency_id in self.configured and last_poll > sources.get(agency_id, ("",))[0]:
+                    sources[agency_id] = (last_poll, partial, info.get("name"))
 
         all_active = []
-        all_recent = []
-        enabled_list = list(self.enabled)
+        recent = {}
+        for partial in partials:
+            for inc in partial.get("active_incidents", []):
+                source = sources.get(inc.get("agency_id"))
+                if source is not None and source[1] is partial:
+                    all_active.append(IncidentRecord.from_dict(inc))
+            for inc in partial.get("recent_incidents", []):
+                source = sources.get(inc.get("agency_id"))
+                if source is not None and (source[1] is partial or inc.get("incident_id") not in recent):
+                    recent[inc.get("incident_id")] = IncidentRecord.from_dict(inc)
+        all_recent = list(recent.values())
+
+        for agency_id, (last_poll, _, name) in sources.items():
+            if self.merged_polls.get(agency_id) != last_poll:
+                self.output.update_agency_poll_time(agency_id, name)
+        self.merged_polls = {agency_id: source[0] for agency_id, source in sources.items()}
 
-        for i, agency_id in enumerate(enabled_list, 1):
-            agency_info = self.agencies.get(agency_id, {})
-            agency_name = agency_info.get("name", f"Agency {agency_id}")
+        all_units = parse_unit_status(all_active)
+        changes = self.delta.compute(all_active, all_recent, set(sources))
+        self.output.update_incidents(all_active, all_recent)
+        self.output.update_units(all_units)
+        if changes is not None:
+            self.output.update_changes(changes)
+        self.output.flush()
+
+        workers = sorted(p["worker"] for p in partials)
+        self.logger.info(
+            f"Merged {len(partials)} partials ({', '.join(workers) or 'none'}): {len(sources)} agencies, "
+            f"{len(all_active)} active, {len(all_recent)} recent incidents"
+        )
+        if changes is not None:
+            self.logger.info(f"Change set {changes['seq']}: {len(changes['added'])} added, "
+                             f"{len(changes['updated'])} updated, {len(changes['closed'])} closed")
+
+    def poll_agencies(self, enabled_list: list[str]) -> dict[str, Optional[int]]:
+        """
+        Poll a set of agencies and write every enabled agency's latest incidents.
+
+        Args:
+            enabled_list: Agency IDs to poll this cycle
+
+        Returns:
+            Incident changes per polled agency (None for agencies that failed)
+        """
+        self.logger.info("=" * 50)
+        self.logger.info(f"Starting poll cycle ({len(enabled_list)} of {len(self.enabled)} agencies)...")
+        started = time.monotonic()
+        self.timings = CycleTimings()
+
+        polled = set()
+        failed = []
+        skipped = [agency_id for agency_id in enabled_list if not self.breaker.allow(agency_id)]
+        if skipped:
+            self.logger.info(f"Skipping {len(skipped)} agencies with open breakers: {', '.join(sorted(skipped))}")
+            skipped_set = set(skipped)
+            for agency_id in skipped:
+                self.latest.pop(agency_id, None)
+            enabled_list = [agency_id for agency_id in enabled_list if agency_id not in skipped_set]
+
+        with self.timings.stage("connect"):
+            self.transport.warm_up(self.concurrency, self.limiter)
+        self.payload_cache.reset_stats()
+
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="poll") as pool:
+            # A single worker polls inline, which keeps the work visible to --profile
+            if self.concurrency == 1:
+                results = map(self._poll_agency, enabled_list)
+            else:
+                results = pool.map(self._poll_agency, enabled_list)
+
+            for i, (agency_id, result) in enumerate(zip(enabled_list, results), 1):
+                agency_info = self.agencies.get(agency_id, {})
+                agency_name = agency_info.get("name", f"Agency {agency_id}")
 
-            self.logger.info(f"[{i}/{len(enabled_list)}] Polling {agency_id} - {agency_name}")
+                self.output.update_agency_poll_time(agency_id, agency_name)
 
-            incidents_data = fetch_incidents(agency_id, self.logger)
+                if result is None:
+                    failed.append(agency_id)
+                    self.breaker.record_failure(agency_id)
+                    # A dead agency's last incidents are no longer republished
+                    if self.breaker.is_open(agency_id):
+                        self.latest.pop(agency_id, None)
+                    self.logger.info(f"[{i}/{len(enabled_list)}] {agency_id} - {agency_name}: failed")
+                    continue
 
-            if incidents_data is None:
-                self.output.update_agency_poll_time(agency_id, agency_name)
-                continue
+                self.breaker.record_success(agency_id)
+                active_incidents, recent_incidents = result
+                polled.add(agency_id)
+                self.latest[agency_id] = result
+                self.timings.count("active_incidents", len(active_incidents))
+                self.timings.count("recent_incidents", len(recent_incidents))
 
-            active_incidents = parse_incidents(incidents_data, agency_id, agency_name, "active")
-            recent_incidents = parse_incidents(incidents_data, agency_id, agency_name, "recent")
+                self.logger.info(
+                    f"[{i}/{len(enabled_list)}] {agency_id} - {agency_name}: "
+                    f"Active: {len(active_incidents)}, Recent: {len(recent_incidents)}"
+                )
 
+        all_active = []
+        all_recent = []
+        for active_incidents, recent_incidents in self.latest.values():
             all_active.extend(active_incidents)
             all_recent.extend(recent_incidents)
 
-            self.output.update_agency_poll_time(agency_id, agency_name)
-
-            self.logger.info(f"  Active: {len(active_incidents)}, Recent: {len(recent_incidents)}")
-
-            if i < len(enabled_list):
-                time.sleep(self.delay)
-
-        all_units = parse_unit_status(all_active)
+        with self.timings.stage("diff"):
+            all_units = parse_unit_status(all_active)
+            changes = self.delta.compute(all_active, all_recent, set(self.latest))
+
+        with self.timings.stage("output"):
+            self.output.update_incidents(all_active, all_recent)
+            self.output.update_units(all_units)
+            if changes is not None:
+                self.output.update_changes(changes)
+            self.output.flush()
+            self.breaker.save()
+
+        elapsed = time.monotonic() - started
+        self.logger.info(f"Poll complete in {elapsed:.1f}s: {len(all_active)} active, {len(all_recent)} recent incidents, {len(all_units)} units")
+        if changes is not None:
+            self.logger.info(
+                f"Change set {changes['seq']}: {len(changes['added'])} added, "
+                f"{len(changes['updated'])} updated, {len(changes['closed'])} closed, "
+                f"{len(changes['removed'])} removed, {len(changes['unit_transitions'])} unit transitions"
+            )
+        cache = self.payload_cache.stats()
+        self.logger.info(
+            f"Payload cache: {cache['body_hits']} body hits, "
+            f"{cache['plaintext_hits']} plaintext hits, {cache['misses']} misses"
+        )
+        keys = self.decryptor.stats()
+        self.logger.debug(f"Key cache: {keys['key_hits']} hits, {keys['key_misses']} misses, {keys['cached_keys']} cached")
+        self._log_timings()
+        if isinstance(self.output, BackgroundOutput):
+            writer = self.output.stats()
+            self.logger.info(
+                f"Output writer: {writer['depth']} queued, last write {writer['last_write_seconds']:.2f}s "
+                f"({writer['last_lag_seconds']:.2f}s behind), {writer['coalesced']} coalesced, {writer['errors']} errors"
+            )
+        self._publish_metrics(elapsed, failed, len(all_active))
+        self.logger.info("=" * 50)
 
-        self.output.update_incidents(all_active, all_recent)
-        self.output.update_units(all_units)
+        activity = {agency_id: (0 if agency_id in polled else None) for agency_id in enabled_list}
+        if changes is not None:
+            for key in CHANGE_KINDS:
+                for item in changes[key]:
+                    if activity.get(item["agency_id"]) is not None:
+                        activity[item["agency_id"]] += 1
+        return activity
+
+    def _define_metrics(self):
+        m = self.metrics
+        m.define("pulsepoint_cycles_total", "counter", "Poll cycles completed")
+        m.define("pulsepoint_cycle_duration_seconds", "histogram", "Poll cycle wall time")
+        m.define("pulsepoint_agencies_polled_total", "counter", "Agency polls attempted")
+        m.define("pulsepoint_agency_failures_total", "counter", "Failed agency polls")
+        m.define("pulsepoint_agency_fetch_seconds", "histogram", "Per-agency incidents request latency")
+        m.define("pulsepoint_decrypt_seconds", "histogram", "Per-agency payload decryption time")
+        m.define("pulsepoint_fetched_bytes_total", "counter", "Response bytes fetched")
+        m.define("pulsepoint_incidents_processed_total", "counter", "Incidents received from polled agencies")
+        m.define("pulsepoint_active_incidents", "gauge", "Active incidents written in the last cycle")
+        m.define("pulsepoint_open_breakers", "gauge", "Agencies currently skipped by their circuit breaker")
+        m.define("pulsepoint_last_cycle_timestamp_seconds", "gauge", "Unix time the last cycle finished")
+        m.define("pulsepoint_output_queue_depth", "gauge", "Cycle snapshots waiting for the output writer")
+        m.define("pulsepoint_output_coalesced_total", "counter", "Cycle snapshots merged into a waiting one")
+        m.define("pulsepoint_output_write_seconds", "histogram", "Time to write one snapshot to the output")
+        m.define("pulsepoint_output_lag_seconds", "gauge", "Age of the last written snapshot when its write finished")
+        m.define("pulsepoint_output_sink_write_seconds", "histogram", "Time to write one cycle, per output")
+        m.define("pulsepoint_output_sink_errors_total", "counter", "Failed writes, per output")
+
+    def _publish_metrics(self, elapsed: float, failed: list[str], active_count: int):
+        """Fold the cycle into the metrics registry and write it for the dashboard."""
+        m = self.metrics
+        m.inc("pulsepoint_cycles_total")
+        m.observe("pulsepoint_cycle_duration_seconds", elapsed)
+        m.inc("pulsepoint_agencies_polled_total", len(self.timings.stages.get("rate_limit", [])))
+        for agency_id in failed:
+            m.inc("pulsepoint_agency_failures_total", labels={"agency": agency_id})
+        for seconds in self.timings.stages.get("fetch", []):
+            m.observe("pulsepoint_agency_fetch_seconds", seconds)
+        for seconds in self.timings.stages.get("decrypt", []):
+            m.observe("pulsepoint_decrypt_seconds", seconds)
+        m.inc("pulsepoint_fetched_bytes_total", self.timings.counters.get("fetched_bytes", 0))
+        for kind in ("active", "recent"):
+            m.inc("pulsepoint_incidents_processed_total", self.timings.counters.get(f"{kind}_incidents", 0),
+                  labels={"kind": kind})
+        m.set("pulsepoint_active_incidents", active_count)
+        m.set("pulsepoint_open_breakers", len(self.breaker.open_agencies()))
+        m.set("pulsepoint_last_cycle_timestamp_seconds", time.time())
+        if isinstance(self.output, BackgroundOutput):
+            m.set("pulsepoint_output_queue_depth", self.output.stats()["depth"])
+
+        if self.metrics_file:
+            JSONFileOutput._write_atomic(self.metrics_file, {
+                "updated": datetime.now(timezone.utc).isoformat(),
+                "metrics": m.to_dict(),
+            })
 
-        self.logger.info(f"Poll complete: {len(all_active)} active, {len(all_recent)} recent incidents, {len(all_units)} units")
-        self.logger.info("=" * 50)
+    def _log_timings(self):
+        """Log the cycle's per-stage percentiles and slowest agencies."""
+        for stage, summary in self.timings.summary().items():
+            self.logger.info(
+                f"Stage {stage}: n={summary['count']} p50={summary['p50'] * 1000:.1f}ms "
+                f"p95={summary['p95'] * 1000:.1f}ms max={summary['max'] * 1000:.1f}ms "
+                f"total={summary['total']:.2f}s"
+            )
+        outliers = self.timings.outliers()
+        if outliers:
+            self.logger.info("Slowest agencies: " + ", ".join(
+                f"{agency_id} ({total * 1000:.0f}ms)" for agency_id, total in outliers
+            ))
 
     def run_once(self):
-        self.poll_all_agencies()
+        """Poll every enabled agency once, one cycle per region."""
+        self.refresh_shard()
+        for name, region in self.regions.items():
+            agencies = [agency_id for agency_id in region["agencies"] if agency_id in self.enabled]
+            if len(self.regions) > 1:
+                self.logger.info(f"Region {name}: {len(agencies)} agencies")
+            self.poll_agencies(agencies)
+
+    def run_merge(self, once: bool = False):
+        """Merge the workers' partial data once, or every merge_interval_seconds."""
+        interval = self.config.get("merge_interval_seconds", 30)
+        try:
+            while True:
+                started = time.monotonic()
+                self.merge_partials()
+                if once:
+                    return
+                time.sleep(max(0.0, interval - (time.monotonic() - started)))
+        except KeyboardInterrupt:
+            self.logger.info("Shutting down...")
+
+    def close(self):
+        """Finish pending output writes and stop heartbeating."""
+        if isinstance(self.output, BackgroundOutput):
+            self.output.close()
+        if self.workers is not None:
+            self.workers.stop()
+
+    def _region_scheduler(self, region: dict) -> AdaptivePollScheduler:
+        interval = region.get("poll_interval_seconds", self.config.get("poll_interval_seconds", 120))
+        return AdaptivePollScheduler(
+            [agency_id for agency_id in region["agencies"] if agency_id in self.enabled],
+            interval,
+            min_interval=region.get("min_poll_interval_seconds",
+                                    self.config.get("min_poll_interval_seconds", interval / 4)),
+            max_interval=region.get("max_poll_interval_seconds",
+                                    self.config.get("max_poll_interval_seconds", interval * 4)),
+        )
 
     def run_continuous(self):
-        interval = self.config.get("poll_interval_seconds", 120)
-        self.logger.info(f"Starting continuous polling (every {interval}s)")
+        # Each region has its own schedule, and batches never mix regions
+        schedulers = {name: self._region_scheduler(region) for name, region in self.regions.items()}
+        # Agencies coming due within this window are polled together in one batch
+        batch_window = self.config.get("poll_batch_window_seconds", 5)
+        for name, scheduler in schedulers.items():
+            self.logger.info(
+                f"Starting adaptive polling{f' for {name}' if len(schedulers) > 1 else ''} "
+                f"(every {scheduler.min_interval:g}-{scheduler.max_interval:g}s, "
+                f"{scheduler.base_interval:g}s on average)"
+            )
         self.logger.info("Press Ctrl+C to stop")
 
-        self.poll_all_agencies()
-        schedule.every(interval).seconds.do(self.poll_all_agencies)
-
         try:
             while True:
-                schedule.run_pending()
-                time.sleep(1)
+                if self.refresh_shard():
+                    for name, scheduler in schedulers.items():
+                        scheduler.set_agencies([a for a in self.regions[name]["agencies"] if a in self.enabled])
+
+                polled = False
+                for name, scheduler in schedulers.items():
+                    now = time.monotonic()
+                    batch = scheduler.due(now, batch_window)
+                    if not batch:
+                        continue
+                    polled = True
+
+                    activity = self.poll_agencies(batch)
+                    now = time.monotonic()
+                    for agency_id in batch:
+                        scheduler.record(agency_id, activity.get(agency_id), now)
+                    scheduler.rebalance()
+
+                    stats = scheduler.stats()
+                    self.logger.info(
+                        f"Poll intervals{f' ({name})' if len(schedulers) > 1 else ''}: "
+                        f"{stats['min']:.0f}s min, {stats['median']:.0f}s median, "
+                        f"{stats['max']:.0f}s max ({stats['requests_per_minute']:.1f} req/min)"
+                    )
+
+                if not polled:
+                    now = time.monotonic()
+                    time.sleep(min(1.0, min(scheduler.seconds_until_next(now) for scheduler in schedulers.values())))
         except KeyboardInterrupt:
             self.logger.info("Shutting down...")
 
@@ -569,8 +2660,16 @@ def main():
     parser.add_argument("--once", action="store_true", help="Run single poll cycle")
     parser.add_argument("--test-agency", metavar="ID", help="Test fetching a single agency")
     parser.add_argument("--search", metavar="TERM", help="Search for agencies")
+    parser.add_argument("--profile", metavar="FILE", nargs="?", const="scraper.prof",
+                        help="Run one poll cycle under cProfile and write a pstats dump (default scraper.prof)")
+    parser.add_argument("--shard-index", type=int, metavar="I", help="Run as worker I of a shard group")
+    parser.add_argument("--shard-count", type=int, metavar="N", help="Number of workers in the shard group")
+    parser.add_argument("--merge", action="store_true",
+                        help="Merge the shard workers' partial data into the configured outputs")
 
     args = parser.parse_args()
+    if (args.shard_index is None) != (args.shard_count is None):
+        parser.error("--shard-index and --shard-count must be given together")
 
     if args.search:
         results = search_agencies(args.search)
@@ -607,12 +2706,33 @@ def main():
                     print(f"    Units: {', '.join(units)}")
         return
 
-    scraper = PulsePointScraper(args.config)
+    shard = (args.shard_index, args.shard_count) if args.shard_count else None
+    scraper = PulsePointScraper(args.config, shard=shard)
 
-    if args.once:
-        scraper.run_once()
-    else:
-        scraper.run_continuous()
+    # Queued output writes are flushed even if a cycle raises
+    try:
+        if args.merge:
+            scraper.run_merge(once=args.once)
+        elif args.profile:
+            import cProfile
+            import pstats
+
+            # Poll and write inline so decrypt/parse/output time shows up in the profile
+            scraper.concurrency = 1
+            if isinstance(scraper.output, BackgroundOutput):
+                scraper.output.close()
+                scraper.output = scraper.output.output
+            profiler = cProfile.Profile()
+            profiler.runcall(scraper.run_once)
+            profiler.dump_stats(args.profile)
+            scraper.logger.info(f"Profile written to {args.profile}")
+            pstats.Stats(profiler).sort_stats("cumulative").print_stats(25)
+        elif args.once:
+            scraper.run_once()
+        else:
+            scraper.run_continuous()
+    finally:
+        scraper.close()
 
 
 if __name__ == "__main__":
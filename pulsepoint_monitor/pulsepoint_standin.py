@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+PulsePoint API Stand-in Server
+
+Local replacement for the PulsePoint webapp API, for load testing the poll loop
+without touching api.pulsepoint.org. Implements ?resource=incidents, agencies
+and searchagencies with the real encryption, serving synthetic payloads (see
+pulsepoint_fixtures.py) or recorded ones, with configurable latency, error rate
+and agency count.
+
+Usage:
+    python pulsepoint_standin.py --agencies 1000 --latency 80 --error-rate 0.02 \\
+        --write-config standin_config.json
+    python pulsepoint_scraper.py -c standin_config.json --once
+
+Or point any run at it with PULSEPOINT_API_BASE=http://127.0.0.1:8787/v1/webapp.
+"""
+
+import argparse
+import json
+import logging
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+
+from pulsepoint_fixtures import encrypt_payload, make_agencies, make_incidents_payload
+
+logger = logging.getLogger("pulsepoint.standin")
+
+
+class StandInAPI:
+    """
+    Payload source and failure model for the stand-in server.
+
+    Synthetic incidents change every change_interval seconds. Encrypted
+    payloads are cached per agency until then, so the server stays cheap at
+    thousands of agencies.
+    """
+
+    def __init__(self, agency_count: int = 125, active: int = 5, recent: int = 40,
+                 change_interval: float = 60, latency_ms: float = 0, jitter_ms: float = 0,
+                 error_rate: float = 0.0, dead_agencies: Optional[set[str]] = None,
+                 replay_dir: Optional[str] = None, seed: int = 0, states: tuple[str, ...] = ("OR",)):
+        self.agencies = {a["id"]: a for a in make_agencies(agency_count, seed, states)}
+        self.active = active
+        self.recent = recent
+        self.change_interval = change_interval
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.error_rate = error_rate
+        self.dead_agencies = dead_agencies or set()
+        self.replay_dir = Path(replay_dir) if replay_dir else None
+        self.seed = seed
+        self._lock = threading.Lock()
+        self._cache: dict[str, tuple[int, bytes]] = {}
+        self.requests = 0
+        self.errors = 0
+
+    def _epoch(self) -> int:
+        return int(time.time() // self.change_interval) if self.change_interval > 0 else 0
+
+    def _replayed(self, agency_id: str) -> Optional[dict]:
+        """A recorded payload: either an encrypted envelope or decrypted data."""
+        if self.replay_dir is None:
+            return None
+        path = self.replay_dir / f"{agency_id}.json"
+        if not path.exists():
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if all(k in data for k in ("ct", "iv", "s")) else encrypt_payload(data)
+
+    def incidents(self, agency_id: str) -> bytes:
+        epoch = self._epoch()
+        with self._lock:
+            cached = self._cache.get(agency_id)
+        if cached is not None and cached[0] == epoch:
+            return cached[1]
+
+        envelope = self._replayed(agency_id)
+        if envelope is None:
+            # Vary each agency's load a little around the configured averages
+            rng = random.Random(f"{agency_id}:{self.seed}")
+            active = max(0, int(self.active * rng.uniform(0.2, 2.0)))
+            recent = max(0, int(self.recent * rng.uniform(0.5, 1.5)))
+            envelope = encrypt_payload(make_incidents_payload(agency_id, active, recent, seed=self.seed + epoch))
+        body = json.dumps(envelope).encode("utf-8")
+        with self._lock:
+            self._cache[agency_id] = (epoch, body)
+        return body
+
+    def agency_info(self, agency_id: str) -> bytes:
+        agency = self.agencies.get(agency_id)
+        agencies = []
+        if agency:
+            agencies.append({
+                "agencyid": agency_id,
+                "agencyname": agency["name"],
+                "city": agency["region"].replace(" County", ""),
+                "state": agency["state"],
+            })
+        return json.dumps(encrypt_payload({"agencies": agencies})).encode("utf-8")
+
+    def search(self, term: str) -> bytes:
+        term = term.lower()
+        matches = [
+            {"agencyid": a["id"], "Display1": a["name"], "Display2": f"[{a['state']} United States] {a['region']}"}
+            for a in self.agencies.values() if term in a["name"].lower()
+        ]
+        return json.dumps(encrypt_payload({"searchagencies": matches})).encode("utf-8")
+
+    def respond(self, query: dict) -> tuple[int, bytes]:
+        """Status and body for one API request, after simulated latency and failures."""
+        if self.latency or self.jitter:
+            time.sleep(max(0.0, random.gauss(self.latency, self.jitter)))
+
+        resource = query.get("resource", [""])[0]
+        agency_id = query.get("agencyid", [""])[0]
+        with self._lock:
+            self.requests += 1
+            failed = agency_id in self.dead_agencies or random.random() < self.error_rate
+            if failed:
+                self.errors += 1
+        if failed:
+            return 503, b'{"error": "Service Unavailable"}'
+
+        if resource == "incidents":
+            return 200, self.incidents(agency_id)
+        if resource == "agencies":
+            return 200, self.agency_info(agency_id)
+        if resource == "searchagencies":
+            return 200, self.search(query.get("token", [""])[0])
+        return 400, b'{"error": "Unknown resource"}'
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the real API
+
+    def do_GET(self):
+        status, body = self.server.api.respond(parse_qs(urlparse(self.path).query))
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+
+def make_server(api: StandInAPI, host: str = "127.0.0.1", port: int = 8787) -> ThreadingHTTPServer:
+    """Create (but do not start) a stand-in server; port 0 picks a free port."""
+    server = ThreadingHTTPServer((host, port), StandInHandler)
+    server.daemon_threads = True
+    server.api = api
+    return server
+
+
+def write_scraper_config(path: str, api: StandInAPI, api_base: str, output_dir: str = ".") -> dict:
+    """Write an agencies file and a scraper config that polls every stand-in agency; returns the config."""
+    out = Path(output_dir)
+    agencies_file = out / "standin_agencies.json"
+    with open(agencies_file, "w", encoding="utf-8") as f:
+        json.dump({"total_agencies": len(api.agencies), "agencies": list(api.agencies.values())}, f, indent=2)
+
+    config = {
+        "api_base": api_base,
+        "output_mode": "json",
+        "output_file": str(out / "standin_data.json"),
+        "agencies_file": str(agencies_file),
+        "max_concurrent_requests": 32,
+        "requests_per_second": 200,
+        "metrics_file": str(out / "standin_metrics.json"),
+        "breaker_state_file": str(out / "standin_health.json"),
+        "log_level": "INFO",
+    }
+    # One region per state when the agencies span several
+    states = sorted({a["state"] for a in api.agencies.values()})
+    if len(states) > 1:
+        config["regions"] = {state: {"states": [state]} for state in states}
+    else:
+        config["enabled_agencies"] = list(api.agencies)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=2)
+    return config
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local PulsePoint API stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--agencies", type=int, default=125, help="Number of synthetic agencies")
+    parser.add_argument("--active", type=int, default=5, help="Average active incidents per agency")
+    parser.add_argument("--recent", type=int, default=40, help="Average recent incidents per agency")
+    parser.add_argument("--change-interval", type=float, default=60,
+                        help="Seconds between incident changes (0 = never change)")
+    parser.add_argument("--latency", type=float, default=0, help="Mean response latency in ms")
+    parser.add_argument("--jitter", type=float, default=0, help="Latency standard deviation in ms")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument("--dead", default="", help="Comma-separated agency IDs that always fail")
+    parser.add_argument("--replay", metavar="DIR", help="Serve <DIR>/<agency_id>.json payloads where present")
+    parser.add_argument("--states", default="OR", help="Comma-separated states to spread the agencies over")
+    parser.add_argument("--write-config", metavar="FILE", help="Write a scraper config that polls this server")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s",
+                        datefmt="%Y-%m-%d %H:%M:%S")
+
+    api = StandInAPI(
+        agency_count=args.agencies,
+        active=args.active,
+        recent=args.recent,
+        change_interval=args.change_interval,
+        latency_ms=args.latency,
+        jitter_ms=args.jitter,
+        error_rate=args.error_rate,
+        dead_agencies={a for a in args.dead.split(",") if a},
+        replay_dir=args.replay,
+        states=tuple(s.strip().upper() for s in args.states.split(",") if s.strip()),
+    )
+    server = make_server(api, args.host, args.port)
+    api_base = f"http://{args.host}:{server.server_port}/v1/webapp"
+
+    if args.write_config:
+        write_scraper_config(args.write_config, api, api_base, Path(args.write_config).parent)
+        logger.info(f"Scraper config written to {args.write_config}")
+
+    logger.info(f"Serving {len(api.agencies)} agencies at {api_base}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        logger.info(f"Served {api.requests} requests ({api.errors} errors)")
+
+
+if __name__ == "__main__":
+    main()
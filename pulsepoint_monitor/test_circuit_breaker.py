@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Tests for the per-agency circuit breaker.
+
+Covers opening after consecutive failures, the half-open probe, backoff
+doubling within max_backoff, and persisting state across runs.
+Runs offline: python -m pytest test_circuit_breaker.py
+"""
+
+import json
+import logging
+
+from pulsepoint_scraper import AgencyCircuitBreaker
+
+LOGGER = logging.getLogger("test")
+
+
+def make_breaker(state_file=None, **kwargs) -> AgencyCircuitBreaker:
+    settings = {"failure_threshold": 3, "base_backoff": 60, "max_backoff": 3600, "jitter": 0.0}
+    settings.update(kwargs)
+    return AgencyCircuitBreaker(state_file, LOGGER, **settings)
+
+
+def test_opens_after_threshold():
+    """Failures below the threshold keep the agency in rotation."""
+    breaker = make_breaker()
+    for _ in range(2):
+        breaker.record_failure("A", now=0)
+    assert breaker.allow("A", now=1)
+    breaker.record_failure("A", now=0)
+    assert breaker.is_open("A")
+    assert not breaker.allow("A", now=59)
+    assert breaker.open_agencies() == ["A"]
+
+
+def test_success_resets_failures():
+    """A success between failures starts the count again."""
+    breaker = make_breaker()
+    breaker.record_failure("A", now=0)
+    breaker.record_failure("A", now=0)
+    breaker.record_success("A")
+    breaker.record_failure("A", now=0)
+    assert not breaker.is_open("A")
+
+
+def test_half_open_probe():
+    """After the backoff one probe is allowed; success closes, failure doubles the backoff."""
+    breaker = make_breaker(failure_threshold=1)
+    breaker.record_failure("A", now=0)
+    assert breaker.allow("A", now=60)
+    assert breaker.agencies["A"]["state"] == "half_open"
+
+    breaker.record_failure("A", now=60)
+    assert breaker.agencies["A"]["open_until"] == 60 + 120
+    assert not breaker.allow("A", now=179)
+
+    assert breaker.allow("A", now=180)
+    breaker.record_success("A")
+    assert "A" not in breaker.agencies
+
+
+def test_backoff_capped_with_jitter():
+    """Jitter never pushes the backoff past max_backoff."""
+    breaker = make_breaker(failure_threshold=1, jitter=0.2)
+    for _ in range(40):
+        breaker.record_failure("A", now=0)
+        assert breaker.agencies["A"]["open_until"] <= 3600
+
+
+def test_state_persists(tmp_path):
+    """An open breaker survives a restart through the state file."""
+    state_file = tmp_path / "agency_health.json"
+    breaker = make_breaker(str(state_file), failure_threshold=1)
+    breaker.record_failure("A", now=1000)
+    breaker.save()
+    assert json.loads(state_file.read_text())["agencies"]["A"]["state"] == "open"
+
+    restored = make_breaker(str(state_file))
+    assert restored.is_open("A")
+    assert not restored.allow("A", now=1030)
+    assert restored.allow("A", now=1060)
+
+
+def test_unreadable_state_ignored(tmp_path):
+    """A corrupt state file starts every agency closed."""
+    state_file = tmp_path / "agency_health.json"
+    state_file.write_text("{not json")
+    assert make_breaker(str(state_file)).agencies == {}
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Round-trip test for the compact feed.
+
+Writes synthetic incidents through JSONFileOutput with output_format
+"compact" and checks that decode_compact() restores the full JSON output.
+Runs offline: python -m pytest test_compact_feed.py
+"""
+
+import json
+import logging
+
+from pulsepoint_fixtures import make_agencies, make_incidents_payload
+from pulsepoint_scraper import JSONFileOutput, decode_compact, parse_incidents, parse_unit_status
+
+
+def test_compact_round_trip(tmp_path):
+    active, recent = [], []
+    for agency in make_agencies(5):
+        incidents_data = make_incidents_payload(agency["id"], active=4, recent=6)["incidents"]
+        active.extend(parse_incidents(incidents_data, agency["id"], agency["name"], "active"))
+        recent.extend(parse_incidents(incidents_data, agency["id"], agency["name"], "recent"))
+
+    output = JSONFileOutput(str(tmp_path / "data.json"), logging.getLogger("test"),
+                            output_format="compact", compact_file=str(tmp_path / "compact.json"))
+    for agency in make_agencies(5):
+        output.update_agency_poll_time(agency["id"], agency["name"])
+    output.update_incidents(active, recent)
+    output.update_units(parse_unit_status(active))
+    output.flush()
+
+    with open(tmp_path / "data.json", "r", encoding="utf-8") as f:
+        data = json.load(f)
+    with open(tmp_path / "compact.json", "r", encoding="utf-8") as f:
+        decoded = decode_compact(json.load(f))
+
+    assert data["unit_status"]
+    for key in ("last_updated", "agencies", "active_incidents", "recent_incidents", "unit_status"):
+        assert decoded[key] == data[key], key
+
+
+def test_compact_feed_keeps_data_file_indented(tmp_path):
+    """compact_feed writes the compact file without changing the data file's format."""
+    output = JSONFileOutput(str(tmp_path / "data.json"), logging.getLogger("test"), compact_feed=True)
+    agency = make_agencies(1)[0]
+    output.update_agency_poll_time(agency["id"], agency["name"])
+    output.flush()
+
+    assert (tmp_path / "data.json").read_text(encoding="utf-8").startswith("{\n  ")
+    assert (tmp_path / "data.compact.json").exists()
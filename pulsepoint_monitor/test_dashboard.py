@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Tests for the dashboard API: filtered incident queries, since parsing,
+ETag revalidation and resuming the change stream.
+Runs offline (needs flask): python -m pytest test_dashboard.py
+"""
+
+import json
+import os
+import time
+
+import pytest
+
+import dashboard
+
+NOW = time.time()
+
+
+def iso(seconds_ago: float) -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(NOW - seconds_ago))
+
+
+def incident(incident_id: str, agency_id: str, seconds_ago: float, call_type: str = "ME") -> dict:
+    return {"incident_id": incident_id, "agency_id": agency_id, "call_type": call_type,
+            "received_time": iso(seconds_ago)}
+
+
+DATA = {
+    "last_updated": iso(0),
+    "sequence": 3,
+    "agencies": {"A": {"name": "Agency A"}, "B": {"name": "Agency B"}},
+    "active_incidents": [incident("a1", "A", 60), incident("b1", "B", 30, "SF"), incident("a2", "A", 7200)],
+    "recent_incidents": [incident("a3", "A", 3600), incident("b2", "B", 40 * 3600)],
+    "unit_status": [{"unit_id": "E1", "agency_id": "A", "incident_id": "a1"}],
+}
+
+
+@pytest.fixture
+def entry():
+    return dashboard.DataCache._build(DATA, ((1, 1),))
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    data_file = tmp_path / "pulsepoint_data.json"
+    data_file.write_text(json.dumps(DATA))
+    changes_file = tmp_path / "pulsepoint_data_changes.json"
+    changes_file.write_text(json.dumps({
+        "sequence": 3,
+        "changes": [{"seq": seq, "full": False, "added": [], "updated": [], "closed": [], "removed": [],
+                     "recent_added": [], "unit_transitions": []} for seq in (2, 3)],
+    }))
+    monkeypatch.setattr(dashboard, "DATA_FILE", data_file)
+    monkeypatch.setattr(dashboard, "CHANGES_FILE", changes_file)
+    monkeypatch.setattr(dashboard, "DATA_DB", None)
+    monkeypatch.setattr(dashboard, "data_cache", dashboard.DataCache())
+    return dashboard.app.test_client()
+
+
+def ids(incidents: list[dict]) -> list[str]:
+    return [inc["incident_id"] for inc in incidents]
+
+
+def test_query_newest_first(entry):
+    """Without filters, active incidents come before recent ones, each newest first."""
+    result = dashboard.query_incidents(entry)
+    assert ids(result["active_incidents"]) == ["b1", "a1", "a2"]
+    assert ids(result["recent_incidents"]) == ["a3", "b2"]
+    assert result["agency_counts"]["A"] == {"active": 2, "recent": 1}
+
+
+def test_query_filters(entry):
+    """Agency, since, view and call type filters narrow the result."""
+    result = dashboard.query_incidents(entry, agencies=["A"], since=NOW - 2 * 3600 - 60)
+    assert ids(result["active_incidents"]) == ["a1", "a2"]
+    assert ids(result["recent_incidents"]) == ["a3"]
+    assert [u["agency_id"] for u in result["unit_status"]] == ["A"]
+
+    assert ids(dashboard.query_incidents(entry, view="recent")["active_incidents"]) == []
+    assert ids(dashboard.query_incidents(entry, call_types={"SF"})["active_incidents"]) == ["b1"]
+
+
+def test_query_pages_across_kinds(entry):
+    """limit/offset page through active then recent incidents."""
+    first = dashboard.query_incidents(entry, limit=2)
+    assert ids(first["active_incidents"]) == ["b1", "a1"] and first["next_offset"] == 2
+    second = dashboard.query_incidents(entry, limit=2, offset=2)
+    assert ids(second["active_incidents"]) == ["a2"]
+    assert ids(second["recent_incidents"]) == ["a3"]
+    last = dashboard.query_incidents(entry, limit=2, offset=4)
+    assert ids(last["recent_incidents"]) == ["b2"] and last["next_offset"] is None
+    assert (last["total_active"], last["total_recent"]) == (3, 2)
+
+
+def test_parse_since():
+    """Epoch seconds and ISO times parse; ISO times without an offset are UTC."""
+    assert dashboard.parse_since("1767225600") == 1767225600.0
+    assert dashboard.parse_since("2026-01-01T00:00:00Z") == 1767225600.0
+    assert dashboard.parse_since("2026-01-01T00:00:00") == 1767225600.0
+    assert dashboard.parse_since("2026-01-01T00:00:00-08:00") == 1767225600.0 + 8 * 3600
+    with pytest.raises(ValueError):
+        dashboard.parse_since("yesterday")
+
+
+def test_parse_since_ignores_server_timezone(monkeypatch):
+    """A naive ISO time means the same instant whatever the server's local zone."""
+    if not hasattr(time, "tzset"):
+        pytest.skip("time.tzset is not available")
+    monkeypatch.setenv("TZ", "America/Los_Angeles")
+    time.tzset()
+    try:
+        assert dashboard.parse_since("2026-01-01T00:00:00") == 1767225600.0
+    finally:
+        monkeypatch.delenv("TZ")
+        time.tzset()
+
+
+def test_incidents_etag(client):
+    """Responses carry an ETag, and a matching If-None-Match gets 304 until the data changes."""
+    response = client.get("/api/incidents")
+    assert response.status_code == 200
+    assert json.loads(response.data)["sequence"] == 3
+    etag = response.headers["ETag"]
+
+    assert client.get("/api/incidents", headers={"If-None-Match": etag}).status_code == 304
+    filtered = client.get("/api/incidents?agencies=A", headers={"If-None-Match": etag})
+    assert filtered.status_code == 200 and filtered.headers["ETag"] != etag
+
+    data_file = dashboard.DATA_FILE
+    data_file.write_text(json.dumps({**DATA, "sequence": 4}))
+    os.utime(data_file, ns=(time.time_ns() + 10**9,) * 2)
+    assert client.get("/api/incidents", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_incidents_bad_query(client):
+    """Invalid filters are a 400, not a server error."""
+    assert client.get("/api/incidents?view=bogus").status_code == 400
+    assert client.get("/api/incidents?limit=-1").status_code == 400
+
+
+def read_events(client, url: str, headers: dict = None, count: int = 2) -> list[str]:
+    response = client.get(url, headers=headers or {}, buffered=False)
+    try:
+        chunks = response.iter_encoded()
+        return [next(chunks).decode("utf-8") for _ in range(count)]
+    finally:
+        response.close()
+
+
+def test_stream_resumes_after_sequence(client):
+    """A client resuming from seq 2 (Last-Event-ID) receives only seq 3."""
+    events = read_events(client, "/api/stream?after=1", headers={"Last-Event-ID": "2"})
+    assert events[0] == "retry: 5000\n\n"
+    assert events[1].startswith("id: 3\nevent: changes\n")
+
+
+def test_stream_resync_when_history_is_gone(client):
+    """A sequence older than the kept history gets a resync event."""
+    events = read_events(client, "/api/stream?after=0")
+    assert events[1] == "id: 3\nevent: resync\ndata: {}\n\n"
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Tests for per-cycle change sets (IncidentDeltaTracker) and how their
+sequence survives a restart through JSONFileOutput.
+Runs offline: python -m pytest test_delta_tracker.py
+"""
+
+import logging
+
+from pulsepoint_scraper import IncidentDeltaTracker, IncidentRecord, JSONFileOutput, UnitRecord
+
+
+def incident(incident_id: str, agency_id: str = "A", address: str = "1 Main St", units=(("E1", "DP"),),
+             is_active: bool = True) -> IncidentRecord:
+    return IncidentRecord(
+        incident_id=incident_id, agency_id=agency_id, agency_name=f"Agency {agency_id}", call_type="ME",
+        address=address, latitude=45.5, longitude=-122.6, received_epoch=1_800_000_000.0, alarm_level="1",
+        units=tuple(UnitRecord(u, s) for u, s in units), is_active=is_active, fetched_epoch=1_800_000_000.0,
+    )
+
+
+def test_first_change_set_is_full():
+    """The first cycle has nothing to diff against and is marked full."""
+    tracker = IncidentDeltaTracker()
+    changes = tracker.compute([incident("1")], [], {"A"})
+    assert changes["seq"] == 1
+    assert changes["full"] is True
+    assert [i["incident_id"] for i in changes["added"]] == ["1"]
+
+
+def test_no_change_returns_none():
+    """An unchanged cycle produces no change set and does not advance the sequence."""
+    tracker = IncidentDeltaTracker()
+    tracker.compute([incident("1")], [], {"A"})
+    assert tracker.compute([incident("1")], [], {"A"}) is None
+    assert tracker.sequence == 1
+
+
+def test_refetched_copy_is_not_an_update():
+    """A record that differs only in fetch time is not reported as updated."""
+    tracker = IncidentDeltaTracker()
+    first = incident("1")
+    tracker.compute([first], [], {"A"})
+    assert tracker.compute([first.refetched(first.fetched_epoch + 60)], [], {"A"}) is None
+
+
+def test_updated_closed_removed_and_units():
+    """Field changes, closes (now recent), removals and unit transitions are all reported."""
+    tracker = IncidentDeltaTracker()
+    tracker.compute([incident("1"), incident("2"), incident("3")], [], {"A"})
+
+    changes = tracker.compute(
+        [incident("1", address="2 Oak St", units=(("E1", "OS"),))],
+        [incident("2", is_active=False)],
+        {"A"},
+    )
+    assert changes["seq"] == 2
+    assert changes["full"] is False
+    assert changes["updated"][0]["fields"]["address"] == {"old": "1 Main St", "new": "2 Oak St"}
+    assert [c["incident_id"] for c in changes["closed"]] == ["2"]
+    assert [c["incident_id"] for c in changes["removed"]] == ["3"]
+    assert [i["incident_id"] for i in changes["recent_added"]] == ["2"]
+    transitions = {(t["incident_id"], t["unit_id"]): (t["from"], t["to"]) for t in changes["unit_transitions"]}
+    assert transitions[("1", "E1")] == ("DP", "OS")
+    assert transitions[("3", "E1")] == ("DP", None)
+
+
+def test_unpolled_agency_keeps_state():
+    """Incidents of an agency not polled this cycle are neither closed nor removed."""
+    tracker = IncidentDeltaTracker()
+    tracker.compute([incident("1", "A"), incident("2", "B")], [], {"A", "B"})
+    changes = tracker.compute([incident("1", "A", address="3 Elm St")], [], {"A"})
+    assert changes["closed"] == [] and changes["removed"] == []
+    assert tracker.compute([incident("1", "A", address="3 Elm St")], [], {"A"}) is None
+
+
+def test_seed_makes_next_set_incremental():
+    """A tracker seeded from published state continues the sequence without a full set."""
+    tracker = IncidentDeltaTracker(sequence=41)
+    tracker.seed([incident("1")], [])
+    changes = tracker.compute([incident("1"), incident("2")], [], {"A"})
+    assert changes["seq"] == 42
+    assert changes["full"] is False
+    assert [i["incident_id"] for i in changes["added"]] == ["2"]
+
+
+def test_sequence_resumes_without_changes_file(tmp_path):
+    """The data file's sequence keeps the feed monotonic when the changes file is gone."""
+    output_file = tmp_path / "data.json"
+    logger = logging.getLogger("test")
+    for run in range(3):
+        output = JSONFileOutput(str(output_file), logger)
+        tracker = IncidentDeltaTracker(sequence=output.last_sequence)
+        state = output.load_state()
+        if state is not None:
+            tracker.seed(*state)
+        active = [incident(str(i)) for i in range(run + 1)]
+        changes = tracker.compute(active, [], {"A"})
+        output.update_incidents(active, [])
+        output.update_changes(changes)
+        output.flush()
+        assert changes["seq"] == run + 1
+        assert changes["full"] is (run == 0)
+        (tmp_path / "data_changes.json").unlink()
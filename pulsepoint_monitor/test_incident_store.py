@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Tests for the SQLite incident store: upserts, history pruning and the
+bounded state reloaded at startup.
+Runs offline: python -m pytest test_incident_store.py
+"""
+
+import logging
+import time
+
+import incident_store
+from incident_store import SQLiteOutput
+
+LOGGER = logging.getLogger("test")
+HOUR = 3600
+
+
+def incident(incident_id: str, hours_ago: float, address: str = "1 Main St") -> dict:
+    received = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(time.time() - hours_ago * HOUR))
+    return {"incident_id": incident_id, "agency_id": "A", "received_time": received, "address": address}
+
+
+def cycle(output: SQLiteOutput, seq: int, active: list[dict], recent: list[dict]):
+    output.update_agency_poll_time("A", "Agency A")
+    output.update_incidents(active, recent)
+    output.update_changes({"seq": seq, "generated_at": "t"})
+    output.flush()
+
+
+def ids(incidents: list[dict]) -> list[str]:
+    return sorted(inc["incident_id"] for inc in incidents)
+
+
+def test_upsert_and_active_flag(tmp_path):
+    """Incidents are updated in place and stay on as history after leaving the active list."""
+    db_file = str(tmp_path / "incidents.db")
+    output = SQLiteOutput(db_file, LOGGER)
+    cycle(output, 1, [incident("1", 1), incident("2", 1)], [])
+    cycle(output, 2, [incident("1", 1, address="2 Oak St")], [])
+
+    snapshot = incident_store.load_snapshot(db_file)
+    assert [i["address"] for i in snapshot["active_incidents"]] == ["2 Oak St"]
+    assert ids(snapshot["recent_incidents"]) == ["2"]
+    assert snapshot["sequence"] == 2
+    assert snapshot["agencies"]["A"]["name"] == "Agency A"
+
+
+def test_prunes_history_and_changes(tmp_path):
+    """Closed incidents past retention and change sets past change_history are deleted."""
+    db_file = str(tmp_path / "incidents.db")
+    output = SQLiteOutput(db_file, LOGGER, retention_hours=48, change_history=2)
+    for seq in range(1, 5):
+        cycle(output, seq, [], [incident("old", 72), incident("kept", 30)])
+
+    assert ids(incident_store.load_snapshot(db_file, window_hours=48)["recent_incidents"]) == ["kept"]
+    assert [c["seq"] for c in incident_store.load_changes(db_file)["changes"]] == [3, 4]
+    assert incident_store.load_changes(db_file, after=3)["changes"] == [{"seq": 4, "generated_at": "t"}]
+
+
+def test_load_state_is_bounded(tmp_path):
+    """Startup state holds the recent window (newest first, capped), not the whole history."""
+    db_file = str(tmp_path / "incidents.db")
+    output = SQLiteOutput(db_file, LOGGER)
+    cycle(output, 1, [incident("a", 1)], [incident(f"r{i}", i + 0.5) for i in range(30)])
+    output.conn.close()
+
+    assert SQLiteOutput(str(tmp_path / "empty.db"), LOGGER).load_state() is None
+    active, recent = SQLiteOutput(db_file, LOGGER).load_state()
+    assert ids(active) == ["a"]
+    assert len(recent) == 24
+
+    active, recent = SQLiteOutput(db_file, LOGGER, recent_max_incidents=3).load_state()
+    assert [i["incident_id"] for i in recent] == ["r0", "r1", "r2"]
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Tests for the background and multi-output writers: snapshot merging,
+coalescing while the writer is busy, and close() draining the queue.
+Runs offline: python -m pytest test_output_writer.py
+"""
+
+import logging
+import threading
+
+import pytest
+
+from output_writer import BackgroundOutput, CycleSnapshot, MultiOutput
+
+LOGGER = logging.getLogger("test")
+
+
+class RecordingOutput:
+    """Output that records every call; writes can be held until released."""
+
+    last_sequence = 0
+
+    def __init__(self, hold: bool = False):
+        self.calls = []
+        self.flushes = 0
+        self.release = threading.Event()
+        self.writing = threading.Event()
+        if not hold:
+            self.release.set()
+
+    def update_agency_poll_time(self, agency_id, agency_name=None):
+        self.calls.append(("poll", agency_id))
+
+    def update_incidents(self, active, recent=None):
+        self.calls.append(("incidents", [i["incident_id"] for i in active],
+                           None if recent is None else sorted(i["incident_id"] for i in recent)))
+
+    def update_units(self, units):
+        self.calls.append(("units", len(units)))
+
+    def update_changes(self, changes):
+        self.calls.append(("changes", changes["seq"]))
+
+    def flush(self):
+        self.writing.set()
+        self.release.wait(5)
+        self.flushes += 1
+
+    def load_state(self):
+        return None
+
+
+def cycle(output, seq: int, agency_id: str, active: list[str], recent: list[str]):
+    output.update_agency_poll_time(agency_id)
+    output.update_incidents([{"incident_id": i} for i in active], [{"incident_id": i} for i in recent])
+    output.update_units([])
+    output.update_changes({"seq": seq})
+    output.flush()
+
+
+def test_snapshot_merge():
+    """Newest active incidents win; polls, recent incidents and change sets accumulate."""
+    older = CycleSnapshot(polls={"A": None}, active=[{"incident_id": "1"}], recent=[{"incident_id": "r1"}],
+                          changes=[{"seq": 1}])
+    newer = CycleSnapshot(polls={"B": None}, active=[{"incident_id": "2"}], recent=[{"incident_id": "r2"}],
+                          changes=[{"seq": 2}])
+    older.merge(newer)
+    assert older.polls == {"A": None, "B": None}
+    assert older.active == [{"incident_id": "2"}]
+    assert sorted(i["incident_id"] for i in older.recent) == ["r1", "r2"]
+    assert [c["seq"] for c in older.changes] == [1, 2]
+    assert older.cycles == 2
+
+
+def test_background_coalesces_while_busy():
+    """Cycles arriving while the writer is busy are merged into one queued snapshot."""
+    target = RecordingOutput(hold=True)
+    output = BackgroundOutput(target, LOGGER, queue_size=1)
+    cycle(output, 1, "A", ["1"], ["r1"])
+    assert target.writing.wait(5)
+    cycle(output, 2, "B", ["2"], ["r2"])
+    cycle(output, 3, "C", ["3"], ["r3"])
+
+    stats = output.stats()
+    assert stats["coalesced"] == 1 and stats["depth"] == 1
+    target.release.set()
+    assert output.wait(5)
+    output.close(5)
+
+    assert target.flushes == 2
+    second = target.calls[4:]
+    assert ("poll", "B") in second and ("poll", "C") in second
+    assert ("incidents", ["3"], ["r2", "r3"]) in second
+    assert [c for c in second if c[0] == "changes"] == [("changes", 2), ("changes", 3)]
+    assert output.stats()["written"] == 2
+
+
+def test_close_drains_queue():
+    """close() writes snapshots still queued, then refuses new ones."""
+    target = RecordingOutput(hold=True)
+    output = BackgroundOutput(target, LOGGER, queue_size=2)
+    cycle(output, 1, "A", ["1"], [])
+    assert target.writing.wait(5)
+    cycle(output, 2, "A", ["2"], [])
+    target.release.set()
+    output.close(5)
+
+    assert target.flushes == 2
+    assert ("changes", 2) in target.calls
+    with pytest.raises(RuntimeError):
+        output.flush()
+
+
+def test_multi_output_isolates_errors():
+    """A failing output does not stop the others from being written."""
+    good = RecordingOutput()
+    bad = RecordingOutput()
+    bad.update_incidents = lambda *args: 1 / 0
+    output = MultiOutput({"good": good, "bad": bad}, LOGGER)
+    cycle(output, 1, "A", ["1"], [])
+    assert good.flushes == 1
+    assert ("changes", 1) in good.calls
+    assert bad.flushes == 0
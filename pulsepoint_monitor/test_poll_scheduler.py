@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Tests for the activity-adaptive poll schedule (AdaptivePollScheduler).
+
+Covers due ordering, redistributing the request budget by churn within
+the interval bounds, and adding or dropping agencies.
+Runs offline: python -m pytest test_poll_scheduler.py
+"""
+
+import pytest
+
+from pulsepoint_scraper import AdaptivePollScheduler
+
+
+def make_scheduler(agency_ids, **kwargs) -> AdaptivePollScheduler:
+    settings = {"base_interval": 60, "min_interval": 15, "max_interval": 300, "smoothing": 1.0}
+    settings.update(kwargs)
+    return AdaptivePollScheduler(list(agency_ids), **settings)
+
+
+def poll_all(scheduler: AdaptivePollScheduler, changes: dict, now: float):
+    for agency_id in scheduler.due(now):
+        scheduler.record(agency_id, changes.get(agency_id, 0), now)
+
+
+def test_new_agencies_due_then_base_interval():
+    """Never-polled agencies are due at once, then again after base_interval."""
+    scheduler = make_scheduler("ABC")
+    assert sorted(scheduler.due(0)) == ["A", "B", "C"]
+    for agency_id in "ABC":
+        scheduler.record(agency_id, 0, 0)
+    assert scheduler.due(59) == []
+    assert scheduler.seconds_until_next(50) == 10
+    assert sorted(scheduler.due(55, window=5)) == ["A", "B", "C"]
+
+
+def test_rebalance_keeps_budget():
+    """Busy agencies get shorter intervals while the total request rate stays the same."""
+    scheduler = make_scheduler("ABCD")
+    poll_all(scheduler, {}, 0)
+    poll_all(scheduler, {"A": 2}, 60)
+    scheduler.rebalance()
+
+    intervals = scheduler.intervals
+    assert intervals["A"] < 60 < intervals["B"]
+    assert intervals["B"] == intervals["C"] == intervals["D"]
+    assert scheduler.stats()["requests_per_minute"] == pytest.approx(4)
+
+
+def test_rebalance_respects_bounds():
+    """Intervals stay within [min_interval, max_interval] however uneven the churn."""
+    scheduler = make_scheduler("ABCD", min_interval=20)
+    poll_all(scheduler, {}, 0)
+    poll_all(scheduler, {"A": 100}, 60)
+    scheduler.rebalance()
+
+    assert scheduler.intervals["A"] == 20
+    assert [scheduler.intervals[a] for a in "BCD"] == [300, 300, 300]
+
+
+def test_failed_poll_keeps_activity():
+    """A failed poll (changes=None) is rescheduled without touching activity."""
+    scheduler = make_scheduler("A")
+    poll_all(scheduler, {}, 0)
+    poll_all(scheduler, {"A": 3}, 60)
+    activity = scheduler.activity["A"]
+    assert scheduler.due(120) == ["A"]
+    scheduler.record("A", None, 120)
+    assert scheduler.activity["A"] == activity
+    assert scheduler.due(180) == ["A"]
+
+
+def test_set_agencies():
+    """Added agencies are due immediately; removed ones leave the schedule."""
+    scheduler = make_scheduler("AB")
+    poll_all(scheduler, {}, 0)
+    scheduler.set_agencies(["B", "C"])
+    assert set(scheduler.intervals) == {"B", "C"}
+    assert scheduler.due(1) == ["C"]
+    assert scheduler.due(60) == ["B"]
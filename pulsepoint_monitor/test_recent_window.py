@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Tests for the rolling window of recent incidents (RecentIncidentWindow).
+Runs offline: python -m pytest test_recent_window.py
+"""
+
+from pulsepoint_scraper import IncidentRecord, RecentIncidentWindow
+
+HOUR = 3600
+NOW = 1_800_000_000.0
+
+
+def incident(incident_id: str, received_epoch, address: str = "1 Main St") -> IncidentRecord:
+    return IncidentRecord(
+        incident_id=incident_id, agency_id="A", agency_name="Agency A", call_type="ME",
+        address=address, latitude=45.5, longitude=-122.6, received_epoch=received_epoch, alarm_level="1",
+        units=(), is_active=False, fetched_epoch=NOW,
+    )
+
+
+def ids(window: RecentIncidentWindow) -> list[str]:
+    return sorted(inc.incident_id for inc in window.incidents())
+
+
+def test_prune_drops_expired():
+    """Incidents received before the window are removed; newer ones stay."""
+    window = RecentIncidentWindow(24)
+    window.update([incident("old", NOW - 25 * HOUR), incident("new", NOW - HOUR)], now=NOW)
+    assert window.prune(now=NOW) == 1
+    assert ids(window) == ["new"]
+    assert window.prune(now=NOW) == 0
+
+
+def test_update_replaces_and_moves_time():
+    """Re-adding an incident replaces it; a changed time is honoured, the stale heap entry skipped."""
+    window = RecentIncidentWindow(24)
+    window.update([incident("1", NOW - 25 * HOUR)], now=NOW)
+    window.update([incident("1", NOW - HOUR, address="2 Oak St")], now=NOW)
+    assert len(window) == 1
+    assert window.prune(now=NOW) == 0
+    assert window.incidents()[0].address == "2 Oak St"
+
+
+def test_missing_time_ages_from_first_seen():
+    """An incident without a received time expires a window after it was first seen."""
+    window = RecentIncidentWindow(24)
+    window.update([incident("1", None)], now=NOW)
+    window.update([incident("1", None)], now=NOW + 12 * HOUR)
+    assert window.prune(now=NOW + 23 * HOUR) == 0
+    assert window.prune(now=NOW + 25 * HOUR) == 1
+
+
+def test_max_incidents_drops_oldest():
+    """Past max_incidents the oldest incidents are dropped, whatever the window."""
+    window = RecentIncidentWindow(24, max_incidents=2)
+    window.update([incident(str(i), NOW - i * 60) for i in range(5)], now=NOW)
+    assert window.prune(now=NOW) == 3
+    assert ids(window) == ["0", "1"]
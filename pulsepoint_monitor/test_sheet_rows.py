@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Tests for SheetRows, the row diff behind the Google Sheets output.
+
+Each case applies the returned runs to a plain list standing in for the
+worksheet and checks it ends up holding exactly the wanted rows.
+Runs offline: python -m pytest test_sheet_rows.py
+"""
+
+import random
+
+from pulsepoint_scraper import SheetRows
+
+
+def write(sheet: list, runs: list, previous_length: int, length: int) -> list:
+    """Apply runs to a simulated worksheet and clear rows past the new length."""
+    sheet = sheet + [None] * max(0, length - len(sheet))
+    for start, rows in runs:
+        sheet[start:start + len(rows)] = rows
+    for i in range(length, previous_length):
+        sheet[i] = None
+    return sheet[:length]
+
+
+def row(key: str, value: str = "", fetched: str = "t0") -> list:
+    return [key, value, fetched]
+
+
+def test_initial_write_is_one_run():
+    """Writing into an empty sheet sends every row as a single run."""
+    table = SheetRows(3, (0,), volatile_columns=(2,))
+    runs, previous = table.apply([row("a"), row("b"), row("c")])
+    assert previous == 0
+    assert runs == [(0, [row("a"), row("b"), row("c")])]
+
+
+def test_unchanged_and_volatile_only_rows_are_skipped():
+    """Rows whose only change is a volatile column are not rewritten."""
+    table = SheetRows(3, (0,), volatile_columns=(2,))
+    table.apply([row("a", "1"), row("b", "2")])
+    runs, _ = table.apply([row("a", "1", "t1"), row("b", "3", "t1")])
+    assert runs == [(1, [row("b", "3", "t1")])]
+
+
+def test_removed_row_is_replaced_by_last():
+    """Removing a middle row moves the last row into its place."""
+    table = SheetRows(3, (0,))
+    table.apply([row(k) for k in "abcd"])
+    runs, previous = table.apply([row(k) for k in "acd"])
+    assert previous == 4
+    assert runs == [(1, [row("d")])]
+    assert [r[0] for r in table.rows] == ["a", "d", "c"]
+
+
+def test_adjacent_changes_coalesce():
+    """Changed rows next to each other are sent as one run."""
+    table = SheetRows(3, (0,))
+    table.apply([row(k) for k in "abcdef"])
+    runs, _ = table.apply([row("a"), row("b", "x"), row("c", "x"), row("d"), row("e"), row("f", "x")])
+    assert runs == [(1, [row("b", "x"), row("c", "x")]), (5, [row("f", "x")])]
+
+
+def test_load_existing_rows():
+    """Rows read from the sheet are diffed against; padding and trailing blanks are handled."""
+    table = SheetRows(3, (0,))
+    table.load([["a", "1", "t"], ["b"], ["", "", ""], ["c", "9", "t"]])
+    assert [r[0] for r in table.rows] == ["a", "b"]
+    runs, previous = table.apply([["a", "1", "t"], ["b", "", ""]])
+    assert (runs, previous) == ([], 2)
+
+
+def test_random_updates_match_wanted_rows():
+    """Any sequence of adds, removals and edits leaves the sheet holding exactly the wanted rows."""
+    rng = random.Random(7)
+    table = SheetRows(3, (0,), volatile_columns=(2,))
+    sheet: list = []
+    keys = [f"k{i}" for i in range(40)]
+    for step in range(200):
+        wanted = [row(k, str(rng.randrange(3)), f"t{step}") for k in keys if rng.random() < 0.5]
+        previous_length = len(table.rows)
+        runs, previous = table.apply(wanted)
+        assert previous == previous_length
+        sheet = write(sheet, runs, previous, len(table.rows))
+        assert len(sheet) == len(wanted)
+        assert {tuple(r[:2]) for r in sheet} == {tuple(r[:2]) for r in wanted}
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Tests for worker sharding: rendezvous ownership, heartbeat-based
+membership, and reading the workers' partial data files.
+Runs offline: python -m pytest test_workers.py
+"""
+
+import json
+import logging
+import os
+import time
+
+import pytest
+
+from workers import WorkerGroup, load_partials, rendezvous_owner
+
+LOGGER = logging.getLogger("test")
+AGENCIES = [f"AG{i:03d}" for i in range(300)]
+
+
+def beat(worker_dir, worker_id: str, updated: float):
+    (worker_dir / f"{worker_id}.heartbeat").write_text(json.dumps({"worker": worker_id, "updated": updated}))
+
+
+def test_rendezvous_moves_only_dead_workers_agencies():
+    """Dropping a worker reassigns only its agencies, spread over the others."""
+    workers = ["shard-0", "shard-1", "shard-2"]
+    before = {a: rendezvous_owner(a, workers) for a in AGENCIES}
+    after = {a: rendezvous_owner(a, workers[:2]) for a in AGENCIES}
+    moved = [a for a in AGENCIES if before[a] != after[a]]
+    assert moved and all(before[a] == "shard-2" for a in moved)
+    assert {after[a] for a in moved} == {"shard-0", "shard-1"}
+    assert rendezvous_owner("AG000", []) is None
+
+
+def test_group_splits_agencies(tmp_path):
+    """Workers starting together own disjoint sets that cover every agency."""
+    groups = [WorkerGroup(str(tmp_path), i, 3, LOGGER) for i in range(3)]
+    owned = [group.assign(AGENCIES) for group in groups]
+    assert set().union(*owned) == set(AGENCIES)
+    assert sum(len(o) for o in owned) == len(AGENCIES)
+    assert groups[0].agencies == len(owned[0])
+
+
+def test_stale_heartbeat_drops_worker(tmp_path):
+    """A peer whose heartbeat is older than the timeout loses its agencies."""
+    group = WorkerGroup(str(tmp_path), 0, 2, LOGGER, timeout=60)
+    beat(tmp_path, "shard-1", time.time())
+    assert group.assign(AGENCIES) != set(AGENCIES)
+    beat(tmp_path, "shard-1", time.time() - 120)
+    assert group.assign(AGENCIES) == set(AGENCIES)
+    assert group.alive == ["shard-0"]
+
+
+def test_heartbeat_throttled_unless_forced(tmp_path):
+    """heartbeat() writes at most every timeout / 3 seconds unless forced."""
+    group = WorkerGroup(str(tmp_path), 0, 1, LOGGER, timeout=60)
+    group.heartbeat()
+    path = tmp_path / "shard-0.heartbeat"
+    first = json.loads(path.read_text())["updated"]
+    group.heartbeat()
+    assert json.loads(path.read_text())["updated"] == first
+    group.heartbeat(force=True)
+    assert json.loads(path.read_text())["updated"] >= first
+
+
+def test_start_and_stop(tmp_path):
+    """start() writes a heartbeat at once and stop() joins the heartbeat thread."""
+    group = WorkerGroup(str(tmp_path), 0, 1, LOGGER)
+    group.start()
+    try:
+        assert (tmp_path / "shard-0.heartbeat").exists()
+    finally:
+        group.stop()
+    assert group._thread is None
+
+
+def test_index_out_of_range(tmp_path):
+    """A shard index outside 0..count-1 is rejected."""
+    with pytest.raises(ValueError):
+        WorkerGroup(str(tmp_path), 3, 3, LOGGER)
+
+
+def test_load_partials(tmp_path):
+    """Only shard-N.json files are read; stale and unreadable ones are skipped."""
+    (tmp_path / "shard-0.json").write_text(json.dumps({"active_incidents": []}))
+    (tmp_path / "shard-1.json").write_text("{broken")
+    (tmp_path / "shard-0_changes.json").write_text(json.dumps({"changes": []}))
+    stale = tmp_path / "shard-2.json"
+    stale.write_text(json.dumps({"active_incidents": []}))
+    old = time.time() - 3600
+    os.utime(stale, (old, old))
+
+    partials = load_partials(str(tmp_path), max_age=600)
+    assert [p["worker"] for p in partials] == ["shard-0"]
+    assert [p["worker"] for p in load_partials(str(tmp_path))] == ["shard-0", "shard-2"]
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+PulsePoint Worker Sharding
+
+Splits the enabled agencies over several scraper processes (or machines)
+that share a worker directory. Each worker writes a heartbeat file there and
+owns the agencies for which it has the highest rendezvous hash among the
+workers that are alive. When a worker stops heartbeating, only its agencies
+move, spread evenly over the others. Workers write partial data files to the
+same directory, and a merge step combines them into the usual outputs.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import socket
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+
+def rendezvous_owner(agency_id: str, workers: list[str]) -> Optional[str]:
+    """The worker with the highest hash for this agency (highest random weight hashing)."""
+    return max(
+        workers,
+        key=lambda worker: hashlib.sha1(f"{worker}:{agency_id}".encode("utf-8")).digest(),
+        default=None,
+    )
+
+
+class WorkerGroup:
+    """
+    One worker's view of the shard group.
+
+    Workers are named shard-0 .. shard-(count-1). A worker counts as alive
+    while its heartbeat is fresher than timeout seconds. Until a worker has
+    written its first heartbeat it is assumed alive for one timeout after
+    this worker started, so a group starting together splits evenly at once.
+    Heartbeats are written by a timer thread (see start()), so a long poll
+    cycle does not make the worker look dead.
+    """
+
+    def __init__(self, worker_dir: str, index: int, count: int, logger: logging.Logger,
+                 timeout: float = 180):
+        """
+        Args:
+            worker_dir: Directory shared by all workers (heartbeats and partial data)
+            index: This worker's shard index, 0 <= index < count
+            count: Number of workers in the group
+            logger: Logger for membership changes
+            timeout: Seconds without a heartbeat before a worker is considered dead
+        """
+        if not 0 <= index < count:
+            raise ValueError(f"Shard index {index} out of range for {count} shards")
+        self.worker_dir = Path(worker_dir)
+        self.worker_dir.mkdir(parents=True, exist_ok=True)
+        self.index = index
+        self.count = count
+        self.worker_id = f"shard-{index}"
+        self.logger = logger
+        self.timeout = timeout
+        self.started = time.time()
+        self.last_heartbeat = 0.0
+        self.alive: list[str] = [f"shard-{i}" for i in range(count)]
+        # Agencies owned after the last assign(), reported in the heartbeat
+        self.agencies = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def path(self, worker_id: str, suffix: str) -> Path:
+        return self.worker_dir / f"{worker_id}{suffix}"
+
+    @property
+    def data_file(self) -> Path:
+        """This worker's partial data file."""
+        return self.path(self.worker_id, ".json")
+
+    def heartbeat(self, force: bool = False):
+        """Write this worker's heartbeat, at most every timeout / 3 seconds unless forced."""
+        with self._lock:
+            now = time.time()
+            if not force and now - self.last_heartbeat < self.timeout / 3:
+                return
+            beat = {
+                "worker": self.worker_id,
+                "updated": now,
+                "host": socket.gethostname(),
+                "pid": os.getpid(),
+                "agencies": self.agencies,
+            }
+            tmp = self.path(self.worker_id, ".heartbeat.tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(beat, f)
+            os.replace(tmp, self.path(self.worker_id, ".heartbeat"))
+            self.last_heartbeat = now
+
+    def _beat(self):
+        while not self._stop.wait(self.timeout / 3):
+            try:
+                self.heartbeat(force=True)
+            except OSError as e:
+                self.logger.warning(f"Heartbeat for {self.worker_id} failed: {e}")
+
+    def start(self):
+        """Write a heartbeat now, then every timeout / 3 seconds on a background thread."""
+        self.heartbeat(force=True)
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._beat, name="heartbeat", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the heartbeat thread; peers take over this worker's agencies after timeout."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _is_alive(self, worker_id: str, now: float) -> bool:
+        if worker_id == self.worker_id:
+            return True
+        try:
+            with open(self.path(worker_id, ".heartbeat"), "r", encoding="utf-8") as f:
+                updated = json.load(f).get("updated", 0)
+        except (OSError, json.JSONDecodeError):
+            return now - self.started < self.timeout
+        return now - updated < self.timeout
+
+    def assign(self, agency_ids) -> set[str]:
+        """
+        Refresh membership and return the agencies this worker owns.
+
+        Args:
+            agency_ids: Every enabled agency in the group
+        """
+        now = time.time()
+        alive = [f"shard-{i}" for i in range(self.count) if self._is_alive(f"shard-{i}", now)]
+        if alive != self.alive:
+            self.logger.info(f"Shard group changed: {len(alive)} of {self.count} workers alive ({', '.join(alive)})")
+            self.alive = alive
+        owned = {agency_id for agency_id in agency_ids if rendezvous_owner(agency_id, alive) == self.worker_id}
+        self.agencies = len(owned)
+        return owned
+
+
+def load_partials(worker_dir: str, max_age: Optional[float] = None) -> list[dict]:
+    """
+    Read the partial data files written by workers.
+
+    Args:
+        worker_dir: The shared worker directory
+        max_age: Skip files not modified for this many seconds (None keeps all)
+
+    Returns:
+        Partial data dicts, each with a "worker" key added
+    """
+    partials = []
+    now = time.time()
+    for path in sorted(Path(worker_dir).glob("shard-*.json")):
+        # Skip the workers' other files (change sets, metrics, breaker state)
+        if not re.fullmatch(r"shard-\d+", path.stem):
+            continue
+        try:
+            if max_age is not None and now - path.stat().st_mtime > max_age:
+                continue
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            continue
+        data["worker"] = path.stem
+        partials.append(data)
+    return partials